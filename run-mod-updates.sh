@@ -4,43 +4,41 @@ SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 
 VENV="${SCRIPT_DIR}/.venv"
 VENV_PYTHON="${VENV}/bin/python3"
+REQUIREMENTS_STAMP="${VENV}/requirements.stamp"
 UPDATER_SCRIPT="src.updater.mod_updater"
+# Shared by every server so identical Modrinth lookups are made once
+CACHE_PATH="${SCRIPT_DIR}/logs/modrinth_cache.sqlite"
 
 echo "=== Mod Update Run: $(date) ==="
 
 cd "$SCRIPT_DIR" || exit
-python3 -m venv "${VENV}"
-"${VENV_PYTHON}" -m pip install -r requirements.txt
+if [ ! -x "$VENV_PYTHON" ]; then
+    python3 -m venv "${VENV}"
+fi
+# Only reinstall when a requirements file has changed since the last run
+if [ ! -f "$REQUIREMENTS_STAMP" ] || \
+        [ -n "$(find requirements.txt src -name requirements.txt \
+            -newer "$REQUIREMENTS_STAMP")" ]; then
+    "${VENV_PYTHON}" -m pip install -r requirements.txt && \
+        touch "$REQUIREMENTS_STAMP"
+fi
 
 . .env
 SERVERS_DIR="${CRAFTY_DIRECTORY}/docker/servers"
+# Next to the servers so jars can be hard-linked into every mods directory
+STORE_PATH="${CRAFTY_DIRECTORY}/docker/jar_store"
 
-# Find all directories with a mods subdirectory
-for server_dir in "$SERVERS_DIR"/*; do
-    # Check if mods directory exists
-    if [ ! -d "${server_dir}/mods" ]; then
-        continue
-    fi
+export SERVERS_BASE="$SERVERS_DIR"
+export CRAFTY_DB="${CRAFTY_DIRECTORY}/docker/config/db/crafty.sqlite"
 
-    uuid=$(basename "$server_dir")
-    config_file="${server_dir}/config/mod_updates.json"
+"$VENV_PYTHON" -m "$UPDATER_SCRIPT" --all-servers --jobs 8 \
+    --cache-path "$CACHE_PATH" --store-path "$STORE_PATH"
 
-    # Check if config file exists
-    if [ ! -f "$config_file" ]; then
-        echo "Skipping $uuid: no mod_updates.json config found"
-        continue
-    fi
-
-    echo "Updating mods for server: $uuid"
-
-    "$VENV_PYTHON" -m "$UPDATER_SCRIPT" --config "$config_file" --uuid "$uuid"
-
-    if [ $? -eq 0 ]; then
-        echo "  ✓ Success for $uuid"
-    else
-        echo "  ✗ Failed for $uuid"
-    fi
-done
+if [ $? -eq 0 ]; then
+    echo "  ✓ Success"
+else
+    echo "  ✗ Failed"
+fi
 
 echo "=== Mod Update Complete: $(date) ==="
 echo ""
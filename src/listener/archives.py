@@ -0,0 +1,76 @@
+"""
+Reading rotated ``logs/YYYY-MM-DD-N.log.gz`` archives.
+"""
+import gzip
+import re
+import time
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from src.listener.line_framer import LineFramer
+from src.utility.log_parser import LogRecord, parse_line
+
+ARCHIVE_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2})-(\d+)\.log\.gz$")
+CLOCK_PATTERN = re.compile(r"(\d{1,2}):(\d{2}):(\d{2}(?:\.\d+)?)$")
+
+
+def list_archives(logs_dir: Path, since: Optional[str] = None,
+                  until: Optional[str] = None) -> list[Path]:
+    """
+    Return a log directory's archives, oldest first, optionally limited to
+    the YYYY-MM-DD dates between since and until inclusive.
+    """
+    found = []
+    for path in logs_dir.glob("*.log.gz"):
+        match = ARCHIVE_PATTERN.search(path.name)
+        if match is None:
+            continue
+        day = match.group(1)
+        if since is not None and day < since:
+            continue
+        if until is None or day <= until:
+            found.append((day, int(match.group(2)), path))
+    return [path for _, _, path in sorted(found)]
+
+
+def parse_clock(stamp: str) -> Optional[float]:
+    """
+    Return seconds since midnight for a timestamp ending in HH:MM:SS, with
+    or without a date before it or milliseconds after it.
+    """
+    match = CLOCK_PATTERN.search(stamp)
+    if match is None:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def read_archive(path: str, triggers: Iterable[str]
+                 ) -> Iterator[tuple[float, LogRecord]]:
+    """
+    Stream the lines of an archive that contain a trigger, with the epoch
+    time of each line.
+
+    The archive is decompressed straight into a LineFramer, so other lines
+    are never decoded. Times come from the date in the file name and the
+    clock on each line, moving to the next day when the clock goes back.
+    """
+    found = ARCHIVE_PATTERN.search(path)
+    if found is None:
+        return
+    midnight = time.mktime(time.strptime(found.group(1), "%Y-%m-%d"))
+
+    framer = LineFramer(triggers)
+    previous = 0.0
+    days = 0
+    with gzip.open(path, "rb") as archive:
+        while framer.fill(archive.readinto):
+            for line in framer.lines():
+                record = parse_line(line)
+                seconds = parse_clock(record.time)
+                if seconds is None:
+                    continue
+                if seconds < previous:
+                    days += 1
+                previous = seconds
+                yield midnight + days * 86400 + seconds, record
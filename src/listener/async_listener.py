@@ -0,0 +1,246 @@
+"""
+Asyncio listener runtime with a bounded notification queue.
+
+Log followers run on their own threads and only deduplicate, match and
+enqueue. Notifier workers drain the queue, so a slow webhook never holds up
+log consumption. They only hand a notification to the sinks once each has
+room for it, so a backlog waits here, where the overflow policy applies.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from functools import partial
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from src.listener.checkpoint import get_checkpoints
+from src.listener.event_router import resolve_notification
+from src.listener.tail_watcher import (LOG_BACKEND, create_line_handler,
+                                       start_followers)
+from src.utility import metrics
+from src.utility.log_parser import LogRecord
+from src.utility.notifiers import Severity, get_notifiers
+from src.utility.server_discovery import ServerRegistry, get_registry
+
+load_dotenv()
+NOTIFY_QUEUE_SIZE = int(os.getenv("NOTIFY_QUEUE_SIZE", "1000"))
+NOTIFY_WORKERS = int(os.getenv("NOTIFY_WORKERS", "2"))
+NOTIFY_OVERFLOW = os.getenv("NOTIFY_OVERFLOW", "drop-oldest")
+OVERFLOW_POLICIES = ("drop-oldest", "coalesce")
+METRICS_INTERVAL = 60
+ROOM_WAIT_SECONDS = 1.0
+
+QUEUE_DEPTH = metrics.gauge("notify_queue_depth",
+                            "Notifications waiting for a worker")
+QUEUE_DROPPED = metrics.counter(
+    "notify_queue_dropped_total",
+    "Notifications dropped by the overflow policy"
+)
+NOTIFY_LATENCY = metrics.histogram(
+    "notify_latency_seconds",
+    "Time from reading a line to a sink delivering its notification",
+    ("sink",)
+)
+
+
+class Notification:
+    """A routed event waiting to be delivered."""
+
+    __slots__ = ("name", "message", "summary", "severity", "created",
+                 "count")
+
+    def __init__(self, name: str, message: str, summary: str,
+                 severity: Severity = Severity.INFO,
+                 created: Optional[float] = None):
+        self.name = name
+        self.message = message
+        self.summary = summary
+        self.severity = severity
+        self.created = time.monotonic() if created is None else created
+        self.count = 1
+
+
+class QueueMetrics:
+    """Backpressure counters and line-to-notification latency samples."""
+
+    def __init__(self, samples: int = 1024):
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+        self.latencies: deque[float] = deque(maxlen=samples)
+
+    def record_latency(self, seconds: float) -> None:
+        self.delivered += 1
+        self.latencies.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        """Return a latency percentile over the recent samples."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+
+    def describe(self, depth: int) -> str:
+        return (f"depth={depth} high_water={self.high_water} "
+                f"enqueued={self.enqueued} delivered={self.delivered} "
+                f"dropped={self.dropped} coalesced={self.coalesced} "
+                f"latency_p50={self.percentile(0.5):.3f}s "
+                f"latency_p99={self.percentile(0.99):.3f}s")
+
+
+class NotificationQueue:
+    """
+    Bounded queue that never blocks producers.
+
+    When full, ``drop-oldest`` discards the oldest notification and
+    ``coalesce`` merges the new one into a queued notification for the same
+    server and summary, falling back to dropping the oldest.
+    """
+
+    def __init__(self, maxsize: int, policy: str = "drop-oldest"):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {policy!r}; "
+                f"expected one of {', '.join(OVERFLOW_POLICIES)}"
+            )
+        self.maxsize = maxsize
+        self.policy = policy
+        self.metrics = QueueMetrics()
+        self._items: deque[Notification] = deque()
+        self._ready = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def offer(self, notification: Notification) -> None:
+        """Enqueue a notification, applying the overflow policy if full."""
+        self.metrics.enqueued += 1
+        if len(self._items) >= self.maxsize:
+            if self.policy == "coalesce" and self._coalesce(notification):
+                return
+            self._items.popleft()
+            self.metrics.dropped += 1
+            QUEUE_DROPPED.inc()
+
+        self._items.append(notification)
+        self.metrics.high_water = max(self.metrics.high_water,
+                                      len(self._items))
+        self._ready.set()
+
+    async def get(self) -> Notification:
+        """Wait for and remove the oldest notification."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return self._items.popleft()
+
+    def _coalesce(self, notification: Notification) -> bool:
+        for queued in reversed(self._items):
+            if (queued.name == notification.name
+                    and queued.summary == notification.summary):
+                queued.message = f"{queued.message}\n{notification.message}"
+                queued.count += notification.count
+                self.metrics.coalesced += 1
+                return True
+        return False
+
+
+async def deliver(queue: NotificationQueue,
+                  send: Optional[Callable[[str, str, str], None]] = None
+                  ) -> None:
+    """
+    Notifier worker: hand queued notifications to the notifier sinks, or
+    to ``send`` one at a time.
+
+    Each notification waits until the sinks it goes to have room, so they
+    never drop it and the queue's overflow policy decides what is lost.
+    Latency is recorded once a notification is out: by each sink as it
+    delivers, or once ``send`` returns.
+    """
+    loop = asyncio.get_running_loop()
+
+    def record(sink: str, latency: float) -> None:
+        queue.metrics.record_latency(latency)
+        NOTIFY_LATENCY.observe(latency, sink)
+
+    def delivered(sink: str, latency: float) -> None:
+        try:
+            loop.call_soon_threadsafe(record, sink, latency)
+        except RuntimeError:
+            pass  # Delivered after the loop closed on shutdown
+
+    while True:
+        notification = await queue.get()
+        try:
+            if send is None:
+                notifiers = get_notifiers()
+                while not await asyncio.to_thread(notifiers.wait_for_room,
+                                                  notification.severity,
+                                                  ROOM_WAIT_SECONDS):
+                    pass
+                notifiers.notify(notification.name, notification.message,
+                                 notification.summary, notification.severity,
+                                 notification.created, delivered)
+                continue
+            await asyncio.to_thread(send, notification.name,
+                                    notification.message,
+                                    notification.summary)
+        except Exception as e:
+            print(f"[async] Error delivering to {notification.name}: {e}")
+            continue
+        record("send", time.monotonic() - notification.created)
+
+
+async def report_metrics(queue: NotificationQueue,
+                         interval: float = METRICS_INTERVAL) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        print(f"[async] {queue.metrics.describe(len(queue))}")
+
+
+async def run(registry: ServerRegistry) -> None:
+    """Follow every server and deliver notifications until cancelled."""
+    loop = asyncio.get_running_loop()
+    queue = NotificationQueue(NOTIFY_QUEUE_SIZE, NOTIFY_OVERFLOW)
+    QUEUE_DEPTH.set_function(lambda: len(queue))
+
+    def enqueue(name: str, record: LogRecord, read_at: float) -> None:
+        event = resolve_notification(name, record)
+        if event is not None:
+            notification = Notification(name, *event, created=read_at)
+            loop.call_soon_threadsafe(queue.offer, notification)
+
+    pool = start_followers(registry.servers(), LOG_BACKEND,
+                           partial(create_line_handler, route=enqueue))
+    registry.subscribe(pool.sync)
+    registry.start_watching()
+
+    workers = [asyncio.create_task(deliver(queue))
+               for _ in range(NOTIFY_WORKERS)]
+    try:
+        await report_metrics(queue)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        get_notifiers().drain()
+        checkpoints = get_checkpoints()
+        if checkpoints is not None:
+            checkpoints.flush()
+
+
+def main() -> None:
+    if metrics.METRICS_PORT:
+        metrics.serve(metrics.METRICS_PORT)
+    try:
+        asyncio.run(run(get_registry()))
+    except KeyboardInterrupt:
+        print("Stopping log watchers...")
+
+
+if __name__ == "__main__":
+    main()
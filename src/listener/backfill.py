@@ -0,0 +1,169 @@
+"""
+Run the event handlers over archived logs and count what they find.
+
+Archives are streamed through worker processes, one archive per task, in
+collect mode: events are resolved exactly as when routing live lines, but
+counted instead of sent.
+
+Run with: python -m src.listener.backfill [--server NAME] [--json]
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from src.listener.archives import list_archives, read_archive
+from src.listener.event_router import TRIGGERS, resolve_event
+from src.listener.signatures import record_signature
+from src.utility.log_parser import LogRecord
+from src.utility.server_discovery import get_registry
+
+BUCKET_FORMATS = {"hour": "%Y-%m-%d %H:00", "day": "%Y-%m-%d"}
+ERROR_LEVELS = ("ERROR", "FATAL")
+
+
+class Tally:
+    """Event counts from any number of archives; tallies can be merged."""
+
+    def __init__(self) -> None:
+        self.archives = 0
+        self.compressed_bytes = 0
+        self.lines = 0
+        self.skipped = 0
+        self.events: Counter[str] = Counter()
+        self.signatures: Counter[str] = Counter()
+        self.buckets: Counter[str] = Counter()
+
+    def add(self, bucket: str, record: LogRecord) -> None:
+        """Count one trigger line the way live routing would handle it."""
+        self.lines += 1
+        event = resolve_event(record)
+        if event is None:
+            self.skipped += 1
+            return
+        self.events[event[1]] += 1
+        self.buckets[bucket] += 1
+        if record.level in ERROR_LEVELS:
+            self.signatures[record_signature(record)] += 1
+
+    def merge(self, other: "Tally") -> None:
+        self.archives += other.archives
+        self.compressed_bytes += other.compressed_bytes
+        self.lines += other.lines
+        self.skipped += other.skipped
+        self.events.update(other.events)
+        self.signatures.update(other.signatures)
+        self.buckets.update(other.buckets)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "archives": self.archives,
+            "compressed_bytes": self.compressed_bytes,
+            "trigger_lines": self.lines,
+            "skipped": self.skipped,
+            "events": dict(self.events.most_common()),
+            "signatures": dict(self.signatures.most_common()),
+            "buckets": dict(sorted(self.buckets.items())),
+        }
+
+
+def scan_archive(path: str, bucket: str = "hour") -> Tally:
+    """Count the events in one archive; runs in a worker process."""
+    tally = Tally()
+    tally.archives = 1
+    tally.compressed_bytes = os.path.getsize(path)
+    bucket_format = BUCKET_FORMATS[bucket]
+    for at, record in read_archive(path, TRIGGERS):
+        tally.add(time.strftime(bucket_format, time.localtime(at)), record)
+    return tally
+
+
+def backfill(servers: Iterable[tuple[str, Path]], bucket: str = "hour",
+             since: Optional[str] = None, until: Optional[str] = None,
+             workers: Optional[int] = None) -> dict[str, Tally]:
+    """Count the events in every server's archives, by server."""
+    tasks = [(name, str(path))
+             for name, logs_dir in servers
+             for path in list_archives(logs_dir, since, until)]
+    # Largest first, so one big archive does not finish the run alone.
+    tasks.sort(key=lambda task: os.path.getsize(task[1]), reverse=True)
+
+    tallies: dict[str, Tally] = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(scan_archive, [path for _, path in tasks],
+                           [bucket] * len(tasks), chunksize=4)
+        for (name, _), tally in zip(tasks, results):
+            tallies.setdefault(name, Tally()).merge(tally)
+    return tallies
+
+
+def find_servers(names: Optional[list[str]],
+                 logs_dirs: Optional[list[Path]]) -> list[tuple[str, Path]]:
+    """Servers to scan: explicit log directories, or Crafty's servers."""
+    if logs_dirs:
+        return [(path.resolve().parent.name, path) for path in logs_dirs]
+    return sorted(
+        (info["name"], Path(info["log_file"]).parent)
+        for info in get_registry().servers().values()
+        if not names or info["name"] in names
+    )
+
+
+def print_tally(name: str, tally: Tally, top: int) -> None:
+    print(f"== {name}: {tally.archives} archives, "
+          f"{tally.compressed_bytes / 2**20:.1f} MiB, "
+          f"{sum(tally.events.values())} events "
+          f"({tally.skipped} skipped)")
+    for summary, count in tally.events.most_common():
+        print(f"  {count:>8}  {summary}")
+    if tally.signatures:
+        print("  Top error signatures:")
+        for signature, count in tally.signatures.most_common(top):
+            print(f"  {count:>8}  {signature[:120]}")
+    if tally.buckets:
+        print("  Busiest periods:")
+        for bucket, count in tally.buckets.most_common(top):
+            print(f"  {count:>8}  {bucket}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Count events in archived Minecraft logs"
+    )
+    parser.add_argument("--server", action="append",
+                        help="Server name to scan (repeatable)")
+    parser.add_argument("--logs-dir", type=Path, action="append",
+                        help="Scan this logs directory instead of Crafty's "
+                             "servers (repeatable)")
+    parser.add_argument("--since", help="First archive date, YYYY-MM-DD")
+    parser.add_argument("--until", help="Last archive date, YYYY-MM-DD")
+    parser.add_argument("--bucket", choices=BUCKET_FORMATS, default="hour")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Signatures and periods to print")
+    parser.add_argument("--workers", type=int,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--json", action="store_true",
+                        help="Print every count as JSON")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tallies = backfill(find_servers(args.server, args.logs_dir),
+                       args.bucket, args.since, args.until, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps({name: tally.to_json()
+                          for name, tally in tallies.items()}, indent=2))
+        return
+    for name, tally in tallies.items():
+        print_tally(name, tally, args.top)
+    total = sum(tally.compressed_bytes for tally in tallies.values())
+    print(f"Scanned {total / 2**20:.1f} MiB of archives in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+Checkpoints of log follower positions, so restarts resume where they left.
+"""
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional, TypedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH")
+CATCH_UP_BYTES = int(os.getenv("CATCH_UP_BYTES", str(1024 * 1024)))
+FAST_FORWARD = os.getenv("CATCH_UP_MODE", "tail") == "fast-forward"
+READ_SIZE = 64 * 1024
+
+
+class Checkpoint(TypedDict):
+    inode: int
+    offset: int
+    partial: str
+    saved: float
+
+
+class Resume:
+    """Where to continue following a log, and the lines missed meanwhile."""
+
+    def __init__(self, inode: int, offset: int, partial: bytes = b"",
+                 lines: Optional[list[bytes]] = None, skipped: int = 0):
+        self.inode = inode
+        self.offset = offset
+        self.partial = partial
+        self.lines = lines or []
+        self.skipped = skipped
+
+
+class CheckpointStore:
+    """
+    Keeps (inode, offset, partial line) per log in a small JSON file.
+
+    Updates only touch memory. A background thread writes the file at most
+    once per interval, atomically, and only when something changed.
+    """
+
+    def __init__(self, path: str, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self._checkpoints: dict[str, Checkpoint] = self._load()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, log_path: str) -> Optional[Checkpoint]:
+        with self._lock:
+            return self._checkpoints.get(log_path)
+
+    def update(self, log_path: str, inode: int, offset: int,
+               partial: bytes) -> None:
+        with self._lock:
+            self._checkpoints[log_path] = {
+                "inode": inode,
+                "offset": offset,
+                "partial": base64.b64encode(partial).decode(),
+                "saved": time.time(),
+            }
+            self._dirty = True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._checkpoints)
+            self._dirty = False
+
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w") as f:
+                f.write(data)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            print(f"[checkpoint] Error saving {self.path}: {e}")
+            with self._lock:
+                self._dirty = True
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def _load(self) -> dict[str, Checkpoint]:
+        try:
+            with open(self.path) as f:
+                data: dict[str, Checkpoint] = json.load(f)
+                return data
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[checkpoint] Ignoring unreadable {self.path}: {e}")
+            return {}
+
+
+_CHECKPOINTS: Optional[CheckpointStore] = None
+
+
+def get_checkpoints() -> Optional[CheckpointStore]:
+    """Return the shared store, or None when CHECKPOINT_PATH is unset."""
+    global _CHECKPOINTS
+    if _CHECKPOINTS is None and CHECKPOINT_PATH:
+        _CHECKPOINTS = CheckpointStore(CHECKPOINT_PATH)
+        _CHECKPOINTS.start()
+    return _CHECKPOINTS
+
+
+def plan_resume(path: str, checkpoint: Optional[Checkpoint],
+                max_bytes: int = CATCH_UP_BYTES,
+                fast_forward: bool = FAST_FORWARD) -> Resume:
+    """
+    Work out how to resume following a log after a restart.
+
+    Without a checkpoint the log is followed from its end. If the inode is
+    unchanged the missed bytes are replayed from the saved offset. If the
+    log was rotated, the ``*.log.gz`` archives written since the checkpoint
+    are replayed oldest first before the new log: the oldest is the log
+    that was being followed, so it resumes from the saved offset, and any
+    later ones were rotated whole while stopped. At most max_bytes
+    are replayed (the most recent ones); in fast-forward mode anything over
+    the cap is skipped entirely.
+
+    The log is only replayed up to the size it had when planning, which is
+    the returned offset, so lines written meanwhile are left for the
+    follower to read once rather than being replayed as well.
+    """
+    try:
+        status = os.stat(path)
+    except FileNotFoundError:
+        return Resume(0, 0)
+    if checkpoint is None:
+        return Resume(status.st_ino, status.st_size)
+
+    partial = base64.b64decode(checkpoint["partial"])
+    sources: list[tuple[io.BufferedIOBase, int, Optional[int]]] = []
+    if status.st_ino == checkpoint["inode"]:
+        if status.st_size >= checkpoint["offset"]:
+            start = checkpoint["offset"]
+        else:
+            start, partial = 0, b""
+    else:
+        archives = find_archives(path, checkpoint["saved"])
+        if not archives:
+            partial = b""
+        offset = checkpoint["offset"]
+        for archive in archives:
+            sources.append((gzip.open(archive, "rb"), offset, None))
+            offset = 0
+        start = 0
+
+    sources.append((open(path, "rb"), start, status.st_size))
+    tail = TailBuffer(max_bytes)
+    tail.add(partial)
+    for stream, offset, end in sources:
+        with stream:
+            tail.read(stream, offset, end)
+
+    if tail.overflowed and fast_forward:
+        print(f"[checkpoint] Fast-forwarding {path} past "
+              f"{tail.total} missed bytes")
+        return Resume(status.st_ino, status.st_size, skipped=tail.total)
+
+    data = tail.value()
+    lines = data.split(b"\n")
+    remainder = lines.pop()
+    if tail.overflowed:
+        print(f"[checkpoint] Replaying the last {len(data)} of "
+              f"{tail.total} missed bytes of {path}")
+        lines = lines[1:]
+    return Resume(status.st_ino, status.st_size, remainder, lines,
+                  tail.total - len(data))
+
+
+def find_archives(path: str, since: float) -> list[str]:
+    """Return the log archives rotated after ``since``, oldest first."""
+    directory = os.path.dirname(path)
+    archives: list[tuple[float, str]] = []
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    for name in names:
+        if not name.endswith(".log.gz"):
+            continue
+        archive = os.path.join(directory, name)
+        modified = os.path.getmtime(archive)
+        if modified >= since:
+            archives.append((modified, archive))
+    return [archive for _, archive in sorted(archives)]
+
+
+class TailBuffer:
+    """Keeps only the last ``limit`` bytes of everything added to it."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.total = 0
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+
+    @property
+    def overflowed(self) -> bool:
+        return self.total > self.limit
+
+    def add(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        self._chunks.append(chunk)
+        self._size += len(chunk)
+        while self._size - len(self._chunks[0]) >= self.limit:
+            self._size -= len(self._chunks.popleft())
+
+    def read(self, stream: io.BufferedIOBase, offset: int,
+             end: Optional[int] = None) -> None:
+        """
+        Add a stream from offset up to end (or its end), seeking past what
+        would be dropped.
+        """
+        if not isinstance(stream, gzip.GzipFile):
+            size = os.fstat(stream.fileno()).st_size if end is None else end
+            skip = max(offset, size - self.limit)
+            self.total += skip - offset
+            offset = skip
+        stream.seek(offset)
+        while end is None or offset < end:
+            length = READ_SIZE if end is None else min(READ_SIZE,
+                                                       end - offset)
+            chunk = stream.read(length)
+            if not chunk:
+                break
+            self.add(chunk)
+            offset += len(chunk)
+
+    def value(self) -> bytes:
+        return b"".join(self._chunks)[-self.limit:] if self._chunks else b""
@@ -0,0 +1,193 @@
+"""
+Error storms collapsed into one alert per signature.
+
+The first error with a new signature is sent as usual. Later ones are only
+counted, the stack trace lines following any of them are folded into them,
+and every ERROR_ROLLUP_SECONDS one "N more occurrences" message is sent per
+signature that recurred.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from src.listener.signatures import error_signature
+from src.utility import metrics
+from src.utility.notifiers import Severity, notify
+
+load_dotenv()
+ERROR_SIGNATURES_MAX = int(os.getenv("ERROR_SIGNATURES_MAX", "1000"))
+ERROR_ROLLUP_SECONDS = float(os.getenv("ERROR_ROLLUP_SECONDS", "300"))
+SKIP_ERRORS_PATH = os.getenv("SKIP_ERRORS_PATH")
+DEFAULT_SKIP_ERRORS = [
+    "dev.kpherox.vihp.client.jade.VillagerInventoryPlugin",
+]
+MAX_SIGNATURE_LENGTH = 300
+
+Sender = Callable[[str, str, str], None]
+
+OCCURRENCES = metrics.counter("error_occurrences_total",
+                              "Error lines by clustering result",
+                              ("result",))
+SIGNATURES = metrics.gauge("error_signatures",
+                           "Error signatures currently tracked")
+
+
+def load_skip_errors(path: Optional[str] = SKIP_ERRORS_PATH) -> list[str]:
+    """
+    Return the signatures of errors never to send.
+
+    The file holds one error per line, either a signature or an example
+    line, which is normalised the same way. Blank lines and lines starting
+    with # are ignored. Without a file, DEFAULT_SKIP_ERRORS is used.
+    """
+    if not path:
+        entries = DEFAULT_SKIP_ERRORS
+    else:
+        try:
+            entries = Path(path).read_text().splitlines()
+        except OSError as e:
+            print(f"[errors] Error reading {path}: {e}")
+            entries = DEFAULT_SKIP_ERRORS
+    return [error_signature(entry.strip()) for entry in entries
+            if entry.strip() and not entry.lstrip().startswith("#")]
+
+
+SKIP_ERRORS = load_skip_errors()
+
+
+def is_suppressed(signature: str) -> bool:
+    """Return True if a signature contains an entry of SKIP_ERRORS."""
+    return any(skip in signature for skip in SKIP_ERRORS)
+
+
+def send_rollup(name: str, message: str, summary: str) -> None:
+    notify(name, message, summary, Severity.WARNING)
+
+
+class ErrorCluster:
+    """Occurrences of one error signature on one server."""
+
+    __slots__ = ("server", "signature", "total", "pending", "since")
+
+    def __init__(self, server: str, signature: str, since: float):
+        self.server = server
+        self.signature = signature
+        self.total = 1
+        self.pending = 0
+        self.since = since
+
+    def rollup(self) -> tuple[str, str]:
+        """Return the message for the occurrences not reported yet."""
+        signature = self.signature[:MAX_SIGNATURE_LENGTH]
+        since = time.strftime("%H:%M", time.localtime(self.since))
+        return (f"🔁 {self.pending} more occurrences since {since} "
+                f"({self.total} in total) of `{signature}`",
+                "🔁 Repeated Server Error")
+
+
+class ErrorClusters:
+    """
+    Counts errors per server and signature in a bounded LRU.
+
+    The stack trace lines after an error are folded into it until the
+    server logs anything else, so they are neither sent nor counted as
+    occurrences. Clusters evicted from the LRU send their pending rollup
+    first.
+    """
+
+    def __init__(self, send: Sender = send_rollup,
+                 max_signatures: int = ERROR_SIGNATURES_MAX,
+                 rollup_seconds: float = ERROR_ROLLUP_SECONDS):
+        self.send = send
+        self.max_signatures = max_signatures
+        self.rollup_seconds = rollup_seconds
+        self._clusters: OrderedDict[tuple[str, str], ErrorCluster] = (
+            OrderedDict()
+        )
+        self._traced: set[str] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def admit(self, server: str, signature: str) -> bool:
+        """
+        Count an error line by its signature; return True if it should be
+        sent now.
+        """
+        now = time.time()
+        evicted: list[ErrorCluster] = []
+        key = (server, signature)
+        with self._lock:
+            self._traced.add(server)
+            cluster = self._clusters.get(key)
+            if cluster is not None:
+                cluster.total += 1
+                cluster.pending += 1
+                self._clusters.move_to_end(key)
+            else:
+                self._clusters[key] = ErrorCluster(server, key[1], now)
+                while len(self._clusters) > self.max_signatures:
+                    evicted.append(self._clusters.popitem(last=False)[1])
+        for old in evicted:
+            self._send_rollup(old)
+        self.start()
+
+        OCCURRENCES.inc("folded" if cluster is not None else "first")
+        return cluster is None
+
+    def fold(self, server: str) -> bool:
+        """
+        Fold a stack trace line into the error before it; return False if
+        the server's last line was not part of an error.
+        """
+        with self._lock:
+            if server not in self._traced:
+                return False
+        OCCURRENCES.inc("trace")
+        return True
+
+    def end_trace(self, server: str) -> None:
+        """Note that a server logged a line that is not part of an error."""
+        with self._lock:
+            self._traced.discard(server)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None and self.rollup_seconds > 0:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+
+    def flush(self) -> None:
+        """Send a rollup for every signature that recurred since the last."""
+        with self._lock:
+            due = [cluster for cluster in self._clusters.values()
+                   if cluster.pending]
+        for cluster in due:
+            self._send_rollup(cluster)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._clusters)
+
+    def _send_rollup(self, cluster: ErrorCluster) -> None:
+        with self._lock:
+            if not cluster.pending:
+                return
+            message, summary = cluster.rollup()
+            cluster.pending = 0
+            cluster.since = time.time()
+        self.send(cluster.server, message, summary)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.rollup_seconds)
+            self.flush()
+
+
+ERROR_CLUSTERS = ErrorClusters()
+SIGNATURES.set_function(ERROR_CLUSTERS.count)
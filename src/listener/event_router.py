@@ -1,52 +1,148 @@
 import re
+from typing import Callable, Optional
 
-from src.utility.slack_notifier import send_to_slack
+from src.listener.error_clusters import ERROR_CLUSTERS, is_suppressed
+from src.listener.signatures import record_signature
+from src.utility import metrics
+from src.utility.log_parser import LogRecord
+from src.utility.notifiers import Severity, notify
+
+EventHandler = Callable[[LogRecord], tuple[str, str]]
 
 
 class SkipLogLine(Exception):
     """Raised when a log line should be skipped entirely"""
 
 
-EVENT_HANDLERS = {}
-SKIP_ERRORS = [
-    "dev.kpherox.vihp.client.jade.VillagerInventoryPlugin",
-]
+EVENT_HANDLERS: dict[str, EventHandler] = {}
+EVENT_SEVERITIES: dict[str, Severity] = {}
+# Every line containing one of these is read; the rest are skipped unread.
+TRIGGERS: list[str] = []
+EVENTS = metrics.counter("listener_events_total",
+                         "Lines matched per trigger and handler outcome",
+                         ("trigger", "outcome"))
+
+LOGIN_PATTERN = re.compile(r"(.+)\[\/([^\]]+)\] logged in with "
+                           r"entity id \d+ at \(([^)]+)\)")
+LOST_CONNECTION_PATTERN = re.compile(r"(.*) lost connection: (.+)")
 
 
-def register_event(trigger: str):
-    def decorator(func):
+def register_event(
+        trigger: str, severity: Severity = Severity.INFO
+) -> Callable[[EventHandler], EventHandler]:
+    def decorator(func: EventHandler) -> EventHandler:
         EVENT_HANDLERS[trigger] = func
+        EVENT_SEVERITIES[trigger] = severity
+        if trigger not in TRIGGERS:
+            TRIGGERS.append(trigger)
         return func
 
     return decorator
 
 
-def route_event(name: str, line: str) -> None:
-    for trigger, handler in EVENT_HANDLERS.items():
-        if trigger not in line:
-            continue
+def match_trigger(line: str) -> Optional[str]:
+    """
+    Return the first registered event trigger contained in a line, or
+    None.
+    """
+    for trigger in EVENT_HANDLERS:
+        if trigger in line:
+            return trigger
+    return None
+
+
+def resolve_trigger(
+        record: LogRecord
+) -> Optional[tuple[str, str, str, str]]:
+    """
+    Return the trigger, message, summary and error signature for a line,
+    or None to ignore it. The signature is only worked out for ERROR
+    lines, which are skipped when it is suppressed; it is empty otherwise.
+    """
+    trigger = match_trigger(record.line)
+    if trigger is None:
+        return None
+
+    signature = ""
+    try:
+        if trigger == "ERROR":
+            signature = record_signature(record)
+            if is_suppressed(signature):
+                raise SkipLogLine("Skipping suppressed error")
+        message, summary = EVENT_HANDLERS[trigger](record)
+    except SkipLogLine:
+        EVENTS.inc(trigger, "skipped")
+        return None
+    EVENTS.inc(trigger, "routed")
+    return trigger, message, summary, signature
+
+
+def resolve_event(record: LogRecord) -> Optional[tuple[str, str]]:
+    """Return the message and summary for a line, or None to ignore it."""
+    resolved = resolve_trigger(record)
+    return None if resolved is None else resolved[1:3]
+
+
+def resolve_notification(
+        name: str, record: LogRecord
+) -> Optional[tuple[str, str, Severity]]:
+    """
+    Return the message, summary and severity to send for a server's line,
+    or None. Only the first of repeated errors is returned, and the stack
+    trace lines after an error are folded into it.
+    """
+    if not record.time and ERROR_CLUSTERS.fold(name):
+        return None
+    resolved = resolve_trigger(record)
+    if resolved is None:
+        ERROR_CLUSTERS.end_trace(name)
+        return None
+
+    trigger, message, summary, signature = resolved
+    if trigger != "ERROR":
+        ERROR_CLUSTERS.end_trace(name)
+    elif not ERROR_CLUSTERS.admit(name, signature):
+        return None
+    return message, summary, EVENT_SEVERITIES[trigger]
+
+
+def route_event(name: str, record: LogRecord,
+                read_at: Optional[float] = None) -> None:
+    notification = resolve_notification(name, record)
+    if notification is not None:
+        notify(name, *notification, read_at)
+
+
+def parse_login_details(
+        record: LogRecord
+) -> Optional[tuple[str, str, str, str]]:
+    """Return (username, edition, address, location) from a login line."""
+    match = LOGIN_PATTERN.match(record.message)
+    if not match:
+        return None
+
+    username = match.group(1).strip()
+    edition = "Bedrock" if username.startswith(".") else "Java"
+    return username, edition, match.group(2).strip(), match.group(3).strip()
 
-        try:
-            message, summary = handler(line)
-            send_to_slack(name, message, summary)
-        except SkipLogLine:
-            pass
 
-        return
+def parse_disconnect_details(record: LogRecord) -> Optional[tuple[str, str]]:
+    """Return (username, reason) from a lost connection line."""
+    if record.thread != "Server thread" or record.level != "INFO":
+        return None
+    match = LOST_CONNECTION_PATTERN.match(record.message)
+    if not match:
+        return None
+    return match.group(1).strip(), match.group(2).strip()
 
 
 @register_event("logged in with entity id")
-def parse_login(line: str) -> tuple[str, str]:
-    pattern = (r".+]: (.+)\[\/([^\]]+)\] logged in with "
-               r"entity id \d+ at \(([^)]+)\)")
-    match = re.search(pattern, line)
-    if not match:
+def parse_login(record: LogRecord) -> tuple[str, str]:
+    details = parse_login_details(record)
+    if details is None:
         return "👋 Unknown user logged in", "❓ Unknown Login"
 
-    username = match.group(1).strip()
-    ip_port = match.group(2).strip()
-    location = match.group(3).strip()
-    player_type = "Bedrock" if username.startswith(".") else "Java"
+    username, player_type, ip_port, location = details
 
     return (
         f"✅ _{player_type}_ player *{username}* "
@@ -55,31 +151,26 @@ def parse_login(line: str) -> tuple[str, str]:
 
 
 @register_event("lost connection")
-def parse_lost_connection(line: str) -> tuple[str, str]:
-    pattern = r"\[Server thread\/INFO]: (.*) lost connection: (.+)"
-    match = re.search(pattern, line)
-    if not match:
+def parse_lost_connection(record: LogRecord) -> tuple[str, str]:
+    details = parse_disconnect_details(record)
+    if details is None:
         return "🚪 Unknown user lost connection", "🔌 Unknown Disconnection"
 
-    username = match.group(1).strip()
-    reason = match.group(2).strip()
+    username, reason = details
 
     return f"🏃‍♀️{username} left: {reason}", "🔴 Player Disconnected"
 
 
 @register_event("geyser help for help")
-def parse_done(line: str) -> tuple[str, str]:
-    return f"🟢 Server ready. {line}", "✅ Server Ready"
+def parse_done(record: LogRecord) -> tuple[str, str]:
+    return f"🟢 Server ready. {record.line}", "✅ Server Ready"
 
 
-@register_event("ERROR")
-def parse_error(line: str) -> tuple[str, str]:
-    for skip in SKIP_ERRORS:
-        if skip in line:
-            raise SkipLogLine(f"Skipping error {skip}")
-    return f"⚠️ {line}", "❌ Server Error"
+@register_event("ERROR", Severity.WARNING)
+def parse_error(record: LogRecord) -> tuple[str, str]:
+    return f"⚠️ {record.line}", "❌ Server Error"
 
 
-@register_event("FATAL")
-def parse_fatal(line: str) -> tuple[str, str]:
-    return f"🛑 {line}", "💀 Server Fatal"
+@register_event("FATAL", Severity.CRITICAL)
+def parse_fatal(record: LogRecord) -> tuple[str, str]:
+    return f"🛑 {record.line}", "💀 Server Fatal"
@@ -0,0 +1,220 @@
+"""
+Server health read from lag, startup and crash lines.
+
+Each server keeps rolling windows of the tick lag it reports in "Can't keep
+up!" lines, its startup times from "Done (Xs)!" and its crashes. Crossing a
+threshold sends one alert, and the same alert for the same server is not
+sent again for HEALTH_ALERT_SECONDS.
+"""
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from dotenv import load_dotenv
+
+from src.listener.event_router import TRIGGERS
+from src.utility import metrics
+from src.utility.notifiers import Severity, notify
+
+load_dotenv()
+HEALTH_LAG_WINDOW = float(os.getenv("HEALTH_LAG_WINDOW", "300"))
+HEALTH_LAG_RATIO = float(os.getenv("HEALTH_LAG_RATIO", "0.2"))
+HEALTH_SLOW_START_SECONDS = float(
+    os.getenv("HEALTH_SLOW_START_SECONDS", "180")
+)
+HEALTH_CRASH_WINDOW = float(os.getenv("HEALTH_CRASH_WINDOW", "3600"))
+HEALTH_CRASHES = int(os.getenv("HEALTH_CRASHES", "2"))
+HEALTH_ALERT_SECONDS = float(os.getenv("HEALTH_ALERT_SECONDS", "900"))
+LAG_SAMPLES = 512
+STARTS = 10
+
+LAG = "Can't keep up!"
+STARTED = "Done ("
+CRASHED = "Preparing crash report"
+HEALTH_TRIGGERS = (LAG, STARTED, CRASHED)
+TRIGGERS.extend(HEALTH_TRIGGERS)
+
+LAG_PATTERN = re.compile(r"Running (\d+)ms or (\d+) ticks behind")
+STARTED_PATTERN = re.compile(r"Done \((\d+(?:\.\d+)?)s\)!")
+
+Sender = Callable[[str, str, str, Severity], None]
+
+LAG_RATIO = metrics.gauge("server_lag_ratio",
+                          "Share of the lag window a server fell behind",
+                          ("server",))
+STARTUP_SECONDS = metrics.histogram(
+    "server_startup_seconds", "Time from launch to Done", ("server",),
+    (10.0, 20.0, 30.0, 60.0, 90.0, 120.0, 180.0, 300.0, 600.0)
+)
+CRASHES = metrics.counter("server_crashes_total", "Crash reports logged",
+                          ("server",))
+ALERTS = metrics.counter("health_alerts_total", "Health alerts sent",
+                         ("kind",))
+
+
+class ServerHealth:
+    """Rolling lag, startup and crash history of one server."""
+
+    __slots__ = ("lag", "lag_ms", "lag_ticks", "starts", "crashes")
+
+    def __init__(self) -> None:
+        self.lag: deque[tuple[float, int, int]] = deque()
+        self.lag_ms = 0
+        self.lag_ticks = 0
+        self.starts: deque[float] = deque(maxlen=STARTS)
+        self.crashes: deque[float] = deque()
+
+    def add_lag(self, at: float, ms: int, ticks: int) -> None:
+        if len(self.lag) >= LAG_SAMPLES:
+            self._drop_lag()
+        self.lag.append((at, ms, ticks))
+        self.lag_ms += ms
+        self.lag_ticks += ticks
+
+    def lag_ratio(self, now: float, window: float) -> float:
+        """Return the share of the last ``window`` seconds spent behind."""
+        while self.lag and self.lag[0][0] < now - window:
+            self._drop_lag()
+        return self.lag_ms / (window * 1000)
+
+    def crashes_since(self, since: float) -> int:
+        while self.crashes and self.crashes[0] < since:
+            self.crashes.popleft()
+        return len(self.crashes)
+
+    def _drop_lag(self) -> None:
+        _, ms, ticks = self.lag.popleft()
+        self.lag_ms -= ms
+        self.lag_ticks -= ticks
+
+
+def send_health_alert(name: str, message: str, summary: str,
+                      severity: Severity) -> None:
+    notify(name, message, summary, severity)
+
+
+class HealthMonitor:
+    """
+    Watches every server's lines for signs of trouble.
+
+    ``handle`` takes the raw line so that the only cost for other lines is
+    the three substring checks of HEALTH_TRIGGERS.
+    """
+
+    def __init__(self, send: Sender = send_health_alert,
+                 lag_window: float = HEALTH_LAG_WINDOW,
+                 lag_ratio: float = HEALTH_LAG_RATIO,
+                 slow_start: float = HEALTH_SLOW_START_SECONDS,
+                 crash_window: float = HEALTH_CRASH_WINDOW,
+                 crashes: int = HEALTH_CRASHES,
+                 alert_seconds: float = HEALTH_ALERT_SECONDS):
+        self.send = send
+        self.lag_window = lag_window
+        self.lag_threshold = lag_ratio
+        self.slow_start = slow_start
+        self.crash_window = crash_window
+        self.crash_threshold = crashes
+        self.alert_seconds = alert_seconds
+        self._servers: dict[str, ServerHealth] = {}
+        self._alerted: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, server: str, line: str,
+               at: Optional[float] = None) -> bool:
+        """
+        Update a server's health from one line. Returns True for lag lines,
+        which need no further handling.
+        """
+        if LAG in line:
+            self._lag(server, line, time.time() if at is None else at)
+            return True
+        if STARTED in line:
+            self._started(server, line, time.time() if at is None else at)
+        elif CRASHED in line:
+            self._crashed(server, time.time() if at is None else at)
+        return False
+
+    def lag_ratio(self, server: str, now: Optional[float] = None) -> float:
+        with self._lock:
+            health = self._servers.get(server)
+            if health is None:
+                return 0.0
+            return health.lag_ratio(time.time() if now is None else now,
+                                    self.lag_window)
+
+    def _health(self, server: str) -> ServerHealth:
+        health = self._servers.get(server)
+        if health is None:
+            health = self._servers[server] = ServerHealth()
+            LAG_RATIO.set_function(lambda: self.lag_ratio(server), server)
+        return health
+
+    def _lag(self, server: str, line: str, now: float) -> None:
+        match = LAG_PATTERN.search(line)
+        if match is None:
+            return
+        with self._lock:
+            health = self._health(server)
+            health.add_lag(now, int(match.group(1)), int(match.group(2)))
+            ratio = health.lag_ratio(now, self.lag_window)
+            ticks = health.lag_ticks
+        if ratio >= self.lag_threshold:
+            minutes = self.lag_window / 60
+            self._alert(server, "lag", now,
+                        f"🐢 *{server}* is {ratio:.0%} behind over the last "
+                        f"{minutes:g} minutes ({ticks} ticks skipped)",
+                        "🐢 Server Lagging", Severity.WARNING)
+
+    def _started(self, server: str, line: str, now: float) -> None:
+        match = STARTED_PATTERN.search(line)
+        if match is None:
+            return
+        seconds = float(match.group(1))
+        STARTUP_SECONDS.observe(seconds, server)
+        with self._lock:
+            starts = self._health(server).starts
+            usual = sorted(starts)[len(starts) // 2] if starts else None
+            starts.append(seconds)
+        if seconds >= self.slow_start:
+            usual_text = f" (usually {usual:.0f}s)" if usual else ""
+            self._alert(server, "startup", now,
+                        f"🐌 *{server}* took {seconds:.0f}s to start"
+                        f"{usual_text}", "🐌 Slow Startup", Severity.WARNING)
+
+    def _crashed(self, server: str, now: float) -> None:
+        CRASHES.inc(server)
+        with self._lock:
+            health = self._health(server)
+            health.crashes.append(now)
+            count = health.crashes_since(now - self.crash_window)
+        if count >= self.crash_threshold:
+            minutes = self.crash_window / 60
+            self._alert(server, "crashes", now,
+                        f"💥 *{server}* crashed {count} times in the last "
+                        f"{minutes:g} minutes", "💥 Repeated Crashes",
+                        Severity.CRITICAL)
+
+    def _alert(self, server: str, kind: str, now: float, message: str,
+               summary: str, severity: Severity) -> None:
+        with self._lock:
+            last = self._alerted.get((server, kind))
+            if last is not None and now - last < self.alert_seconds:
+                return
+            self._alerted[(server, kind)] = now
+        ALERTS.inc(kind)
+        self.send(server, message, summary, severity)
+
+
+_MONITOR: Optional[HealthMonitor] = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def get_monitor() -> HealthMonitor:
+    global _MONITOR
+    with _MONITOR_LOCK:
+        if _MONITOR is None:
+            _MONITOR = HealthMonitor()
+        return _MONITOR
@@ -1,37 +1,220 @@
 import os
+import threading
+import time
+from typing import Callable, Iterable, Optional
 
 from dotenv import load_dotenv
 from inotify_simple import INotify, flags  # type: ignore[import-untyped]
 
+from src.listener.checkpoint import CheckpointStore, plan_resume
+from src.listener.line_framer import LineFramer
+
 load_dotenv()
 LOG_PATH = os.getenv("LOG_PATH", "/logs/latest.log")
-LOG_DIR = os.path.dirname(LOG_PATH)
-LOG_NAME = os.path.basename(LOG_PATH)
 
+REPLACE_FLAGS = flags.CREATE | flags.MOVED_TO
+WATCH_FLAGS = flags.MODIFY | REPLACE_FLAGS
 
-def main() -> None:
-    print(f"[inotify] Watching {LOG_PATH}")
-    inotify = INotify()
-    watch_flags = (flags.MODIFY | flags.CLOSE_WRITE | flags.MOVE_SELF
-                   | flags.DELETE_SELF)
-    inotify.add_watch(LOG_DIR, watch_flags)
-
-    try:
-        last_position = os.path.getsize(LOG_PATH)
-    except FileNotFoundError:
-        last_position = 0
-
-    while True:
-        for event in inotify.read(timeout=1000):
-            if event.name != LOG_NAME:
-                continue
+
+class FollowedLog:
+    """Read state for one log file followed by an InotifyFollower."""
+
+    def __init__(self, path: str, handler: Callable[[str], None],
+                 triggers: Optional[Iterable[str]] = None):
+        self.path = path
+        self.handler = handler
+        self.framer = LineFramer(triggers)
+        self.fd: Optional[int] = None
+        self.inode = 0
+        self.offset = 0
+        self.error: Optional[str] = None
+
+
+class InotifyFollower:
+    """
+    Follows many log files from one inotify file descriptor.
+
+    Each log's directory is watched, so rotation (a new file created or
+    moved into place) and truncation are handled like ``tail -F``: the old
+    file is drained, then the new file is read from the start.
+
+    With a CheckpointStore, each log's position is recorded as it is read,
+    and logs added later resume from their checkpoint instead of the end.
+    Given triggers, only lines containing one of them are handled.
+
+    An error reading one log is logged once and retried on the next event
+    or check, so it never stops the other logs being followed.
+    """
+
+    def __init__(self, check_seconds: float = 1.0,
+                 checkpoints: Optional[CheckpointStore] = None,
+                 triggers: Optional[Iterable[str]] = None):
+        self._inotify = INotify()
+        self._checkpoints = checkpoints
+        self._triggers = triggers
+        self._logs: dict[int, dict[str, FollowedLog]] = {}
+        self._check_seconds = check_seconds
+        self._last_check = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, path: str, handler: Callable[[str], None]) -> None:
+        """Follow a log file from its checkpoint or its current end."""
+        directory, name = os.path.split(path)
+        with self._lock:
+            descriptor = self._inotify.add_watch(directory, WATCH_FLAGS)
+            log = FollowedLog(path, handler, self._triggers)
+            self._logs.setdefault(descriptor, {})[name] = log
+            self._open(log, at_end=True)
+            if self._checkpoints is not None:
+                self._resume(log, self._checkpoints)
+        print(f"[inotify] Watching {path}")
+
+    def remove(self, path: str) -> None:
+        """Stop following a log file."""
+        directory, name = os.path.split(path)
+        with self._lock:
+            for descriptor, logs in list(self._logs.items()):
+                log = logs.get(name)
+                if log is None or log.path != path:
+                    continue
+                del logs[name]
+                if log.fd is not None:
+                    os.close(log.fd)
+                if not logs:
+                    del self._logs[descriptor]
+                    try:
+                        self._inotify.rm_watch(descriptor)
+                    except OSError:
+                        pass
+        print(f"[inotify] Stopped watching {path}")
+
+    def run(self) -> None:
+        """Process events forever."""
+        while True:
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"[inotify] Error reading events: {e}")
+                time.sleep(self._check_seconds)
+
+    def poll(self) -> None:
+        """Process one batch of inotify events."""
+        timeout = int(self._check_seconds * 1000)
+        events = self._inotify.read(timeout=timeout)
+        with self._lock:
+            for event in events:
+                log = self._logs.get(event.wd, {}).get(event.name)
+                if log is None:
+                    continue
+                if event.mask & REPLACE_FLAGS:
+                    self._follow(log, self._reopen)
+                elif event.mask & flags.MODIFY:
+                    self._follow(log, self._read)
+
+            if time.monotonic() - self._last_check >= self._check_seconds:
+                self._check_all()
+
+    def _check_all(self) -> None:
+        """Catch rotations and writes that arrived without an event."""
+        self._last_check = time.monotonic()
+        for logs in self._logs.values():
+            for log in logs.values():
+                self._follow(log, self._check)
+
+    def _check(self, log: FollowedLog) -> None:
+        try:
+            status = os.stat(log.path)
+        except FileNotFoundError:
+            return
+        if log.fd is None or status.st_ino != log.inode:
+            self._reopen(log)
+        elif status.st_size != log.offset:
+            self._read(log)
+
+    def _follow(self, log: FollowedLog,
+                step: Callable[[FollowedLog], None]) -> None:
+        """Run one step for a log, keeping its errors to that log."""
+        try:
+            step(log)
+        except OSError as e:
+            if str(e) != log.error:
+                print(f"[inotify] Error following {log.path}: {e}")
+            log.error = str(e)
+            return
+        if log.error is not None:
+            print(f"[inotify] Following {log.path} again")
+            log.error = None
+
+    def _open(self, log: FollowedLog, at_end: bool) -> None:
+        try:
+            log.fd = os.open(log.path, os.O_RDONLY)
+        except FileNotFoundError:
+            log.fd = None
+            return
+
+        status = os.fstat(log.fd)
+        log.inode = status.st_ino
+        log.offset = status.st_size if at_end else 0
+        log.framer.reset()
+
+    def _resume(self, log: FollowedLog, checkpoints: CheckpointStore) -> None:
+        resume = plan_resume(log.path, checkpoints.get(log.path))
+        if log.fd is None or resume.inode != log.inode:
+            return
+
+        log.framer.feed(b"".join(raw + b"\n" for raw in resume.lines))
+        self._handle(log)
+        log.offset = resume.offset
+        log.framer.reset(resume.partial)
+        self._read(log)
+
+    def _reopen(self, log: FollowedLog) -> None:
+        if log.fd is not None:
+            self._read(log)
+            os.close(log.fd)
+            log.fd = None
+            print(f"[inotify] {log.path} has been replaced; "
+                  "following new file")
+        self._open(log, at_end=False)
+        self._read(log)
+
+    def _read(self, log: FollowedLog) -> None:
+        if log.fd is None:
+            return
+
+        if os.fstat(log.fd).st_size < log.offset:
+            print(f"[inotify] {log.path}: file truncated")
+            log.offset = 0
+            log.framer.reset()
+
+        fd = log.fd
+        while True:
+            count = log.framer.fill(
+                lambda view: os.preadv(fd, [view], log.offset)
+            )
+            if not count:
+                break
+            log.offset += count
+            self._handle(log)
+
+        if self._checkpoints is not None:
+            self._checkpoints.update(log.path, log.inode, log.offset,
+                                     log.framer.partial)
+
+    def _handle(self, log: FollowedLog) -> None:
+        for line in log.framer.lines():
             try:
-                with open(LOG_PATH, "r") as f:
-                    f.seek(last_position)
-                    new_data = f.read()
-                    last_position = f.tell()
-                    for line in new_data.splitlines():
-                        if "event test" in line:
-                            print(f"[inotify] Match: {line.strip()}")
+                log.handler(line)
             except Exception as e:
-                print(f"[inotify] Error: {e}")
+                print(f"[inotify] Error handling {log.path}: {e}")
+
+
+def print_match(line: str) -> None:
+    if "event test" in line:
+        print(f"[inotify] Match: {line.strip()}")
+
+
+def main() -> None:
+    follower = InotifyFollower()
+    follower.add(LOG_PATH, print_match)
+    follower.run()
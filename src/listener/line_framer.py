@@ -0,0 +1,170 @@
+"""
+Incremental line framing over a reusable byte buffer.
+"""
+from typing import Callable, Iterable, Iterator, Optional
+
+from src.utility import metrics
+
+READ_SIZE = 64 * 1024
+MAX_LINE_BYTES = 1024 * 1024
+Reader = Callable[[memoryview], Optional[int]]
+
+LONG_LINES = metrics.counter("listener_long_lines_total",
+                             "Lines dropped for exceeding MAX_LINE_BYTES")
+
+
+class LineFramer:
+    """
+    Splits raw reads into lines without copying the bytes it skips.
+
+    Reads land directly in a reusable ``bytearray`` through ``readinto``
+    style callables. A line split across reads stays in the buffer until
+    its newline arrives. Given triggers, only lines containing one of them
+    are decoded; the search runs over the raw bytes of the whole read, so
+    routine lines are never copied or decoded at all. Lines without a
+    ``[`` prefix right after a decoded line, such as a stack trace, are
+    decoded with it.
+
+    The buffer grows to fit long lines, but a line still without its
+    newline after ``max_line`` bytes is dropped up to its newline and
+    counted in ``dropped``, so input without newlines cannot grow the
+    buffer without limit.
+    """
+
+    def __init__(self, triggers: Optional[Iterable[str]] = None,
+                 size: int = READ_SIZE, max_line: int = MAX_LINE_BYTES):
+        self.triggers = (None if triggers is None
+                         else tuple(trigger.encode() for trigger in triggers))
+        self.max_line = max_line
+        self.dropped = 0
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._skipping = False
+        self._continuing = False
+
+    @property
+    def partial(self) -> bytes:
+        """The bytes of the incomplete last line."""
+        return bytes(self._view[self._start:self._end])
+
+    def reset(self, partial: bytes = b"") -> None:
+        """Forget buffered bytes, optionally starting from a partial line."""
+        self._start = self._end = 0
+        self._skipping = False
+        self._continuing = False
+        self.feed(partial)
+
+    def fill(self, read: Reader) -> int:
+        """Read once into the free end of the buffer; 0 means no data."""
+        self._compact()
+        if self._end == len(self._buffer):
+            line_start = self._buffer.rfind(b"\n", 0, self._end) + 1
+            if self._end - line_start >= self.max_line:
+                self._drop_partial(line_start)
+            else:
+                self._grow()
+        count = read(self._view[self._end:]) or 0
+        if self._skipping:
+            self._skip_long_line(self._end, self._end + count)
+        else:
+            self._end += count
+        return count
+
+    def feed(self, data: bytes) -> None:
+        """Append bytes that were read some other way."""
+        position = 0
+        while position < len(data):
+            def copy(view: memoryview) -> int:
+                size = min(len(view), len(data) - position)
+                view[:size] = data[position:position + size]
+                return size
+            position += self.fill(copy)
+
+    def lines(self) -> Iterator[str]:
+        """Yield the complete lines buffered so far, consuming them."""
+        buffer = self._buffer
+        start = self._start
+        last = buffer.rfind(b"\n", start, self._end)
+        if last < 0:
+            return
+        self._start = last + 1
+
+        if self.triggers is None:
+            text = str(self._view[start:last + 1], "utf-8", "replace")
+            if "\r" in text:
+                text = text.replace("\r\n", "\n")
+            lines = text.split("\n")
+            lines.pop()
+            yield from lines
+            return
+
+        cursor = start
+        for begin, stop in sorted(self._matching(start, last)):
+            if self._continuing:
+                yield from self._continuation(cursor, begin)
+            yield self._decode(begin, stop)
+            cursor = stop + 1
+            self._continuing = True
+        if self._continuing:
+            yield from self._continuation(cursor, last + 1)
+
+    def _matching(self, start: int, last: int) -> set[tuple[int, int]]:
+        """Find the bounds of lines in start..last containing a trigger."""
+        assert self.triggers is not None
+        buffer = self._buffer
+        found: set[tuple[int, int]] = set()
+        for trigger in self.triggers:
+            position = buffer.find(trigger, start, last)
+            while position >= 0:
+                begin = buffer.rfind(b"\n", start, position) + 1 or start
+                stop = buffer.find(b"\n", position, last + 1)
+                found.add((begin, stop))
+                position = buffer.find(trigger, stop, last)
+        return found
+
+    def _continuation(self, begin: int, end: int) -> Iterator[str]:
+        """Yield the lines from begin that continue the line before it."""
+        buffer = self._buffer
+        while begin < end:
+            stop = buffer.find(b"\n", begin, end)
+            if stop == begin or buffer[begin] == ord("["):
+                self._continuing = False
+                return
+            yield self._decode(begin, stop)
+            begin = stop + 1
+
+    def _decode(self, start: int, stop: int) -> str:
+        return str(self._view[start:stop], "utf-8", "replace").rstrip("\r")
+
+    def _compact(self) -> None:
+        if self._start == 0:
+            return
+        remaining = self._end - self._start
+        self._buffer[:remaining] = self._buffer[self._start:self._end]
+        self._start, self._end = 0, remaining
+
+    def _grow(self) -> None:
+        """Double the buffer to fit a line longer than it."""
+        self._buffer = self._buffer + bytearray(len(self._buffer))
+        self._view = memoryview(self._buffer)
+
+    def _drop_partial(self, line_start: int) -> None:
+        """Discard a partial line that has reached max_line bytes."""
+        self.dropped += 1
+        LONG_LINES.inc()
+        print(f"[framer] Dropping a line over {self.max_line} bytes")
+        self._end = line_start
+        self._skipping = True
+        self._continuing = False
+
+    def _skip_long_line(self, begin: int, stop: int) -> None:
+        """Discard newly read bytes up to the dropped line's newline."""
+        newline = self._buffer.find(b"\n", begin, stop)
+        if newline < 0:
+            return
+        kept = stop - newline - 1
+        self._buffer[begin:begin + kept] = self._buffer[newline + 1:stop]
+        self._end = begin + kept
+        self._skipping = False
@@ -1,8 +1,11 @@
 import os
-import time
+import threading
+from typing import Generator, Iterable, Optional
 
 from dotenv import load_dotenv
 
+from src.listener.line_framer import LineFramer
+
 load_dotenv()
 LOG_PATH = os.getenv("LOG_PATH", "/logs/latest.log")
 
@@ -14,24 +17,38 @@ def get_initial_offset(path: str) -> int:
         return 0
 
 
-def main():
-    print(f"[polling] Watching {LOG_PATH}")
-    last_size = get_initial_offset(LOG_PATH)
+def poll_log(path: str, interval: float = 1.0,
+             stop: Optional[threading.Event] = None,
+             triggers: Optional[Iterable[str]] = None
+             ) -> Generator[str, None, None]:
+    """Generator that polls a log file and yields appended lines."""
+    print(f"[polling] Watching {path}")
+    last_size = get_initial_offset(path)
+    framer = LineFramer(triggers)
+    stop = stop or threading.Event()
 
-    while True:
+    while not stop.is_set():
         try:
-            current_size = os.path.getsize(LOG_PATH)
+            current_size = os.path.getsize(path)
+            if current_size < last_size:
+                print(f"[polling] {path}: file truncated")
+                last_size = 0
+                framer.reset()
             if current_size > last_size:
-                with open(LOG_PATH, "r") as f:
+                with open(path, "rb", buffering=0) as f:
                     f.seek(last_size)
-                    new_data = f.read()
-                    for line in new_data.splitlines():
-                        if "event test" in line:
-                            print(f"[polling] Match: {line.strip()}")
-                last_size = current_size
+                    while count := framer.fill(f.readinto):
+                        last_size += count
+                        yield from framer.lines()
         except FileNotFoundError:
             pass
-        time.sleep(1)
+        stop.wait(interval)
+
+
+def main():
+    for line in poll_log(LOG_PATH):
+        if "event test" in line:
+            print(f"[polling] Match: {line.strip()}")
 
 
 if __name__ == "__main__":
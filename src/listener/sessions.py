@@ -0,0 +1,351 @@
+"""
+Player sessions tracked from login and disconnect lines.
+
+Run with: python -m src.listener.sessions online|playtime|rebuild
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, Optional
+
+from dotenv import load_dotenv
+
+from src.listener.archives import list_archives, read_archive
+from src.listener.event_router import (TRIGGERS, parse_disconnect_details,
+                                       parse_login_details)
+from src.utility.log_parser import LogRecord
+from src.utility.server_discovery import get_registry
+
+load_dotenv()
+SESSIONS_PATH = os.getenv("SESSIONS_PATH")
+RAW_DAYS = 7
+COMPACT_INTERVAL = 24 * 3600
+
+LOGIN = "logged in with entity id"
+LOST_CONNECTION = "lost connection"
+STOPPING = "Stopping the server"
+READY = "geyser help for help"
+SESSION_TRIGGERS = (LOGIN, LOST_CONNECTION, STOPPING, READY)
+TRIGGERS.append(STOPPING)
+
+SessionEvent = tuple[float, LogRecord]
+
+
+class PlayerSession:
+    """One player's stay on a server."""
+
+    __slots__ = ("server", "player", "edition", "address", "position",
+                 "joined")
+
+    def __init__(self, server: str, player: str, edition: str,
+                 address: str, position: str, joined: float):
+        self.server = server
+        self.player = player
+        self.edition = edition
+        self.address = address
+        self.position = position
+        self.joined = joined
+
+    def __repr__(self) -> str:
+        return (f"PlayerSession({self.server!r}, {self.player!r}, "
+                f"joined={self.joined})")
+
+
+class SessionStore:
+    """
+    Keeps open and finished sessions in SQLite.
+
+    Finished sessions stay as rows for RAW_DAYS. ``compact`` then folds them
+    into one playtime row per player and day, and returns the freed pages
+    to the file system, so the store stays small and playtime queries only
+    sum a few rows per player.
+    """
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS online (
+                server TEXT NOT NULL,
+                player TEXT NOT NULL,
+                edition TEXT NOT NULL,
+                address TEXT NOT NULL,
+                position TEXT NOT NULL,
+                joined REAL NOT NULL,
+                PRIMARY KEY (server, player)
+            );
+            CREATE TABLE IF NOT EXISTS sessions (
+                server TEXT NOT NULL,
+                player TEXT NOT NULL,
+                joined REAL NOT NULL,
+                left REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_left ON sessions (left);
+            CREATE TABLE IF NOT EXISTS daily (
+                server TEXT NOT NULL,
+                player TEXT NOT NULL,
+                day TEXT NOT NULL,
+                seconds REAL NOT NULL,
+                PRIMARY KEY (server, player, day)
+            );
+        """)
+        self._connection.commit()
+
+    def begin(self, session: PlayerSession) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO online VALUES (?, ?, ?, ?, ?, ?)",
+                (session.server, session.player, session.edition,
+                 session.address, session.position, session.joined)
+            )
+            self._connection.commit()
+
+    def end(self, session: PlayerSession, left: float) -> None:
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM online WHERE server = ? AND player = ?",
+                (session.server, session.player)
+            )
+            self._connection.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?)",
+                (session.server, session.player, session.joined, left)
+            )
+            self._connection.commit()
+
+    def online(self, server: Optional[str] = None) -> list[PlayerSession]:
+        query = "SELECT * FROM online"
+        parameters: tuple[str, ...] = ()
+        if server is not None:
+            query += " WHERE server = ?"
+            parameters = (server,)
+        with self._lock:
+            rows = self._connection.execute(
+                query + " ORDER BY server, joined", parameters
+            ).fetchall()
+        return [PlayerSession(*row) for row in rows]
+
+    def playtime(self, days: float, server: Optional[str] = None,
+                 now: Optional[float] = None) -> dict[str, float]:
+        """
+        Return seconds played per player over the last ``days`` days,
+        counting open sessions up to now. Compacted days count whole.
+        """
+        now = time.time() if now is None else now
+        since = now - days * 86400
+        where = "" if server is None else " AND server = :server"
+        parameters = {"since": since, "now": now, "server": server}
+        with self._lock:
+            rows = self._connection.execute(f"""
+                SELECT player, SUM(seconds) FROM (
+                    SELECT player, left - MAX(joined, :since) AS seconds
+                    FROM sessions WHERE left > :since{where}
+                    UNION ALL
+                    SELECT player, :now - MAX(joined, :since)
+                    FROM online WHERE 1{where}
+                    UNION ALL
+                    SELECT player, seconds FROM daily
+                    WHERE day >= date(:since, 'unixepoch'){where}
+                )
+                GROUP BY player ORDER BY SUM(seconds) DESC
+            """, parameters).fetchall()
+        return {player: seconds for player, seconds in rows}
+
+    def compact(self, now: Optional[float] = None,
+                keep_days: float = RAW_DAYS) -> int:
+        """Fold sessions that ended before keep_days ago into daily rows."""
+        before = (time.time() if now is None else now) - keep_days * 86400
+        with self._lock, self._connection:
+            self._connection.execute("""
+                INSERT INTO daily (server, player, day, seconds)
+                SELECT server, player, date(left, 'unixepoch'),
+                       SUM(left - joined)
+                FROM sessions WHERE left < ?
+                GROUP BY server, player, date(left, 'unixepoch')
+                ON CONFLICT (server, player, day)
+                DO UPDATE SET seconds = seconds + excluded.seconds
+            """, (before,))
+            folded = self._connection.execute(
+                "DELETE FROM sessions WHERE left < ?", (before,)
+            ).rowcount
+        with self._lock:
+            self._connection.execute("PRAGMA incremental_vacuum")
+        return folded
+
+    def clear(self, server: str) -> None:
+        """Forget everything recorded for a server."""
+        with self._lock, self._connection:
+            for table in ("online", "sessions", "daily"):
+                self._connection.execute(
+                    f"DELETE FROM {table} WHERE server = ?",  # nosec[B608]
+                    (server,)
+                )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class SessionTracker:
+    """
+    Follows who is online from each server's log lines.
+
+    A login opens a session and a disconnect closes it. A server stopping
+    closes every session on it, and a server becoming ready closes any left
+    open by a crash.
+    """
+
+    def __init__(self, store: SessionStore):
+        self.store = store
+        self._online = {(session.server, session.player): session
+                        for session in store.online()}
+        self._lock = threading.Lock()
+        self._compacted = 0.0
+
+    def handle(self, server: str, record: LogRecord,
+               at: Optional[float] = None) -> None:
+        """Update the sessions from one log line."""
+        message = record.message
+        if LOGIN in message:
+            self._login(server, record, at)
+        elif LOST_CONNECTION in message:
+            self._disconnect(server, record, at)
+        elif STOPPING in message or READY in message:
+            self.end_all(server, time.time() if at is None else at)
+
+    def online(self, server: Optional[str] = None) -> list[PlayerSession]:
+        with self._lock:
+            return sorted(
+                (session for session in self._online.values()
+                 if server is None or session.server == server),
+                key=lambda session: (session.server, session.joined)
+            )
+
+    def end_all(self, server: str, left: float) -> None:
+        with self._lock:
+            ended = [key for key in self._online if key[0] == server]
+            for key in ended:
+                self.store.end(self._online.pop(key), left)
+
+    def _login(self, server: str, record: LogRecord,
+               at: Optional[float]) -> None:
+        details = parse_login_details(record)
+        if details is None:
+            return
+        player, edition, address, position = details
+        session = PlayerSession(server, player, edition, address, position,
+                                time.time() if at is None else at)
+        with self._lock:
+            previous = self._online.pop((server, player), None)
+            if previous is not None:
+                self.store.end(previous, session.joined)
+            self._online[(server, player)] = session
+            self.store.begin(session)
+
+    def _disconnect(self, server: str, record: LogRecord,
+                    at: Optional[float]) -> None:
+        details = parse_disconnect_details(record)
+        if details is None:
+            return
+        left = time.time() if at is None else at
+        with self._lock:
+            session = self._online.pop((server, details[0]), None)
+            if session is None:
+                return
+            self.store.end(session, left)
+            if left - self._compacted >= COMPACT_INTERVAL:
+                self._compacted = left
+                self.store.compact(left)
+
+
+_TRACKER: Optional[SessionTracker] = None
+
+
+def get_tracker() -> Optional[SessionTracker]:
+    """Return the shared tracker, or None when SESSIONS_PATH is unset."""
+    global _TRACKER
+    if _TRACKER is None and SESSIONS_PATH:
+        _TRACKER = SessionTracker(SessionStore(Path(SESSIONS_PATH)))
+    return _TRACKER
+
+
+def read_session_events(path: str) -> list[SessionEvent]:
+    """Return the session lines of one archive; runs in a worker process."""
+    return list(read_archive(path, SESSION_TRIGGERS))
+
+
+def rebuild(tracker: SessionTracker, server: str, logs_dir: Path,
+            workers: Optional[int] = None) -> int:
+    """
+    Replace a server's sessions with those found in its rotated logs.
+
+    Archives are decompressed and filtered in parallel, then replayed in
+    order through the tracker. Returns the number of session lines read.
+    """
+    tracker.end_all(server, time.time())
+    tracker.store.clear(server)
+    archives = [str(path) for path in list_archives(logs_dir)]
+    count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for events in pool.map(read_session_events, archives):
+            for at, record in events:
+                tracker.handle(server, record, at)
+            count += len(events)
+            if events:
+                tracker.end_all(server, events[-1][0])
+    tracker.store.compact()
+    return count
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+def iter_servers(only: Optional[str]) -> Iterator[tuple[str, Path]]:
+    for info in get_registry().servers().values():
+        if only is None or info["name"] == only:
+            yield info["name"], Path(info["log_file"]).parent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Minecraft player sessions")
+    parser.add_argument("command", choices=["online", "playtime", "rebuild"])
+    parser.add_argument("--server", help="Only this server (by name)")
+    parser.add_argument("--days", type=float, default=7,
+                        help="Playtime window in days")
+    parser.add_argument("--store", type=Path,
+                        default=Path(SESSIONS_PATH or "sessions.sqlite"),
+                        help="Session store path")
+    parser.add_argument("--workers", type=int,
+                        help="Processes decompressing logs when rebuilding")
+    args = parser.parse_args()
+
+    store = SessionStore(args.store)
+    if args.command == "online":
+        now = time.time()
+        for session in store.online(args.server):
+            print(f"{session.server}: {session.player} "
+                  f"({session.edition}) from {session.address} at "
+                  f"{session.position}, "
+                  f"{format_duration(now - session.joined)}")
+    elif args.command == "playtime":
+        for player, seconds in store.playtime(args.days,
+                                              args.server).items():
+            print(f"{player}: {format_duration(seconds)}")
+    else:
+        tracker = SessionTracker(store)
+        for name, logs_dir in iter_servers(args.server):
+            count = rebuild(tracker, name, logs_dir, args.workers)
+            print(f"{name}: replayed {count} session lines")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
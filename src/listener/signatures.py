@@ -0,0 +1,32 @@
+"""
+Signatures grouping error lines that differ only in their details.
+"""
+import re
+
+from src.utility.log_parser import LogRecord
+
+NUMBER = r"-?\d+(?:\.\d+)?"
+SIGNATURE_PATTERNS = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-"
+                r"[0-9a-f]{12}", re.IGNORECASE), "<uuid>"),
+    (re.compile(rf"(?:x=)?{NUMBER}, ?(?:y=)?{NUMBER}, ?(?:z=)?{NUMBER}",
+                re.IGNORECASE), "<pos>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|(?<=@)[0-9a-f]+\b", re.IGNORECASE),
+     "<hex>"),
+    (re.compile(rf"(?<![\w.]){NUMBER}"), "<n>"),
+]
+
+
+def error_signature(message: str) -> str:
+    """
+    Replace UUIDs, coordinates, hex values and numbers in a message, so
+    errors that differ only in those share a signature.
+    """
+    for pattern, placeholder in SIGNATURE_PATTERNS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def record_signature(record: LogRecord) -> str:
+    """Return the signature of a line, including its thread and logger."""
+    return error_signature(record.body)
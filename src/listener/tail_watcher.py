@@ -1,53 +1,255 @@
+import os
 import subprocess  # nosec[B404]
 import threading
 import time
-from typing import Generator
+from typing import Callable, Generator, Iterable, Optional
 
-from src.listener.event_router import route_event
+from dotenv import load_dotenv
+from watchdog.observers.api import ObservedWatch
+from watchdog.observers.polling import PollingObserver
+
+from src.listener.checkpoint import get_checkpoints
+from src.listener.event_router import TRIGGERS, route_event
+from src.listener.health import get_monitor
+from src.listener.inotify_watcher import InotifyFollower
+from src.listener.line_framer import LineFramer
+from src.listener.manual_polling import poll_log
+from src.listener.sessions import get_tracker
+from src.listener.watchdog_polling import schedule_log
 from src.utility.deduplicator import MessageDeduplicator
-from src.utility.server_discovery import discover_servers
+from src.utility import metrics
+from src.utility.log_parser import LogRecord, parse_line
+from src.utility.notifiers import get_notifiers
+from src.utility.server_discovery import ServerInfo, get_registry
 
+load_dotenv()
+LOG_BACKEND = os.getenv("LOG_BACKEND", "tail")
+LOG_BACKENDS = ("tail", "inotify", "watchdog", "polling")
 
-def tail_log(path: str) -> Generator[str, None, None]:
-    """Generator that yields lines from a log file as they are appended."""
+LineHandler = Callable[[str], None]
+Route = Callable[[str, LogRecord, float], None]
+
+LINES = metrics.counter("listener_lines_total",
+                        "Log lines delivered to the line handlers",
+                        ("server",))
+
+
+def start_tail(path: str) -> "subprocess.Popen[bytes]":
+    """Start a tail process that prints lines appended to a log file."""
     print(f"[tail] Watching {path}")
-    proc = subprocess.Popen(  # nosec[B603]
+    return subprocess.Popen(  # nosec[B603]
         ["/usr/bin/tail", "-n", "0", "-F", path],
         stdout=subprocess.PIPE,
-        text=True,
-        bufsize=1,
+        bufsize=0,
     )
+
+
+def stop_tail(proc: "subprocess.Popen[bytes]", timeout: float = 5.0) -> None:
+    """Stop a tail process and reap it, so no zombie is left behind."""
+    proc.terminate()
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def tail_log(path: str, triggers: Optional[Iterable[str]] = None
+             ) -> Generator[str, None, None]:
+    """Generator that yields lines from a log file as they are appended."""
+    yield from read_lines(start_tail(path), triggers)
+
+
+def read_lines(proc: "subprocess.Popen[bytes]",
+               triggers: Optional[Iterable[str]] = None
+               ) -> Generator[str, None, None]:
+    """Generator that yields lines printed by a tail process."""
     if proc.stdout:
-        for line in proc.stdout:
-            yield line.rstrip("\n")
+        framer = LineFramer(triggers)
+        fd = proc.stdout.fileno()
+        while framer.fill(lambda view: os.readv(fd, [view])):
+            yield from framer.lines()
 
 
-def watch_server(name: str, log_path: str):
-    """Watch a server's log file and route events, with deduplication."""
+def create_line_handler(name: str,
+                        route: Optional[Route] = None) -> LineHandler:
+    """
+    Create a handler that checks server health and tracks player sessions
+    from a server's lines, then deduplicates them and passes them to route
+    (route_event by default) with the monotonic time each was read.
+    Sessions see every line, since a player can leave twice within the
+    deduplication window. Lag lines only feed the health monitor.
+    """
     deduplicator = MessageDeduplicator(window_seconds=30)
+    tracker = get_tracker()
+    monitor = get_monitor()
+    route = route_event if route is None else route
 
-    for line in tail_log(log_path):
-        if deduplicator.is_unique(line):
-            route_event(name, line)
+    def handle(line: str) -> None:
+        read_at = time.monotonic()
+        LINES.inc(name)
+        if monitor.handle(name, line):
+            return
+        record = parse_line(line)
+        if tracker is not None:
+            tracker.handle(name, record)
+        if deduplicator.is_unique(record):
+            route(name, record, read_at)
 
+    return handle
 
-def main():
-    """Main function to start watching all discovered servers."""
-    servers = discover_servers()
-    for uuid, info in servers.items():
-        thread = threading.Thread(
-            target=watch_server,
-            args=(info["name"], info["log_file"]),
-            daemon=True
-        )
-        thread.start()
+
+def watch_server(name: str, log_path: str,
+                 follow: Callable[[str], Iterable[str]] = tail_log) -> None:
+    """Watch a server's log file and route events, with deduplication."""
+    follow_server(log_path, follow, create_line_handler(name))
+
+
+def follow_server(log_path: str, follow: Callable[[str], Iterable[str]],
+                  handle: LineHandler) -> None:
+    """Pass every line of a followed log to a handler."""
+    for line in follow(log_path):
+        handle(line)
+
+
+class FollowerPool:
+    """
+    Starts and stops log followers as servers come and go.
+
+    ``sync`` is given the full server map, so it can be subscribed to a
+    ServerRegistry directly. A server whose log cannot be followed yet is
+    retried on the next sync. Only lines containing one of ``triggers``
+    reach the handlers; with None every line does.
+    """
+
+    def __init__(
+            self, backend: str = LOG_BACKEND,
+            create_handler: Callable[[str], LineHandler] = create_line_handler,
+            triggers: Optional[Iterable[str]] = TRIGGERS
+    ):
+        if backend not in LOG_BACKENDS:
+            raise ValueError(
+                f"Unknown LOG_BACKEND {backend!r}; "
+                f"expected one of {', '.join(LOG_BACKENDS)}"
+            )
+        self.backend = backend
+        self.create_handler = create_handler
+        self.triggers = triggers
+        self.followed: dict[str, ServerInfo] = {}
+        self._stops: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._inotify: Optional[InotifyFollower] = None
+        self._observer: Optional[PollingObserver] = None
+        if backend != "inotify" and get_checkpoints() is not None:
+            print(f"[{backend}] Checkpoints need LOG_BACKEND=inotify; "
+                  "following logs from their end")
+
+    def sync(self, servers: dict[str, ServerInfo]) -> None:
+        """Follow exactly the given servers."""
+        with self._lock:
+            for uuid, info in list(self.followed.items()):
+                if servers.get(uuid) != info:
+                    self._stop(uuid)
+            for uuid, info in servers.items():
+                if uuid not in self.followed:
+                    self._start(uuid, info)
+
+    def stop_all(self) -> None:
+        with self._lock:
+            for uuid in list(self.followed):
+                self._stop(uuid)
+
+    def _start(self, uuid: str, info: ServerInfo) -> None:
+        path = info["log_file"]
+        handle = self.create_handler(info["name"])
+        try:
+            self._stops[uuid] = self._follow(path, handle)
+        except OSError as e:
+            print(f"[{self.backend}] Cannot follow {path} yet: {e}")
+            return
+        self.followed[uuid] = info
         print(f"Started watching server {info['name']}")
 
+    def _stop(self, uuid: str) -> None:
+        info = self.followed.pop(uuid)
+        self._stops.pop(uuid)()
+        print(f"Stopped watching server {info['name']}")
+
+    def _follow(self, path: str,
+                handle: LineHandler) -> Callable[[], None]:
+        """Start following one log and return a function that stops it."""
+        if self.backend == "inotify":
+            if self._inotify is None:
+                self._inotify = InotifyFollower(
+                    checkpoints=get_checkpoints(), triggers=self.triggers
+                )
+                threading.Thread(target=self._inotify.run,
+                                 daemon=True).start()
+            follower = self._inotify
+            follower.add(path, handle)
+            return lambda: follower.remove(path)
+
+        if self.backend == "watchdog":
+            if self._observer is None:
+                self._observer = PollingObserver()
+                self._observer.daemon = True
+                self._observer.start()
+            observer = self._observer
+            watch: ObservedWatch = schedule_log(observer, path, handle,
+                                                self.triggers)
+            return lambda: observer.unschedule(watch)
+
+        triggers = self.triggers
+        if self.backend == "polling":
+            stop = threading.Event()
+            threading.Thread(
+                target=follow_server,
+                args=(path,
+                      lambda log: poll_log(log, stop=stop, triggers=triggers),
+                      handle),
+                daemon=True
+            ).start()
+            return stop.set
+
+        proc = start_tail(path)
+        threading.Thread(
+            target=follow_server,
+            args=(path, lambda log: read_lines(proc, triggers), handle),
+            daemon=True
+        ).start()
+        return lambda: stop_tail(proc)
+
+
+def start_followers(
+        servers: dict[str, ServerInfo],
+        backend: str = LOG_BACKEND,
+        create_handler: Callable[[str], LineHandler] = create_line_handler
+) -> FollowerPool:
+    """Start following every server's log with the chosen backend."""
+    pool = FollowerPool(backend, create_handler)
+    pool.sync(servers)
+    return pool
+
+
+def main():
+    """Main function to watch every server, following registry changes."""
+    if metrics.METRICS_PORT:
+        metrics.serve(metrics.METRICS_PORT)
+    registry = get_registry()
+    pool = start_followers(registry.servers())
+    registry.subscribe(pool.sync)
+    registry.start_watching()
+
     try:
         while True:
             time.sleep(10)
+            pool.sync(registry.servers())
     except KeyboardInterrupt:
         print("Stopping log watchers...")
+        get_notifiers().drain()
+        checkpoints = get_checkpoints()
+        if checkpoints is not None:
+            checkpoints.flush()
 
 
 if __name__ == "__main__":
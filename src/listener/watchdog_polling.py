@@ -1,56 +1,79 @@
 import os
 import time
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
 from dotenv import load_dotenv
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers.api import ObservedWatch
 from watchdog.observers.polling import PollingObserver
 
+from src.listener.line_framer import LineFramer
+
 load_dotenv()
 LOG_PATH = os.getenv("LOG_PATH", "/logs/latest.log")
 
 
+def print_match(line: str) -> None:
+    if "event test" in line:
+        print(f"[watchdog] Match: {line.strip()}")
+
+
 class LogHandler(FileSystemEventHandler):
-    def __init__(self):
+    def __init__(self, path: str = LOG_PATH,
+                 handler: Callable[[str], None] = print_match,
+                 triggers: Optional[Iterable[str]] = None):
+        self.path = path
+        self.handler = handler
         self.last_position: int = self._get_initial_offset()
+        self.framer = LineFramer(triggers)
 
     def _get_initial_offset(self) -> int:
         try:
-            return os.path.getsize(LOG_PATH)
+            return os.path.getsize(self.path)
         except FileNotFoundError:
             return 0
 
-    def on_modified(self, event: FileSystemEvent) -> None:
-        if event.src_path != LOG_PATH:
+    def on_created(self, event: FileSystemEvent) -> None:
+        if event.src_path != self.path:
             return
 
-        new_data: Optional[str] = self._read_new_data()
-        if not new_data:
-            return
+        self.last_position = 0
+        self.framer.reset()
+        self.on_modified(event)
 
-        for line in new_data.splitlines():
-            if "event test" in line:
-                print(f"[watchdog] Match: {line.strip()}")
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if event.src_path != self.path:
+            return
 
-    def _read_new_data(self) -> Optional[str]:
         try:
-            with open(LOG_PATH, "r") as f:
+            with open(self.path, "rb", buffering=0) as f:
+                if os.fstat(f.fileno()).st_size < self.last_position:
+                    print(f"[watchdog] {self.path}: file truncated")
+                    self.last_position = 0
+                    self.framer.reset()
                 f.seek(self.last_position)
-                data = f.read()
-                self.last_position = f.tell()
-                return data
+                while count := self.framer.fill(f.readinto):
+                    self.last_position += count
+                    for line in self.framer.lines():
+                        self.handler(line)
         except Exception as e:
             print(f"[watchdog] Error reading log: {e}")
-            return None
+
+
+def schedule_log(observer: PollingObserver, path: str,
+                 handler: Callable[[str], None],
+                 triggers: Optional[Iterable[str]] = None) -> ObservedWatch:
+    """Add a log file to an observer shared by several servers."""
+    print(f"[watchdog] Watching {path}")
+    return observer.schedule(
+        LogHandler(path, handler, triggers),
+        path=os.path.dirname(path),
+        recursive=False)
 
 
 def main() -> None:
-    print(f"[watchdog] Watching {LOG_PATH}")
     observer = PollingObserver()
-    observer.schedule(
-        LogHandler(),
-        path=os.path.dirname(LOG_PATH),
-        recursive=False)
+    schedule_log(observer, LOG_PATH, print_match)
     observer.start()
     try:
         while True:
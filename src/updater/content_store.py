@@ -0,0 +1,133 @@
+"""
+Content-addressed store for downloaded mod jars.
+"""
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+import requests
+
+from src.updater.errors import DownloadFailed
+from src.utility import metrics
+
+CHUNK_SIZE: int = 64 * 1024
+STORE_DIR: str = "jar_store"
+
+JARS = metrics.counter("jar_store_fetches_total",
+                       "Jars fetched through the store, by result",
+                       ("result",))
+DOWNLOAD_BYTES = metrics.counter("jar_download_bytes_total",
+                                 "Verified bytes downloaded into the store")
+
+
+class ContentStore:
+    """
+    Keeps one verified copy of every jar, named by its hash.
+
+    Downloads are streamed to a temporary file, checked against the
+    Modrinth file hashes and size, then renamed into the store. Installing
+    hard-links the stored jar into a mods directory, so servers that use the
+    same jar share both the download and the disk space.
+    """
+
+    def __init__(self, root: Path):
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+        self.downloads = 0
+        self.reused = 0
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def fetch(self, file: dict[str, Any],
+              session: requests.Session) -> Path:
+        """Return the stored jar for a Modrinth file, downloading it once."""
+        algorithm, digest = get_digest(file["hashes"])
+        path = self.path_for(digest)
+
+        with self._lock_for(digest):
+            if path.exists():
+                self.reused += 1
+                JARS.inc("reused")
+                return path
+
+            path.parent.mkdir(exist_ok=True)
+            self._download(file, algorithm, digest, path, session)
+            self.downloads += 1
+            JARS.inc("downloaded")
+            return path
+
+    def install(self, stored: Path, target: Path) -> None:
+        """Atomically place a stored jar at target."""
+        temporary = target.with_name(f".{target.name}.tmp")
+        temporary.unlink(missing_ok=True)
+        try:
+            os.link(stored, temporary)
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+            logging.debug(f"Copying {stored.name}; hard link failed: {e}")
+            shutil.copyfile(stored, temporary)
+        os.replace(temporary, target)
+
+    def describe(self) -> str:
+        return f"{self.downloads} downloaded, {self.reused} reused"
+
+    def _lock_for(self, digest: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(digest, threading.Lock())
+
+    def _download(self, file: dict[str, Any], algorithm: str, digest: str,
+                  path: Path, session: requests.Session) -> None:
+        hasher = hashlib.new(algorithm, usedforsecurity=False)
+        size = 0
+        handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                with session.get(file["url"], stream=True,
+                                 timeout=30) as response:
+                    if not response.ok:
+                        raise DownloadFailed(
+                            f"Download of {file['filename']} failed: "
+                            f"{response.status_code}"
+                        )
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        hasher.update(chunk)
+                        output.write(chunk)
+                        size += len(chunk)
+
+            if hasher.hexdigest() != digest:
+                raise DownloadFailed(
+                    f"{file['filename']} failed {algorithm} verification"
+                )
+            expected = file.get("size")
+            if expected is not None and size != expected:
+                raise DownloadFailed(
+                    f"{file['filename']} is {size} bytes, "
+                    f"expected {expected}"
+                )
+            os.replace(temporary, path)
+            DOWNLOAD_BYTES.inc(amount=size)
+        except requests.RequestException as e:
+            raise DownloadFailed(
+                f"Download of {file['filename']} failed: {e}"
+            ) from e
+        finally:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+
+
+def get_digest(hashes: dict[str, str]) -> tuple[str, str]:
+    """Return the strongest (algorithm, digest) pair Modrinth provides."""
+    for algorithm in ("sha512", "sha1"):
+        if algorithm in hashes:
+            return algorithm, hashes[algorithm]
+    raise DownloadFailed("Modrinth file metadata has no usable hash")
@@ -0,0 +1,156 @@
+"""
+Consistent version selection across the dependencies of a mods directory.
+"""
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from src.updater.errors import UpdateError
+
+Version = Dict[str, Any]
+
+
+class Resolution:
+    """
+    Outcome of resolving a mods directory's dependencies.
+
+    ``additions`` maps the project id of each missing required library to
+    the version to install and the jar or library that needs it. ``held``
+    maps jars whose update must not be applied to the reason.
+    """
+
+    def __init__(self) -> None:
+        self.additions: dict[str, tuple[Version, str]] = {}
+        self.held: dict[str, str] = {}
+        self.warnings: list[str] = []
+
+
+class DependencySolver:
+    """
+    Checks the required and incompatible dependencies of every selected
+    version against the rest of the set.
+
+    A required project that is not installed is added once, however many
+    jars need it, and its own dependencies are checked in turn. A jar whose
+    update needs something that cannot be satisfied, or that conflicts with
+    the set, keeps its current version, as does a library whose update
+    breaks a pin of a jar that is not changing. The set is then checked
+    again without those updates. Lookups go through the given functions,
+    which are expected to memoise.
+    """
+
+    def __init__(self, latest: Callable[[str], Version],
+                 version: Callable[[str], Version],
+                 present: Callable[[Version], bool] = lambda version: False):
+        self.latest = latest
+        self.version = version
+        self.present = present
+
+    def solve(self, selected: dict[str, Version],
+              updating: set[str]) -> Resolution:
+        """
+        Resolve ``selected``, the version chosen for each installed jar by
+        filename. Only jars in ``updating`` can be held back; the others
+        are already installed at their selected version.
+        """
+        held: dict[str, str] = {}
+        while True:
+            resolution = self._solve_once(selected, updating, held)
+            if resolution.held == held:
+                return resolution
+            held = resolution.held
+
+    def _solve_once(self, selected: dict[str, Version], updating: set[str],
+                    held: dict[str, str]) -> Resolution:
+        resolution = Resolution()
+        resolution.held = dict(held)
+        chosen: dict[str, tuple[str, Optional[str]]] = {}
+        installed = {version["project_id"]: name
+                     for name, version in selected.items()}
+        queue: list[tuple[str, str, Version]] = []
+        excluded: list[tuple[str, str, str]] = []
+        for name, version in selected.items():
+            if name in held:
+                chosen[version["project_id"]] = (name, None)
+            else:
+                filename = version["files"][0]["filename"]
+                chosen[version["project_id"]] = (filename, version["id"])
+                queue.append((name, filename, version))
+
+        def fail(root: str, owner: str, problem: str) -> None:
+            if root in updating:
+                resolution.held.setdefault(root, problem)
+            else:
+                resolution.warnings.append(f"{owner}: {problem}")
+
+        while queue:
+            root, owner, version = queue.pop()
+            for dependency in version.get("dependencies") or []:
+                kind = dependency.get("dependency_type")
+                if kind not in ("required", "incompatible"):
+                    continue
+                try:
+                    project_id = self._project_of(dependency)
+                except UpdateError as e:
+                    fail(root, owner, f"cannot look up a dependency: {e}")
+                    continue
+                if project_id is None:
+                    continue
+                if kind == "incompatible":
+                    excluded.append((root, owner, project_id))
+                    continue
+                problem, added = self._require(dependency, project_id,
+                                               chosen, resolution, owner)
+                library = installed.get(project_id, "")
+                if (problem is not None and root not in updating
+                        and library in updating):
+                    resolution.held.setdefault(library,
+                                               f"{owner} {problem}")
+                elif problem is not None:
+                    fail(root, owner, problem)
+                elif added is not None:
+                    queue.append((root, added["files"][0]["filename"],
+                                  added))
+
+        for root, owner, project_id in excluded:
+            if project_id in chosen:
+                fail(root, owner,
+                     f"incompatible with {chosen[project_id][0]}")
+        return resolution
+
+    def _project_of(self, dependency: dict[str, Any]) -> Optional[str]:
+        project_id: Optional[str] = dependency.get("project_id")
+        version_id = dependency.get("version_id")
+        if project_id is None and version_id is not None:
+            project_id = self.version(version_id)["project_id"]
+        return project_id
+
+    def _require(self, dependency: dict[str, Any], project_id: str,
+                 chosen: dict[str, tuple[str, Optional[str]]],
+                 resolution: Resolution, owner: str
+                 ) -> tuple[Optional[str], Optional[Version]]:
+        """
+        Satisfy a required dependency from the set, or add the project.
+        Returns why it cannot be satisfied, and the version added if any.
+        """
+        version_id = dependency.get("version_id")
+        installed = chosen.get(project_id)
+        if installed is not None:
+            name, installed_version = installed
+            if (version_id is None or installed_version is None
+                    or installed_version == version_id):
+                return None, None
+            return f"needs version {version_id} of {name}", None
+
+        try:
+            required = (self.version(version_id) if version_id is not None
+                        else self.latest(project_id))
+        except UpdateError as e:
+            return f"needs {project_id}, which cannot be resolved: {e}", None
+        filename = required["files"][0]["filename"]
+        if self.present(required):
+            chosen[project_id] = (filename, None)
+            return None, None
+        logging.debug(f"{owner} needs {filename}")
+        chosen[project_id] = (filename, required["id"])
+        resolution.additions[project_id] = (required, owner)
+        return None, required
@@ -0,0 +1,27 @@
+"""
+Exceptions raised while updating mods.
+"""
+
+
+class UpdateError(Exception):
+    """Base exception for known errors during the update process."""
+
+
+class ApiFailed(UpdateError):
+    """Raised when the Modrinth API request fails."""
+
+
+class DownloadFailed(UpdateError):
+    """Raised when a jar download is incomplete or fails verification."""
+
+
+class MissingSetting(UpdateError):
+    """Raised when required settings are not provided."""
+
+
+class NoCompatibleVersion(UpdateError):
+    """Raised when no compatible version of a mod can be found."""
+
+
+class PlanOutdated(UpdateError):
+    """Raised when installed jars changed after an update plan was made."""
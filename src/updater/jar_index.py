@@ -0,0 +1,193 @@
+"""
+Persistent index of the jars in a mods directory.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import tomllib
+import zipfile
+from pathlib import Path
+from typing import Any, Optional, TypedDict
+
+from src.utility import metrics
+
+HASH_CHUNK_SIZE: int = 1024 * 1024
+INDEX_FILE: str = ".mod_index.sqlite"
+MODS_TOML_PATHS = ("META-INF/mods.toml", "META-INF/neoforge.mods.toml")
+
+SCANS = metrics.counter("jar_index_scans_total",
+                        "Jars looked up in the index, by result",
+                        ("result",))
+
+
+class JarEntry(TypedDict):
+    size: int
+    mtime_ns: int
+    sha1: str
+    mod_id: Optional[str]
+    project_id: Optional[str]
+    version_id: Optional[str]
+    checked: Optional[float]
+
+
+def hash_file(path: Path) -> str:
+    """Returns the sha1 hex digest Modrinth uses to identify a file."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_mod_id(path: Path) -> Optional[str]:
+    """
+    Return the mod id declared in a jar's fabric.mod.json or mods.toml.
+    Only the zip's central directory and that one entry are read.
+    """
+    try:
+        with zipfile.ZipFile(path) as jar:
+            names = set(jar.namelist())
+            if "fabric.mod.json" in names:
+                data = json.loads(jar.read("fabric.mod.json"), strict=False)
+                return str(data["id"])
+            for name in MODS_TOML_PATHS:
+                if name in names:
+                    toml = tomllib.loads(jar.read(name).decode())
+                    return str(toml["mods"][0]["modId"])
+    except (OSError, zipfile.BadZipFile, KeyError, IndexError, TypeError,
+            ValueError):
+        return None
+    return None
+
+
+class JarIndex:
+    """
+    Remembers what is known about each jar in a mods directory.
+
+    Entries are keyed by filename and trusted while the jar's size and
+    modification time match, so unchanged jars are neither hashed nor
+    opened again. Each entry keeps the jar's sha1, its declared mod id, and
+    the Modrinth project and latest version found when it was last checked.
+    The index lives in SQLite inside the mods directory.
+    """
+
+    def __init__(self, mods_dir: Path, path: Optional[Path] = None):
+        self.mods_dir = mods_dir
+        self.path = path or mods_dir / INDEX_FILE
+        self.hashed = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path,
+                                           check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS jars (
+                filename TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha1 TEXT NOT NULL,
+                mod_id TEXT,
+                project_id TEXT,
+                version_id TEXT,
+                checked REAL
+            )
+        """)
+        self._connection.commit()
+        self._entries: dict[str, JarEntry] = {
+            row[0]: {"size": row[1], "mtime_ns": row[2], "sha1": row[3],
+                     "mod_id": row[4], "project_id": row[5],
+                     "version_id": row[6], "checked": row[7]}
+            for row in self._connection.execute("SELECT * FROM jars")
+        }
+        self._changed: set[str] = set()
+
+    def entry(self, file: Path) -> JarEntry:
+        """Return a jar's entry, hashing and parsing it only if it changed."""
+        status = file.stat()
+        with self._lock:
+            entry = self._entries.get(file.name)
+            if (entry is not None and entry["size"] == status.st_size
+                    and entry["mtime_ns"] == status.st_mtime_ns):
+                self.reused += 1
+                SCANS.inc("unchanged")
+                return entry
+
+        fresh: JarEntry = {
+            "size": status.st_size,
+            "mtime_ns": status.st_mtime_ns,
+            "sha1": hash_file(file),
+            "mod_id": read_mod_id(file),
+            "project_id": None,
+            "version_id": None,
+            "checked": None,
+        }
+        with self._lock:
+            self.hashed += 1
+            SCANS.inc("hashed")
+            self._entries[file.name] = fresh
+            self._changed.add(file.name)
+        return fresh
+
+    def record_version(self, file: Path, version: dict[str, Any]) -> None:
+        """Remember the project and latest version found for a jar."""
+        with self._lock:
+            entry = self._entries.get(file.name)
+            if entry is None:
+                return
+            entry["project_id"] = version["project_id"]
+            entry["version_id"] = version["id"]
+            entry["checked"] = time.time()
+            self._changed.add(file.name)
+
+    def record_install(self, file: Path, version: dict[str, Any]) -> None:
+        """
+        Index a jar just installed from a Modrinth version, taking its hash
+        from the version instead of reading the file again.
+        """
+        status = file.stat()
+        entry: JarEntry = {
+            "size": status.st_size,
+            "mtime_ns": status.st_mtime_ns,
+            "sha1": version["files"][0]["hashes"]["sha1"],
+            "mod_id": read_mod_id(file),
+            "project_id": version["project_id"],
+            "version_id": version["id"],
+            "checked": time.time(),
+        }
+        with self._lock:
+            self._entries[file.name] = entry
+            self._changed.add(file.name)
+
+    def save(self) -> None:
+        """Write changed entries and drop jars no longer in the directory."""
+        present = {path.name for path in self.mods_dir.glob("*.jar")}
+        with self._lock:
+            removed = [name for name in self._entries if name not in present]
+            for name in removed:
+                del self._entries[name]
+                self._changed.discard(name)
+            self._connection.executemany(
+                "DELETE FROM jars WHERE filename = ?",
+                [(name,) for name in removed]
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO jars VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [self._row(name) for name in sorted(self._changed)]
+            )
+            self._connection.commit()
+            self._changed.clear()
+
+    def describe(self) -> str:
+        return f"{self.reused} unchanged, {self.hashed} hashed"
+
+    def close(self) -> None:
+        self.save()
+        with self._lock:
+            self._connection.close()
+
+    def _row(self, name: str) -> tuple[Any, ...]:
+        entry = self._entries[name]
+        return (name, entry["size"], entry["mtime_ns"], entry["sha1"],
+                entry["mod_id"], entry["project_id"], entry["version_id"],
+                entry["checked"])
@@ -0,0 +1,87 @@
+"""
+Staged, all-or-nothing replacement of a mods directory.
+"""
+import errno
+import os
+import shutil
+from pathlib import Path
+
+STAGING_SUFFIX: str = "staging"
+SNAPSHOT_SUFFIX: str = "previous"
+
+
+def staging_dir(mods_dir: Path) -> Path:
+    return mods_dir.with_name(f".{mods_dir.name}.{STAGING_SUFFIX}")
+
+
+def snapshot_dir(mods_dir: Path) -> Path:
+    return mods_dir.with_name(f".{mods_dir.name}.{SNAPSHOT_SUFFIX}")
+
+
+def link_or_copy(source: str, target: str) -> None:
+    """
+    Hard-link jars into the staged copy, which costs no disk space. Other
+    files, such as the jar index, are copied so the two sets stay apart.
+    """
+    if source.endswith(".jar"):
+        try:
+            os.link(source, target)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK):
+                raise
+    shutil.copy2(source, target)
+
+
+def stage(mods_dir: Path) -> Path:
+    """
+    Return a fresh copy of mods_dir next to it, to be changed and then
+    swapped in. A copy left by an interrupted run is discarded first.
+    """
+    staged = staging_dir(mods_dir)
+    shutil.rmtree(staged, ignore_errors=True)
+    shutil.copytree(mods_dir, staged, symlinks=True,
+                    copy_function=link_or_copy)
+    return staged
+
+
+def discard(mods_dir: Path) -> None:
+    shutil.rmtree(staging_dir(mods_dir), ignore_errors=True)
+
+
+def swap(mods_dir: Path) -> Path:
+    """
+    Replace mods_dir with its staged copy and return the snapshot of the
+    set it replaced. The old set is renamed aside before the staged one is
+    renamed in, and is put back if that second rename fails. Each rename
+    is atomic, so mods_dir never holds a mix of the two sets, but the swap
+    as a whole is not: mods_dir is missing between the renames. Servers
+    read their mods only when starting, so swap while a server is stopped
+    or before it restarts.
+    """
+    staged = staging_dir(mods_dir)
+    snapshot = snapshot_dir(mods_dir)
+    shutil.rmtree(snapshot, ignore_errors=True)
+    os.rename(mods_dir, snapshot)
+    try:
+        os.rename(staged, mods_dir)
+    except OSError:
+        os.rename(snapshot, mods_dir)
+        raise
+    return snapshot
+
+
+def rollback(mods_dir: Path) -> bool:
+    """
+    Put back the set replaced by the last swap. The rolled back set becomes
+    the snapshot, so a rollback can itself be undone. Returns False when
+    there is no snapshot.
+    """
+    snapshot = snapshot_dir(mods_dir)
+    if not snapshot.is_dir():
+        return False
+    staged = staging_dir(mods_dir)
+    shutil.rmtree(staged, ignore_errors=True)
+    os.rename(snapshot, staged)
+    swap(mods_dir)
+    return True
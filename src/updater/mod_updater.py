@@ -1,18 +1,37 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import json
 import logging
+import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Dict, TypedDict
+from typing import Any, Callable, Dict, Iterator, Optional, TypedDict
 
 import requests
 
-from src.utility.server_discovery import get_server_name
+from src.updater.content_store import STORE_DIR, ContentStore
+from src.updater import mod_set
+from src.updater.dependencies import DependencySolver
+from src.updater.errors import (ApiFailed, MissingSetting,
+                                NoCompatibleVersion, PlanOutdated,
+                                UpdateError)
+from src.updater.jar_index import JarIndex
+from src.updater.modrinth_client import ModrinthClient
+from src.updater.response_cache import CACHE_FILE, ResponseCache
+from src.utility import metrics
+from src.utility.server_discovery import (SERVERS_BASE, discover_servers,
+                                          get_server_name)
 from src.utility.slack_notifier import send_to_slack
 
+BULK_BATCH_SIZE: int = 500
+CACHE_TTL: float = 3600
 LOG_FILE: str = "mod_update.log"
 LOG_LEVELS: Dict[str, int] = {
     "CRITICAL": logging.CRITICAL,
@@ -22,10 +41,19 @@ LOG_LEVELS: Dict[str, int] = {
     "DEBUG": logging.DEBUG,
     "NOTSET": logging.NOTSET
 }
-MODRINTH_API: str = "https://api.modrinth.com/v2"
+MAX_JOBS: int = 32
+MODRINTH_API: str = os.getenv("MODRINTH_API", "https://api.modrinth.com/v2")
 SCRIPT_DIR: Path = Path(__file__).resolve().parent
+REPOSITORY_DIR: Path = SCRIPT_DIR.parents[1]
 SLUG_OVERRIDES_PATH: Path = SCRIPT_DIR / "mod_slugs.json"
 
+CACHE_LOOKUPS = metrics.counter("modrinth_cache_lookups_total",
+                                "Version lookups by cache result",
+                                ("result",))
+MOD_UPDATES = metrics.counter("mod_updates_total",
+                              "Installed jars checked, by result",
+                              ("result",))
+
 
 class UpdateSettings(TypedDict):
     mods_dir: Path
@@ -33,22 +61,94 @@ class UpdateSettings(TypedDict):
     loader: str
     log_level: str
     log_path: Path
+    cache_path: Path
+    cache_ttl: float
+    store_path: Path
+
+
+class PlannedUpdate(TypedDict):
+    current: str
+    sha1: str
+    target: str
+    project_id: str
+    version_id: str
+    version_number: str
+    file: Dict[str, Any]
+    required_by: str
+
+
+class UpdatePlan(TypedDict):
+    server: str
+    uuid: str
+    mods_dir: str
+    game_version: str
+    loader: str
+    created: float
+    updates: list[PlannedUpdate]
+    failed: list[Dict[str, str]]
+    held: list[Dict[str, str]]
 
 
-class UpdateError(Exception):
-    """Base exception for known errors during the update process."""
+class LookupMemo:
+    """
+    Remembers lookups for the rest of the run. Threads asking for a key that
+    is already being fetched wait for that result instead of repeating it.
+    """
 
+    def __init__(self) -> None:
+        self.hits = 0
+        self._results: dict[tuple[str, ...], Any] = {}
+        self._locks: dict[tuple[str, ...], threading.Lock] = {}
+        self._lock = threading.Lock()
 
-class ApiFailed(UpdateError):
-    """Raised when the Modrinth API request fails."""
+    def get(self, key: tuple[str, ...], fetch: Callable[[], Any]) -> Any:
+        with self._lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key in self._results:
+                self.hits += 1
+                return self._results[key]
+            result = fetch()
+            self._results[key] = result
+            return result
 
 
-class MissingSetting(UpdateError):
-    """Raised when required settings are not provided."""
+class LogCapture(logging.Filter):
+    """
+    Holds back log records from threads that are capturing them, so work
+    done in parallel can be logged in a fixed order afterwards.
+    """
 
+    def __init__(self) -> None:
+        super().__init__()
+        self._local = threading.local()
 
-class NoCompatibleVersion(UpdateError):
-    """Raised when no compatible version of a mod can be found."""
+    def filter(self, record: logging.LogRecord) -> bool:
+        records: Optional[list[logging.LogRecord]] = getattr(
+            self._local, "records", None
+        )
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+    @contextmanager
+    def capture(self) -> Iterator[list[logging.LogRecord]]:
+        records: list[logging.LogRecord] = []
+        self._local.records = records
+        try:
+            yield records
+        finally:
+            self._local.records = None
+
+
+CACHE: Optional[ResponseCache] = None
+CLIENT = ModrinthClient()
+INDEXES: Dict[Path, JarIndex] = {}
+INDEXES_LOCK = threading.Lock()
+LOG_CAPTURE = LogCapture()
+LOOKUPS = LookupMemo()
+STORE: Optional[ContentStore] = None
 
 
 def get_latest_compatible_version(
@@ -71,6 +171,64 @@ def get_latest_compatible_version(
     return versions[0]
 
 
+def get_latest_versions_by_hash(
+        hashes: list[str], game_version: str, loader: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Looks up the latest compatible version for many installed files at once.
+    Returns a mapping of file hash to version for the hashes Modrinth knows.
+    """
+    url = f"{MODRINTH_API}/version_files/update"
+    latest: Dict[str, Dict[str, Any]] = {}
+
+    for start in range(0, len(hashes), BULK_BATCH_SIZE):
+        body = {
+            "hashes": hashes[start:start + BULK_BATCH_SIZE],
+            "algorithm": "sha1",
+            "loaders": [loader],
+            "game_versions": [game_version],
+        }
+        response = CLIENT.post(url, "bulk", json=body)
+        if not response.ok:
+            raise ApiFailed(
+                "Modrinth bulk lookup failed: "
+                f"{response.status_code} - {response.text}"
+            )
+        latest.update(response.json())
+
+    return latest
+
+
+def get_version(version_id: str) -> Dict[str, Any]:
+    """Returns a version by id. Versions never change once published."""
+    version: Dict[str, Any] = LOOKUPS.get(
+        ("version", version_id), lambda: _fetch_version(version_id)
+    )
+    return version
+
+
+def _fetch_version(version_id: str) -> Dict[str, Any]:
+    key = ResponseCache.make_key("version", version_id)
+    cached = CACHE.get(key, stale_ok=True) if CACHE else None
+    if cached is not None:
+        CACHE_LOOKUPS.inc("fresh" if cached["fresh"] else "stale")
+        stored: Dict[str, Any] = cached["body"]
+        return stored
+
+    response = CLIENT.get(f"{MODRINTH_API}/version/{version_id}", "version")
+    if not response.ok:
+        raise ApiFailed(
+            "Modrinth API failed for version "
+            f"{version_id}: {response.status_code} - {response.text}"
+        )
+
+    CACHE_LOOKUPS.inc("miss")
+    data: Dict[str, Any] = response.json()
+    if CACHE:
+        CACHE.store(key, data, None)
+    return data
+
+
 def get_slug_from_filename(filename: str) -> str:
     """
     Tries to determine a mod's project slug from its JAR filename.
@@ -86,10 +244,38 @@ def get_slug_from_filename(filename: str) -> str:
     return overrides.get(base, base)
 
 
+def get_candidate_slugs(file: Path) -> list[str]:
+    """
+    Returns the projects to try for a jar Modrinth did not recognise by
+    hash: the project found on an earlier run, or else the slug of the
+    mod id declared inside the jar followed by the filename slug.
+    """
+    entry = get_index(file.parent).entry(file)
+    if entry["project_id"]:
+        return [entry["project_id"]]
+
+    slugs = []
+    if entry["mod_id"]:
+        mod_id = entry["mod_id"].lower()
+        slugs.append(load_slug_overrides().get(mod_id, mod_id))
+    slugs.append(get_slug_from_filename(file.name))
+    return list(dict.fromkeys(slugs))
+
+
 def _get_version_data(
         slug: str, game_version: str, loader: str, version_type: str
 ) -> list[Dict[str, Any]]:
     """Helper function to get versions from the Modrinth API."""
+    versions: list[Dict[str, Any]] = LOOKUPS.get(
+        ("versions", slug, game_version, loader, version_type),
+        lambda: _fetch_version_data(slug, game_version, loader, version_type)
+    )
+    return versions
+
+
+def _fetch_version_data(
+        slug: str, game_version: str, loader: str, version_type: str
+) -> list[Dict[str, Any]]:
     url = f"{MODRINTH_API}/project/{slug}/version"
     params = {
         "game_versions": json.dumps([game_version]),
@@ -97,14 +283,34 @@ def _get_version_data(
         "version_type": version_type,
     }
 
-    response = requests.get(url, params=params, timeout=15)
+    key = ResponseCache.make_key(slug, game_version, loader, version_type)
+    cached = CACHE.get(key) if CACHE else None
+    if cached is not None and cached["fresh"]:
+        CACHE_LOOKUPS.inc("fresh")
+        fresh: list[Dict[str, Any]] = cached["body"]
+        return fresh
+
+    headers = {}
+    if cached is not None and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+
+    response = CLIENT.get(url, "versions", params=params, headers=headers)
+    if response.status_code == 304 and CACHE and cached is not None:
+        CACHE_LOOKUPS.inc("revalidated")
+        CACHE.refresh(key)
+        unchanged: list[Dict[str, Any]] = cached["body"]
+        return unchanged
     if not response.ok:
         raise ApiFailed(
             "Modrinth API failed for "
             f"{slug}: {response.status_code} - {response.text}"
         )
 
-    return response.json()
+    CACHE_LOOKUPS.inc("miss")
+    data: list[Dict[str, Any]] = response.json()
+    if CACHE:
+        CACHE.store(key, data, response.headers.get("ETag"))
+    return data
 
 
 def load_config(config_path: Path) -> Dict[str, Any]:
@@ -116,9 +322,13 @@ def load_config(config_path: Path) -> Dict[str, Any]:
     config["log_path"] = Path(config.get(
         "log_path", config_dir / LOG_FILE
     ))
+    for key in ("cache_path", "store_path"):
+        if key in config:
+            config[key] = Path(config[key])
     return config
 
 
+@functools.cache
 def load_slug_overrides() -> Dict[str, str]:
     if not SLUG_OVERRIDES_PATH.exists():
         return {}
@@ -143,6 +353,32 @@ def parse_args() -> argparse.Namespace:
                         help="Path to config file (optional)")
     parser.add_argument("--uuid", type=str,
                         help="UUID (optional)")
+    parser.add_argument("--cache-path", type=Path,
+                        help="Path to the Modrinth response cache")
+    parser.add_argument("--cache-ttl", type=float,
+                        help="Seconds before cached responses are "
+                             "revalidated")
+    parser.add_argument("--store-path", type=Path,
+                        help="Directory of downloaded jars shared by "
+                             "servers")
+    parser.add_argument("--all-servers", action="store_true",
+                        help="Update every Crafty server with a "
+                             "mod_updates.json in one run")
+    parser.add_argument("--jobs", type=int, default=1,
+                        choices=range(1, MAX_JOBS + 1), metavar="JOBS",
+                        help="Mods to resolve and download at once")
+    parser.add_argument("--metrics-file", type=Path,
+                        help="Write a JSON metrics summary of the run here")
+    parser.add_argument("--plan", action="store_true",
+                        help="Only show the updates that would be made")
+    parser.add_argument("--plan-file", type=Path,
+                        help="Write the plan made by --plan here as JSON")
+    parser.add_argument("--apply", type=Path, metavar="PLAN_FILE",
+                        help="Install the updates of a plan written by "
+                             "--plan-file without resolving them again")
+    parser.add_argument("--rollback", action="store_true",
+                        help="Put back the mods replaced by the last "
+                             "applied update")
 
     return parser.parse_args()
 
@@ -174,29 +410,85 @@ def resolve_settings(args: argparse.Namespace) -> UpdateSettings:
 
     log_path = get("log_path", Path("../scripts"))
     log_level = get("log_level", "INFO")
+    cache_path = get("cache_path", Path(log_path) / CACHE_FILE)
+    store_path = get("store_path", Path(log_path) / STORE_DIR)
+    cache_ttl = (args.cache_ttl if args.cache_ttl is not None
+                 else config.get("cache_ttl", CACHE_TTL))
 
     return {
         "mods_dir": Path(mods_dir),
         "game_version": str(game_version),
         "loader": str(loader),
         "log_path": Path(log_path),
-        "log_level": str(log_level).upper()
+        "log_level": str(log_level).upper(),
+        "cache_path": Path(cache_path),
+        "cache_ttl": float(cache_ttl),
+        "store_path": Path(store_path)
     }
 
 
+def open_cache(path: Path, ttl: float) -> ResponseCache:
+    """Opens the response cache used by every version lookup."""
+    global CACHE
+    CACHE = ResponseCache(path, ttl)
+    return CACHE
+
+
+def open_store(path: Path) -> ContentStore:
+    """Opens the jar store every download goes through."""
+    global STORE
+    STORE = ContentStore(path)
+    return STORE
+
+
+def get_index(mods_dir: Path) -> JarIndex:
+    """Returns the jar index of a mods directory, opening it once."""
+    with INDEXES_LOCK:
+        index = INDEXES.get(mods_dir)
+        if index is None:
+            index = INDEXES[mods_dir] = JarIndex(mods_dir)
+        return index
+
+
+def close_index(mods_dir: Path) -> None:
+    """Saves and closes a directory's jar index before it is replaced."""
+    with INDEXES_LOCK:
+        index = INDEXES.pop(mods_dir, None)
+    if index is not None:
+        index.close()
+
+
+def close_indexes() -> None:
+    """Saves and closes every open jar index, logging how each was used."""
+    with INDEXES_LOCK:
+        indexes = list(INDEXES.values())
+        INDEXES.clear()
+    for index in indexes:
+        logging.info(f"Jar index for {index.mods_dir}: {index.describe()}")
+        index.close()
+
+
 def setup_logging(log_path: Path, level_str: str) -> None:
     """Configures logging to both console and a rotating file."""
+    setup_console_logging(level_str)
+    add_file_logging(log_path)
+
+
+def setup_console_logging(level_str: str) -> None:
+    """Configures console logging (for user feedback)."""
     log_level = LOG_LEVELS.get(level_str.upper(), logging.INFO)
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.DEBUG)
+    root_logger.addFilter(LOG_CAPTURE)
 
-    # Console handler (for user feedback)
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
     console_handler.setFormatter(logging.Formatter("%(message)s"))
     root_logger.addHandler(console_handler)
 
-    # File handler (for detailed debugging)
+
+def add_file_logging(log_path: Path) -> logging.Handler:
+    """Adds a rotating file handler (for detailed debugging)."""
     log_path.parent.mkdir(parents=True, exist_ok=True)
     file_handler = RotatingFileHandler(
         log_path, maxBytes=5 * 1024 * 1024, backupCount=3
@@ -205,56 +497,609 @@ def setup_logging(log_path: Path, level_str: str) -> None:
     file_handler.setFormatter(
         logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     )
-    root_logger.addHandler(file_handler)
+    logging.getLogger().addHandler(file_handler)
+    return file_handler
 
 
-def update_mod(
+def resolve_latest_version(
+        file: Path, game_version: str, loader: str,
+        known: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Returns the version to install for a jar.
+    A release found by hash is used as is. A beta or alpha found by hash is
+    checked again by project id so releases are still preferred, and jars
+    Modrinth does not know are looked up by their candidate slugs.
+    """
+    if known is not None and known.get("version_type") == "release":
+        return known
+    if known is not None:
+        return get_latest_compatible_version(known["project_id"],
+                                             game_version, loader)
+
+    *fallbacks, last = get_candidate_slugs(file)
+    for slug in fallbacks:
+        try:
+            return get_latest_compatible_version(slug, game_version, loader)
+        except (ApiFailed, NoCompatibleVersion) as e:
+            logging.debug(f"No usable project {slug} for {file.name}: {e}")
+    return get_latest_compatible_version(last, game_version, loader)
+
+
+def plan_mod(
         file: Path, mods_dir: Path,
-        game_version: str, loader: str
-) -> int:
-    slug: str = get_slug_from_filename(file.name)
-    latest: Dict[str, Any] = get_latest_compatible_version(
-        slug, game_version, loader
+        game_version: str, loader: str,
+        known: Optional[Dict[str, Any]] = None
+) -> tuple[Dict[str, Any], Optional[PlannedUpdate]]:
+    """
+    Resolve one jar. Returns the version selected for it, and its update,
+    or None if it is current.
+    """
+    latest: Dict[str, Any] = resolve_latest_version(
+        file, game_version, loader, known
     )
+    index = get_index(mods_dir)
+    index.record_version(file, latest)
 
     latest_filename: str = latest["files"][0]["filename"]
     if latest_filename == file.name:
-        logging.info(f"File {latest_filename} matches current file")
+        logging.info(f"File {file.name} matches current file")
+        MOD_UPDATES.inc("current")
+        return latest, None
+
+    logging.info(f"Planned {file.name} → {latest_filename}")
+    return latest, planned_update(latest, file.name,
+                                  index.entry(file)["sha1"])
+
+
+def planned_update(version: Dict[str, Any], current: str = "",
+                   sha1: str = "", required_by: str = "") -> PlannedUpdate:
+    """Describe installing a version in place of current, if any."""
+    return {
+        "current": current,
+        "sha1": sha1,
+        "target": version["files"][0]["filename"],
+        "project_id": version["project_id"],
+        "version_id": version["id"],
+        "version_number": version.get("version_number", ""),
+        "file": version["files"][0],
+        "required_by": required_by,
+    }
+
+
+def plan_mod_captured(
+        file: Path, mods_dir: Path,
+        game_version: str, loader: str,
+        known: Optional[Dict[str, Any]] = None
+) -> tuple[Optional[Dict[str, Any]], Optional[PlannedUpdate],
+           list[logging.LogRecord], Optional[Exception]]:
+    """Run plan_mod on a worker thread, holding back its log records."""
+    with LOG_CAPTURE.capture() as records:
+        try:
+            latest, planned = plan_mod(file, mods_dir, game_version, loader,
+                                       known)
+        except Exception as e:
+            return None, None, records, e
+    return latest, planned, records, None
+
+
+def resolve_dependencies(
+        plan: UpdatePlan, selected: Dict[str, Dict[str, Any]],
+        game_version: str, loader: str
+) -> None:
+    """
+    Make a plan's versions consistent with each other. Missing required
+    libraries are added to the plan once each, and updates that would
+    leave a dependency unsatisfied or conflicting are held back.
+    """
+    mods_dir = Path(plan["mods_dir"])
+    unresolved = {get_slug_from_filename(failed["file"])
+                  for failed in plan["failed"]}
+
+    def present(version: Dict[str, Any]) -> bool:
+        filename = version["files"][0]["filename"]
+        return ((mods_dir / filename).exists()
+                or get_slug_from_filename(filename) in unresolved)
+
+    solver = DependencySolver(
+        lambda project_id: get_latest_compatible_version(
+            project_id, game_version, loader),
+        get_version, present
+    )
+    resolution = solver.solve(
+        selected, {update["current"] for update in plan["updates"]}
+    )
+
+    for update in plan["updates"]:
+        reason = resolution.held.get(update["current"])
+        if reason is not None:
+            logging.warning(f"Holding back {update['current']} → "
+                            f"{update['target']}: {reason}")
+            plan["held"].append({"file": update["current"],
+                                 "target": update["target"],
+                                 "reason": reason})
+    plan["updates"] = [update for update in plan["updates"]
+                       if update["current"] not in resolution.held]
+    for version, required_by in resolution.additions.values():
+        added = planned_update(version, required_by=required_by)
+        logging.info(f"Planned {added['target']} for {required_by}")
+        plan["updates"].append(added)
+    for warning in resolution.warnings:
+        logging.warning(f"Unmet dependency: {warning}")
+
+
+def lookup_installed_versions(
+        mod_files: list[Path], game_version: str, loader: str
+) -> Dict[Path, Dict[str, Any]]:
+    """
+    Finds the latest versions of every jar with one bulk request, hashing
+    only jars the index has not seen unchanged. Returns an empty mapping if
+    the lookup fails, so every jar falls back to the per-mod lookup.
+    """
+    hashes = {mod_file: get_index(mod_file.parent).entry(mod_file)["sha1"]
+              for mod_file in mod_files}
+    try:
+        latest = get_latest_versions_by_hash(
+            list(hashes.values()), game_version, loader
+        )
+    except (UpdateError, requests.RequestException) as e:
+        logging.warning(f"Bulk lookup failed, checking mods one by one: {e}")
+        return {}
+
+    logging.debug(f"Bulk lookup matched {len(latest)} of {len(hashes)} mods")
+    return {
+        mod_file: latest[file_hash]
+        for mod_file, file_hash in hashes.items()
+        if file_hash in latest
+    }
+
+
+def plan_updates(
+        mods_dir: Path, game_version: str, loader: str, jobs: int = 1,
+        known: Optional[Dict[Path, Dict[str, Any]]] = None,
+        server: str = "", uuid: str = ""
+) -> UpdatePlan:
+    """
+    Resolve the latest version of every jar in mods_dir without changing
+    anything. Mods are resolved on up to ``jobs`` threads and their log
+    output is replayed in filename order. Versions already looked up by
+    hash can be passed in as known. Mods that cannot be resolved are listed
+    as failed and keep their current version. The selected versions are
+    then checked against each other's dependencies.
+    """
+    mod_files = sorted(mods_dir.glob("*.jar"))
+    if known is None:
+        known = lookup_installed_versions(mod_files, game_version, loader)
+    plan: UpdatePlan = {
+        "server": server,
+        "uuid": uuid,
+        "mods_dir": str(mods_dir),
+        "game_version": game_version,
+        "loader": loader,
+        "created": time.time(),
+        "updates": [],
+        "failed": [],
+        "held": [],
+    }
+    selected: Dict[str, Dict[str, Any]] = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(plan_mod_captured, mod_file, mods_dir,
+                        game_version, loader, known.get(mod_file))
+            for mod_file in mod_files
+        ]
+        for mod_file, future in zip(mod_files, futures):
+            latest, planned, records, error = future.result()
+            for record in records:
+                logging.getLogger(record.name).handle(record)
+            if isinstance(error, UpdateError):
+                MOD_UPDATES.inc("failed")
+                logging.error(f"❌ Error: {error}")
+                plan["failed"].append({"file": mod_file.name,
+                                       "error": str(error)})
+            elif error is not None:
+                raise error
+            if latest is not None:
+                selected[mod_file.name] = latest
+            if planned is not None:
+                plan["updates"].append(planned)
+
+    resolve_dependencies(plan, selected, game_version, loader)
+    get_index(mods_dir).save()
+    return plan
+
+
+def apply_plan(plan: UpdatePlan, jobs: int = 1) -> int:
+    """
+    Install a plan's updates as one change and return how many were made.
+
+    Every jar is downloaded into the store first, then a staged copy of the
+    mods directory is changed and swapped in for the old one, which is kept
+    as a rollback snapshot. If anything fails before the swap, the mods
+    directory is left exactly as it was.
+    """
+    updates = plan["updates"]
+    if not updates:
+        return 0
+
+    mods_dir = Path(plan["mods_dir"])
+    index = get_index(mods_dir)
+    for update in updates:
+        if not update["current"]:
+            continue
+        current = mods_dir / update["current"]
+        if (not current.exists()
+                or index.entry(current)["sha1"] != update["sha1"]):
+            raise PlanOutdated(
+                f"{update['current']} changed after the plan was made"
+            )
+
+    store = STORE or ContentStore(mods_dir.parent / STORE_DIR)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        stored = list(pool.map(
+            lambda update: store.fetch(update["file"], CLIENT.session), updates
+        ))
+
+    close_index(mods_dir)
+    staged = mod_set.stage(mods_dir)
+    try:
+        staged_index = JarIndex(staged)
+        try:
+            for update in updates:
+                if not update["current"]:
+                    logging.info(f"\nInstalling {update['target']} for "
+                                 f"{update['required_by']}")
+                    continue
+                logging.info(
+                    f"\nUpdating {update['current']} → {update['target']}"
+                )
+                (staged / update["current"]).unlink(missing_ok=True)
+            for update, jar in zip(updates, stored):
+                store.install(jar, staged / update["target"])
+                staged_index.record_install(staged / update["target"], {
+                    "id": update["version_id"],
+                    "project_id": update["project_id"],
+                    "files": [update["file"]],
+                })
+        finally:
+            staged_index.close()
+        snapshot = mod_set.swap(mods_dir)
+    except BaseException:
+        mod_set.discard(mods_dir)
+        raise
+
+    logging.debug(f"Previous mods kept in {snapshot}")
+    MOD_UPDATES.inc("updated", amount=len(updates))
+    return len(updates)
+
+
+def rollback_mods(mods_dir: Path) -> bool:
+    """
+    Put back the mods replaced by the last applied plan. Returns False if
+    there is nothing to put back.
+    """
+    close_index(mods_dir)
+    if not mod_set.rollback(mods_dir):
+        logging.warning(f"No previous mods to restore in {mods_dir}")
+        return False
+    logging.info(f"Restored the previous mods in {mods_dir}")
+    return True
+
+
+def update_mods(
+        mods_dir: Path, game_version: str, loader: str, jobs: int = 1,
+        known: Optional[Dict[Path, Dict[str, Any]]] = None
+) -> int:
+    """
+    Update every jar in mods_dir and return the number updated. The plan
+    is applied only if it has updates, and as a whole: if it cannot be,
+    no jar is changed.
+    """
+    plan = plan_updates(mods_dir, game_version, loader, jobs, known)
+    try:
+        return apply_plan(plan, jobs)
+    except (UpdateError, OSError) as e:
+        logging.error(f"❌ No mods changed in {mods_dir}: {e}")
         return 0
 
-    logging.info(f"\nUpdating {file.name} → {latest_filename}")
-    url: str = latest["files"][0]["url"]
-    new_path: Path = mods_dir / latest_filename
 
-    response = requests.get(url, timeout=30)
-    new_path.write_bytes(response.content)
+def format_plan(plan: UpdatePlan) -> list[str]:
+    """Describe a plan as lines for the console."""
+    name = plan["server"] or plan["mods_dir"]
+    updates = plan["updates"]
+    size = sum(update["file"].get("size", 0) for update in updates)
+    lines = [
+        f"{name}: {len(updates)} updates, "
+        f"{size / 1024 / 1024:.1f} MiB to download"
+        if updates else f"{name}: up to date"
+    ]
+    lines += [
+        f"  {update['current'] or '+'} → {update['target']} "
+        f"({update['file'].get('size', 0) / 1024:.0f} KiB)"
+        + (f", for {update['required_by']}" if update["required_by"] else "")
+        for update in updates
+    ]
+    lines += [f"  ⏸ {held['file']} stays: {held['reason']}"
+              for held in plan.get("held", [])]
+    lines += [f"  ❌ {failed['file']}: {failed['error']}"
+              for failed in plan["failed"]]
+    return lines
+
 
-    logging.debug(f"Deleting {file.name}")
-    file.unlink()
+def write_plans(path: Path, plans: list[UpdatePlan]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(plans, indent=2, ensure_ascii=False) + "\n")
 
-    return 1
+
+def read_plans(path: Path) -> list[UpdatePlan]:
+    with open(path) as f:
+        plans: list[UpdatePlan] = json.load(f)
+    return plans
+
+
+def find_server_settings(
+        args: argparse.Namespace
+) -> list[tuple[str, str, UpdateSettings]]:
+    """
+    Finds every Crafty server with a mod_updates.json and resolves its
+    settings. Command line options apply to every server.
+    """
+    found = []
+    for uuid, info in sorted(discover_servers().items()):
+        config_path = Path(SERVERS_BASE, uuid, "config", "mod_updates.json")
+        if not config_path.exists():
+            logging.info(f"Skipping {info['name']}: no mod_updates.json")
+            continue
+        server_args = argparse.Namespace(**{
+            **vars(args), "config": config_path, "uuid": uuid
+        })
+        try:
+            settings = resolve_settings(server_args)
+        except UpdateError as e:
+            logging.error(f"❌ Skipping {info['name']}: {e}")
+            continue
+        found.append((uuid, info["name"], settings))
+    return found
+
+
+def update_all_servers(args: argparse.Namespace) -> None:
+    """
+    Updates every server in one process with one consolidated report.
+    Servers on the same game version and loader share one bulk lookup, and
+    version lookups are shared through the in-process memo.
+    """
+    setup_console_logging(args.log_level or "INFO")
+    servers = find_server_settings(args)
+    cache = open_cache(
+        args.cache_path or REPOSITORY_DIR / "logs" / CACHE_FILE,
+        args.cache_ttl if args.cache_ttl is not None else CACHE_TTL
+    )
+    store = open_store(
+        args.store_path or Path(SERVERS_BASE).parent / STORE_DIR
+    )
+
+    known = lookup_servers(servers)
+    restarts = []
+    total = 0
+    try:
+        for uuid, name, settings in servers:
+            updates = update_server(uuid, name, settings, args.jobs, known)
+            if updates > 0:
+                restarts.append(
+                    f"• *{name}* at _{uuid}_: {updates} mod updates"
+                )
+                total += updates
+    finally:
+        logging.info(f"Modrinth cache: {cache.describe()}, "
+                     f"{LOOKUPS.hits} shared lookups")
+        logging.info(f"Modrinth API: {CLIENT.describe()}")
+        logging.info(f"Jar store: {store.describe()}")
+        close_indexes()
+        cache.close()
+        report_restarts(restarts, total)
+
+
+def update_server(uuid: str, name: str, settings: UpdateSettings, jobs: int,
+                  known: Dict[Path, Dict[str, Any]]) -> int:
+    """
+    Updates one server of an --all-servers run, logging to its log file.
+    Any error is logged and counts as no updates, so one broken server
+    does not stop the others or their restart report.
+    """
+    handler = add_file_logging(settings["log_path"] / LOG_FILE)
+    logging.info(f"Updating mods for {name} ({uuid})")
+    try:
+        return update_mods(settings["mods_dir"], settings["game_version"],
+                           settings["loader"], jobs, known)
+    except Exception as e:
+        logging.exception(f"❌ Updating {name} ({uuid}) failed: {e}")
+        return 0
+    finally:
+        logging.getLogger().removeHandler(handler)
+        handler.close()
+
+
+def plan_all_servers(args: argparse.Namespace) -> list[UpdatePlan]:
+    """
+    Plans the updates of every server without downloading or changing
+    anything, and logs each plan. Writes the plans to --plan-file if given.
+    """
+    setup_console_logging(args.log_level or "INFO")
+    servers = find_server_settings(args)
+    cache = open_cache(
+        args.cache_path or REPOSITORY_DIR / "logs" / CACHE_FILE,
+        args.cache_ttl if args.cache_ttl is not None else CACHE_TTL
+    )
+    known = lookup_servers(servers)
+
+    plans = []
+    for uuid, name, settings in servers:
+        plan = plan_updates(settings["mods_dir"], settings["game_version"],
+                            settings["loader"], args.jobs, known, name, uuid)
+        for line in format_plan(plan):
+            logging.info(line)
+        plans.append(plan)
+    if args.plan_file:
+        write_plans(args.plan_file, plans)
+
+    logging.info(f"Modrinth cache: {cache.describe()}, "
+                 f"{LOOKUPS.hits} shared lookups")
+    logging.info(f"Modrinth API: {CLIENT.describe()}")
+    close_indexes()
+    cache.close()
+    return plans
+
+
+def apply_plan_file(args: argparse.Namespace) -> None:
+    """
+    Applies the plans in a file written by --plan-file. Plans without
+    updates are skipped, so nothing is opened for servers that are current.
+    """
+    setup_console_logging(args.log_level or "INFO")
+    plans = [plan for plan in read_plans(args.apply) if plan["updates"]]
+    if not plans:
+        logging.info("Nothing to update")
+        return
+    store = open_store(
+        args.store_path or Path(SERVERS_BASE).parent / STORE_DIR
+    )
+
+    restarts = []
+    total = 0
+    for plan in plans:
+        name = plan["server"] or plan["mods_dir"]
+        logging.info(f"Applying {len(plan['updates'])} updates to {name}")
+        try:
+            updates = apply_plan(plan, args.jobs)
+        except (UpdateError, OSError) as e:
+            logging.error(f"❌ No mods changed for {name}: {e}")
+            continue
+        restarts.append(
+            f"• *{name}* at _{plan['uuid']}_: {updates} mod updates"
+        )
+        total += updates
+
+    logging.info(f"Jar store: {store.describe()}")
+    close_indexes()
+    report_restarts(restarts, total)
+
+
+def rollback_servers(args: argparse.Namespace) -> None:
+    """
+    Rolls back the last applied update of every server with
+    --all-servers, or else of the configured server.
+    """
+    setup_console_logging(args.log_level or "INFO")
+    if args.all_servers:
+        servers = find_server_settings(args)
+    else:
+        settings = resolve_settings(args)
+        name = (get_server_name(args.uuid) if args.uuid
+                else str(settings["mods_dir"]))
+        servers = [(args.uuid or "", name, settings)]
+
+    restarts = []
+    for uuid, name, settings in servers:
+        try:
+            if rollback_mods(settings["mods_dir"]):
+                restarts.append(f"• *{name}* at _{uuid}_")
+        except OSError as e:
+            logging.error(f"❌ Could not roll back {name}: {e}")
+    if restarts:
+        send_to_slack(
+            "Mod Updates",
+            "Need to restart after rolling back mods:\n"
+            + "\n".join(restarts),
+            f"Rolled back mods on {len(restarts)} servers"
+        )
+
+
+def lookup_servers(
+        servers: list[tuple[str, str, UpdateSettings]]
+) -> Dict[Path, Dict[str, Any]]:
+    """Looks up every server's jars with one bulk lookup per game version."""
+    groups: dict[tuple[str, str], list[Path]] = {}
+    for _, _, settings in servers:
+        key = (settings["game_version"], settings["loader"])
+        groups.setdefault(key, []).extend(
+            sorted(settings["mods_dir"].glob("*.jar"))
+        )
+    known: Dict[Path, Dict[str, Any]] = {}
+    for (game_version, loader), mod_files in groups.items():
+        known.update(
+            lookup_installed_versions(mod_files, game_version, loader)
+        )
+    return known
+
+
+def report_restarts(restarts: list[str], total: int) -> None:
+    if restarts:
+        send_to_slack(
+            "Mod Updates",
+            "Need to restart:\n" + "\n".join(restarts),
+            f"Updated {total} mods on {len(restarts)} servers"
+        )
+
+
+def report_metrics(path: Optional[Path]) -> None:
+    """Log the run's metrics as JSON, and write them to path if given."""
+    summary = json.dumps(metrics.summary(), sort_keys=True)
+    logging.info(f"Metrics: {summary}")
+    if path is not None:
+        path.write_text(summary + "\n")
 
 
 def main() -> None:
+    metrics.enable()
     try:
         args = parse_args()
+        if args.rollback:
+            rollback_servers(args)
+            return
+        if args.apply:
+            apply_plan_file(args)
+            report_metrics(args.metrics_file)
+            return
+        if args.all_servers:
+            if args.plan:
+                plan_all_servers(args)
+            else:
+                update_all_servers(args)
+            report_metrics(args.metrics_file)
+            return
+
         settings = resolve_settings(args)
 
         log_path: Path = Path(settings["log_path"]) / LOG_FILE
         setup_logging(log_path, settings["log_level"])
+        cache = open_cache(settings["cache_path"], settings["cache_ttl"])
+        if args.plan:
+            plan = plan_updates(settings["mods_dir"],
+                                settings["game_version"], settings["loader"],
+                                args.jobs, uuid=args.uuid or "")
+            for line in format_plan(plan):
+                logging.info(line)
+            if args.plan_file:
+                write_plans(args.plan_file, [plan])
+            close_indexes()
+            cache.close()
+            report_metrics(args.metrics_file)
+            return
+        store = open_store(settings["store_path"])
 
-        updates = 0
-
-        for mod_file in settings["mods_dir"].glob("*.jar"):
-            try:
-                updates += update_mod(
-                    mod_file,
-                    settings["mods_dir"],
-                    settings["game_version"],
-                    settings["loader"]
-                )
-            except UpdateError as e:
-                logging.error(f"❌ Error: {e}")
+        updates = update_mods(
+            settings["mods_dir"],
+            settings["game_version"],
+            settings["loader"],
+            args.jobs
+        )
+        logging.info(f"Modrinth cache: {cache.describe()}")
+        logging.info(f"Modrinth API: {CLIENT.describe()}")
+        logging.info(f"Jar store: {store.describe()}")
+        close_indexes()
+        cache.close()
+        report_metrics(args.metrics_file)
         if updates > 0:
             server_name = get_server_name(args.uuid)
             send_to_slack(
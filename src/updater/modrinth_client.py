@@ -0,0 +1,288 @@
+"""
+HTTP client for the Modrinth API that stays within its rate limit.
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.updater.errors import ApiFailed
+from src.utility import metrics
+
+MAX_CONNECTIONS: int = 32
+MODRINTH_REQUESTS_PER_MINUTE: int = int(
+    os.getenv("MODRINTH_REQUESTS_PER_MINUTE", "300")
+)
+MODRINTH_MAX_CONCURRENCY: int = int(
+    os.getenv("MODRINTH_MAX_CONCURRENCY", str(MAX_CONNECTIONS))
+)
+MODRINTH_RETRIES: int = int(os.getenv("MODRINTH_RETRIES", "4"))
+BACKOFF_BASE: float = 0.5
+BACKOFF_MAX: float = 30.0
+INITIAL_CONCURRENCY: int = 8
+SLOW_FACTOR: float = 3.0
+SLOW_SECONDS: float = 1.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+MODRINTH_REQUESTS = metrics.counter(
+    "modrinth_requests_total",
+    "Modrinth API requests by endpoint and HTTP status",
+    ("endpoint", "status")
+)
+MODRINTH_SECONDS = metrics.histogram("modrinth_request_seconds",
+                                     "Modrinth API request latency",
+                                     ("endpoint",))
+THROTTLE_SECONDS = metrics.histogram("modrinth_throttle_seconds",
+                                     "Time spent waiting for the rate limiter")
+RETRIES = metrics.counter("modrinth_retries_total",
+                          "Modrinth API requests retried, by reason",
+                          ("reason",))
+CONCURRENCY = metrics.gauge("modrinth_concurrency",
+                            "Modrinth API requests allowed at once")
+
+
+def create_session(pool_size: int = MAX_CONNECTIONS) -> requests.Session:
+    """Create a keep-alive session shared by every worker thread."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread that calls the Modrinth API.
+
+    The bucket refills at the configured rate, but the rate-limit headers
+    of each response take precedence: until the window Modrinth reports
+    resets, no more requests are made than it says remain, less those
+    already sent since.
+    """
+
+    def __init__(self, per_minute: int, burst: int = 10):
+        self.rate = per_minute / 60
+        self.burst = burst
+        self.waited = 0.0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._remaining: Optional[int] = None
+        self._reset_at = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        start: Optional[float] = None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if start is None:
+                    start = now
+                wait = self._wait(now)
+                if wait <= 0:
+                    self._tokens -= 1
+                    if self._remaining is not None:
+                        self._remaining -= 1
+                    self.waited += now - start
+                    THROTTLE_SECONDS.observe(now - start)
+                    return
+            time.sleep(wait)
+
+    def update(self, remaining: int, reset: float) -> None:
+        """Apply a response's remaining requests and seconds to reset."""
+        with self._lock:
+            reset_at = time.monotonic() + reset
+            if self._remaining is None or reset_at > self._reset_at + 0.5:
+                self._remaining = remaining
+            else:
+                self._remaining = min(self._remaining, remaining)
+            self._reset_at = max(self._reset_at, reset_at)
+
+    def pause(self, seconds: float) -> None:
+        """Make no requests for the next ``seconds``."""
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + seconds)
+
+    def _wait(self, now: float) -> float:
+        """Return how long to wait before the next request; 0 if none."""
+        self._tokens = min(self.burst,
+                           self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if now >= self._reset_at:
+            self._remaining = None
+        waits = [self._paused_until - now, (1 - self._tokens) / self.rate]
+        if self._remaining is not None and self._remaining < 1:
+            waits.append(self._reset_at - now)
+        return max(waits)
+
+
+class AdaptiveConcurrency:
+    """
+    Limits requests in flight, adapting the limit AIMD style.
+
+    Every request that completes in reasonable time raises the limit by
+    1 / limit, about one per round trip. A 429, or a request taking over
+    SLOW_SECONDS and much longer than the fastest seen, halves it, at most
+    once per round trip so one burst of slow responses counts once.
+    """
+
+    def __init__(self, initial: int = INITIAL_CONCURRENCY,
+                 maximum: int = MODRINTH_MAX_CONCURRENCY):
+        self.maximum = maximum
+        self.limit = float(min(initial, maximum))
+        self._in_flight = 0
+        self._fastest: Optional[float] = None
+        self._decreased = 0.0
+        self._condition = threading.Condition()
+        CONCURRENCY.set_function(lambda: self.limit)
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """Finish a request that took ``latency`` seconds."""
+        with self._condition:
+            self._in_flight -= 1
+            if self._fastest is None or latency < self._fastest:
+                self._fastest = latency
+            slow = (latency > SLOW_SECONDS
+                    and latency > self._fastest * SLOW_FACTOR)
+            now = time.monotonic()
+            if throttled or slow:
+                if now - self._decreased > latency:
+                    self.limit = max(1.0, self.limit / 2)
+                    self._decreased = now
+            else:
+                self.limit = min(float(self.maximum),
+                                 self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class ModrinthClient:
+    """
+    Sends requests to the Modrinth API through one keep-alive pool.
+
+    Each request waits for the rate limiter and a concurrency slot.
+    Connection errors, 429s and 5xx responses are retried up to
+    MODRINTH_RETRIES times. A 429 pauses every thread until the reset
+    Modrinth gives, while other failures back off exponentially with full
+    jitter. The last response is returned once retries run out, so callers
+    still see the status. Jar downloads, which come from the CDN, use
+    ``session`` directly and are not limited.
+    """
+
+    def __init__(self,
+                 requests_per_minute: int = MODRINTH_REQUESTS_PER_MINUTE,
+                 burst: int = 10, retries: int = MODRINTH_RETRIES,
+                 session: Optional[requests.Session] = None):
+        self.session = session or create_session()
+        self.limiter = RateLimiter(requests_per_minute, burst)
+        self.concurrency = AdaptiveConcurrency()
+        self.retries = retries
+        self.requests = 0
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, endpoint: str, timeout: float = 15,
+            **options: Any) -> requests.Response:
+        return self.request("GET", url, endpoint, timeout, **options)
+
+    def post(self, url: str, endpoint: str, timeout: float = 30,
+             **options: Any) -> requests.Response:
+        return self.request("POST", url, endpoint, timeout, **options)
+
+    def request(self, method: str, url: str, endpoint: str,
+                timeout: float, **options: Any) -> requests.Response:
+        """
+        Send a request, retrying what can be retried. Raises ApiFailed if
+        the API cannot be reached at all.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send(method, url, endpoint, timeout,
+                                      **options)
+            except requests.RequestException as e:
+                if attempt >= self.retries:
+                    raise ApiFailed(
+                        f"Modrinth {endpoint} request failed: {e}"
+                    ) from e
+                self._retry("connection")
+                time.sleep(backoff(attempt))
+            else:
+                if (response.status_code not in RETRY_STATUSES
+                        or attempt >= self.retries):
+                    return response
+                if response.status_code == 429:
+                    self._retry("throttled")
+                    self.limiter.pause(retry_after(response))
+                else:
+                    self._retry("server")
+                    time.sleep(backoff(attempt))
+            attempt += 1
+
+    def describe(self) -> str:
+        return (f"{self.requests} requests, {self.retried} retries, "
+                f"{self.limiter.waited:.1f}s waiting on the rate limit, "
+                f"{self.concurrency.limit:.0f} concurrent")
+
+    def _send(self, method: str, url: str, endpoint: str, timeout: float,
+              **options: Any) -> requests.Response:
+        self.limiter.acquire()
+        self.concurrency.acquire()
+        sent = time.perf_counter()
+        throttled = True
+        try:
+            response = self.session.request(method, url, timeout=timeout,
+                                            **options)
+            throttled = response.status_code == 429
+        finally:
+            latency = time.perf_counter() - sent
+            self.concurrency.release(latency, throttled)
+            MODRINTH_SECONDS.observe(latency, endpoint)
+            with self._lock:
+                self.requests += 1
+
+        MODRINTH_REQUESTS.inc(endpoint, str(response.status_code))
+        remaining = response.headers.get("X-Ratelimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            self.limiter.update(int(remaining), reset_seconds(response))
+        return response
+
+    def _retry(self, reason: str) -> None:
+        with self._lock:
+            self.retried += 1
+        RETRIES.inc(reason)
+
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_MAX,  # nosec[B311]
+                                 BACKOFF_BASE * 2 ** attempt))
+
+
+def reset_seconds(response: requests.Response) -> float:
+    reset = response.headers.get("X-Ratelimit-Reset", "")
+    try:
+        return max(0.0, float(reset))
+    except ValueError:
+        return 1.0
+
+
+def retry_after(response: requests.Response) -> float:
+    """Seconds to wait after a 429, with jitter so threads spread out."""
+    header = response.headers.get("Retry-After")
+    try:
+        delay = float(header) if header else reset_seconds(response)
+    except ValueError:
+        delay = reset_seconds(response)
+    return min(BACKOFF_MAX, delay) + random.uniform(0, 1)  # nosec[B311]
@@ -0,0 +1,167 @@
+"""
+Persistent cache for Modrinth API responses.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, TypedDict
+
+CACHE_FILE: str = "modrinth_cache.sqlite"
+
+
+class CachedResponse(TypedDict):
+    body: Any
+    etag: Optional[str]
+    fresh: bool
+
+
+class ResponseCache:
+    """
+    Stores JSON responses in SQLite with a time to live and ETags.
+
+    Fresh entries are served without a request. Stale entries keep their
+    ETag so the caller can make a conditional request and call ``refresh``
+    on HTTP 304. The least recently used entries are evicted once the
+    stored bodies exceed ``max_bytes``; a running total of their size
+    means the table is only scanned when that happens.
+
+    Reads only note their access time in memory. The times are written in
+    one transaction before the next eviction, on ``flush`` and on
+    ``close``, so a lookup never has to commit.
+    """
+
+    def __init__(self, path: Path, ttl: float = 3600,
+                 max_bytes: int = 64 * 1024 * 1024):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._accessed: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._connection.commit()
+        self._size = self._stored_size()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return json.dumps(parts)
+
+    def get(self, key: str,
+            stale_ok: bool = False) -> Optional[CachedResponse]:
+        """
+        Return a cached response. Fresh ones count as hits; stale ones
+        count as misses, or as stale hits when the caller will use them
+        anyway because the response never changes.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, etag, fetched FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+
+        body, etag, fetched = row
+        fresh = now - fetched < self.ttl
+        if fresh:
+            self.hits += 1
+        elif stale_ok:
+            self.stale_hits += 1
+        else:
+            self.misses += 1
+        return {"body": json.loads(body), "etag": etag, "fresh": fresh}
+
+    def store(self, key: str, body: Any, etag: Optional[str]) -> None:
+        text = json.dumps(body)
+        now = time.time()
+        with self._lock:
+            replaced = self._connection.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._connection.execute("""
+                INSERT OR REPLACE INTO responses
+                    (key, etag, body, size, fetched, accessed)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, etag, text, len(text), now, now))
+            self._size += len(text) - (replaced[0] if replaced else 0)
+            self._accessed.pop(key, None)
+            if self._size > self.max_bytes:
+                self._write_accessed()
+                self._evict()
+            self._connection.commit()
+
+    def refresh(self, key: str) -> None:
+        """Mark a stale entry fresh after the server answered 304."""
+        now = time.time()
+        with self._lock:
+            self.revalidated += 1
+            self._accessed.pop(key, None)
+            self._connection.execute(
+                "UPDATE responses SET fetched = ?, accessed = ? "
+                "WHERE key = ?",
+                (now, now, key)
+            )
+            self._connection.commit()
+
+    def describe(self) -> str:
+        return (f"{self.hits} hits, {self.stale_hits} stale hits, "
+                f"{self.misses} misses ({self.revalidated} revalidated)")
+
+    def flush(self) -> None:
+        """Write the access times noted since the last write."""
+        with self._lock:
+            self._write_accessed()
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_accessed()
+            self._connection.commit()
+            self._connection.close()
+
+    def _write_accessed(self) -> None:
+        if not self._accessed:
+            return
+        self._connection.executemany(
+            "UPDATE responses SET accessed = ? WHERE key = ?",
+            [(accessed, key) for key, accessed in self._accessed.items()]
+        )
+        self._accessed.clear()
+
+    def _evict(self) -> None:
+        self._connection.execute("""
+            DELETE FROM responses WHERE key IN (
+                SELECT key FROM (
+                    SELECT key, SUM(size) OVER (
+                        ORDER BY accessed DESC, key
+                    ) AS total
+                    FROM responses
+                ) WHERE total > ?
+            )
+        """, (self.max_bytes,))
+        self._size = self._stored_size()
+
+    def _stored_size(self) -> int:
+        [(size,)] = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchall()
+        return int(size)
@@ -1,47 +1,75 @@
 """
 Deduplication utility for log messages.
 """
-import re
 import time
-from typing import Dict
+from collections import OrderedDict
+from typing import Union
+
+from src.utility import metrics
+from src.utility.log_parser import LogRecord, parse_line
+
+MESSAGES = metrics.counter("dedup_messages_total",
+                           "Messages checked by deduplicators, by result",
+                           ("result",))
 
 
 class MessageDeduplicator:
     """Deduplicates log messages within a time window, ignoring timestamps."""
 
-    def __init__(self, window_seconds: int = 30):
+    def __init__(self, window_seconds: int = 30, max_entries: int = 10_000):
         self.window_seconds = window_seconds
-        self._seen_messages: Dict[str, float] = {}
+        self.max_entries = max_entries
+        self._seen_messages: OrderedDict[str, float] = OrderedDict()
 
-    def _extract_core_message(self, message: str) -> str:
+    def _extract_core_message(self, message: Union[str, LogRecord]) -> str:
         """
-        Extract the core message content, removing timestamps and other time-related elements.
-        This helps in identifying when the actual message content is the same.
+        Extract the core message content, removing timestamps and other
+        time-related elements. This helps in identifying when the actual
+        message content is the same. Parsed records already carry it.
+        """
+        if isinstance(message, str):
+            message = parse_line(message)
+
+        return message.body
+
+    def _expire(self, current_time: float) -> None:
         """
-        timestamp_pattern = r'^\[[\d\-:T\s]+\]\s*'
-        core_message = re.sub(timestamp_pattern, '', message, count=1)
+        Pop expired messages from the least recently seen end.
 
-        return core_message.strip()
+        A duplicate moves its message to the recent end without changing the
+        first-seen time, so an expired message can sit behind a live one.
+        is_unique checks the time itself, and the size cap evicts it later.
+        """
+        seen = self._seen_messages
+        while seen:
+            timestamp = seen[next(iter(seen))]
+            if current_time - timestamp <= self.window_seconds:
+                return
+            seen.popitem(last=False)
 
-    def is_unique(self, message: str) -> bool:
+    def is_unique(self, message: Union[str, LogRecord]) -> bool:
         """
         Returns True if a message is unique within the time window.
-        Uses core message content for duplicate detection, but preserves full message.
-        Updates the timestamp for the message if it's unique.
+        Uses core message content for duplicate detection, but preserves
+        full message. Updates the timestamp for the message if it's unique.
         """
         current_time = time.time()
-
-        expired = [
-            msg for msg, timestamp in self._seen_messages.items()
-            if current_time - timestamp > self.window_seconds
-        ]
-        for msg in expired:
-            del self._seen_messages[msg]
+        self._expire(current_time)
 
         core_message = self._extract_core_message(message)
+        seen = self._seen_messages
+        timestamp = seen.get(core_message)
+
+        if (timestamp is not None
+                and current_time - timestamp <= self.window_seconds):
+            seen.move_to_end(core_message)
+            MESSAGES.inc("duplicate")
+            return False
 
-        if core_message not in self._seen_messages:
-            self._seen_messages[core_message] = current_time
-            return True
+        seen[core_message] = current_time
+        seen.move_to_end(core_message)
+        if len(seen) > self.max_entries:
+            seen.popitem(last=False)
 
-        return False
+        MESSAGES.inc("unique")
+        return True
@@ -0,0 +1,80 @@
+"""
+Parser splitting Minecraft, Fabric, Forge, Paper and Geyser log lines into
+fields.
+"""
+import re
+from typing import Iterable
+
+PREFIX_PATTERN = re.compile(
+    r"\[(\d[^\] ]*(?: \d[^\] ]*)*)(?: ([A-Z]+))?\]:? *()"
+    r"(?:\[([^\]]*)/([A-Z]+)\]:? ?)?"
+    r"(?:\(([^)\s]+)\) |\[([^\]/\s]+)/[^\]\s]*\]: ?)?"
+)
+
+
+class LogRecord:
+    """
+    One log line split into its parts.
+
+    ``body`` is everything after the timestamp and ``message`` is the text
+    after the thread, level and logger. Fields a format lacks are empty;
+    a line without a timestamp keeps its whole text in both.
+    """
+
+    __slots__ = ("line", "time", "thread", "level", "logger", "body",
+                 "message")
+
+    def __init__(self, line: str, time: str = "", thread: str = "",
+                 level: str = "", logger: str = "", body: str = "",
+                 message: str = ""):
+        self.line = line
+        self.time = time
+        self.thread = thread
+        self.level = level
+        self.logger = logger
+        self.body = body
+        self.message = message
+
+    def __repr__(self) -> str:
+        return (f"LogRecord(time={self.time!r}, thread={self.thread!r}, "
+                f"level={self.level!r}, logger={self.logger!r}, "
+                f"message={self.message!r})")
+
+
+def parse_line(line: str) -> LogRecord:
+    """
+    Split one log line into a LogRecord.
+
+    Only the prefix is matched by the regex; the body and message are
+    sliced from the line at the positions it reports.
+    """
+    match = PREFIX_PATTERN.match(line)
+    if match is None:
+        text = line.strip()
+        return LogRecord(line, body=text, message=text)
+
+    (time, stamp_level, _, thread, level, logger,
+     forge_logger) = match.groups("")
+    return LogRecord(line, time, thread, level or stamp_level,
+                     logger or forge_logger, line[match.start(3):],
+                     line[match.end():])
+
+
+def parse_many(lines: Iterable[str]) -> list[LogRecord]:
+    """Split a batch of log lines, with the per-line lookups hoisted."""
+    match = PREFIX_PATTERN.match
+    record = LogRecord
+    records: list[LogRecord] = []
+    append = records.append
+    for line in lines:
+        found = match(line)
+        if found is None:
+            text = line.strip()
+            append(record(line, body=text, message=text))
+            continue
+        (time, stamp_level, _, thread, level, logger,
+         forge_logger) = found.groups("")
+        append(record(line, time, thread, level or stamp_level,
+                      logger or forge_logger, line[found.start(3):],
+                      line[found.end():]))
+    return records
@@ -0,0 +1,283 @@
+"""
+Counters, gauges and histograms for the listener and updater hot paths.
+
+Recording is a single flag check while metrics are disabled, so call sites
+can instrument unconditionally. The listener serves the metrics in the
+Prometheus text format; the updater logs a JSON summary instead.
+"""
+import bisect
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, TypeVar
+
+from dotenv import load_dotenv
+
+load_dotenv()
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0)
+
+Labels = tuple[str, ...]
+
+_enabled = os.getenv("METRICS_ENABLED", "0") == "1" or METRICS_PORT > 0
+
+
+class Metric(ABC):
+    """A named family of values, one per combination of label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, description: str,
+                 labels: Labels = ()):
+        self.name = name
+        self.description = description
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def samples(self) -> list[tuple[str, Labels, float]]:
+        """Return (suffix, label values, value) for every sample."""
+
+    @abstractmethod
+    def summarize(self) -> Any:
+        """Return the metric's values in a JSON-friendly form."""
+
+    def _label_text(self, values: Labels, extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"'
+                 for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Labels = ()):
+        super().__init__(name, description, labels)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> list[tuple[str, Labels, float]]:
+        with self._lock:
+            return [("", labels, value)
+                    for labels, value in self._values.items()]
+
+    def summarize(self) -> Any:
+        with self._lock:
+            return _by_labels(self._values)
+
+
+class Gauge(Metric):
+    """A value that goes up and down, set directly or read on collection."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: Labels = ()):
+        super().__init__(name, description, labels)
+        self._values: dict[Labels, float] = {}
+        self._functions: dict[Labels, Callable[[], float]] = {}
+
+    def set(self, value: float, *labels: str) -> None:
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, function: Callable[[], float],
+                     *labels: str) -> None:
+        """Read the value from function whenever metrics are collected."""
+        with self._lock:
+            self._functions[labels] = function
+
+    def samples(self) -> list[tuple[str, Labels, float]]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for labels, function in functions.items():
+            values[labels] = float(function())
+        return [("", labels, value) for labels, value in values.items()]
+
+    def summarize(self) -> Any:
+        return _by_labels({labels: value
+                           for _, labels, value in self.samples()})
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Labels = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = buckets
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not _enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(labels)
+            if counts is None:
+                counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+                self._sums[labels] = 0.0
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def samples(self) -> list[tuple[str, Labels, float]]:
+        samples: list[tuple[str, Labels, float]] = []
+        with self._lock:
+            for labels, counts in self._counts.items():
+                total = 0
+                for bound, count in zip(self.buckets + (float("inf"),),
+                                        counts):
+                    total += count
+                    samples.append(("_bucket", labels + (_bound(bound),),
+                                    total))
+                samples.append(("_sum", labels, self._sums[labels]))
+                samples.append(("_count", labels, total))
+        return samples
+
+    def summarize(self) -> Any:
+        with self._lock:
+            return _by_labels({
+                labels: {
+                    "count": sum(counts),
+                    "sum": round(self._sums[labels], 6),
+                    "mean": round(self._sums[labels] / sum(counts), 6),
+                    "p50": self._quantile(counts, 0.5),
+                    "p99": self._quantile(counts, 0.99),
+                }
+                for labels, counts in self._counts.items()
+            })
+
+    def _quantile(self, counts: list[int], quantile: float) -> float:
+        """Return the upper bound of the bucket holding the quantile."""
+        rank = quantile * sum(counts)
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            total += count
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    def _label_text(self, values: Labels, extra: str = "") -> str:
+        if len(values) > len(self.label_names):
+            values, bound = values[:-1], values[-1]
+            extra = f'le="{bound}"'
+        return super()._label_text(values, extra)
+
+
+MetricType = TypeVar("MetricType", bound=Metric)
+REGISTRY: dict[str, Metric] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def counter(name: str, description: str, labels: Labels = ()) -> Counter:
+    """Return the counter with this name, creating it on first use."""
+    return _register(Counter(name, description, labels))
+
+
+def gauge(name: str, description: str, labels: Labels = ()) -> Gauge:
+    return _register(Gauge(name, description, labels))
+
+
+def histogram(name: str, description: str, labels: Labels = (),
+              buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, description, labels, buckets))
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in list(REGISTRY.values()):
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for suffix, labels, value in metric.samples():
+            lines.append(f"{metric.name}{suffix}"
+                         f"{metric._label_text(labels)} {value:g}")
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> dict[str, Any]:
+    """Return every recorded metric as JSON-friendly values."""
+    return {name: metric.summarize()
+            for name, metric in list(REGISTRY.items())
+            if metric.samples()}
+
+
+def serve(port: int = METRICS_PORT,
+          host: str = "0.0.0.0") -> ThreadingHTTPServer:  # nosec[B104]
+    """Enable metrics and serve them at /metrics from a daemon thread."""
+    enable()
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[metrics] Serving on port {server.server_address[1]}")
+    return server
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path == "/metrics":
+            body = render().encode()
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(summary()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def _register(metric: MetricType) -> MetricType:
+    with _REGISTRY_LOCK:
+        registered = REGISTRY.setdefault(metric.name, metric)
+    if not isinstance(registered, type(metric)):
+        raise ValueError(f"Metric {metric.name} is already a "
+                         f"{registered.kind}")
+    return registered
+
+
+def _by_labels(values: dict[Labels, Any]) -> Any:
+    """Collapse unlabelled metrics to a value; join label values with /."""
+    if list(values) == [()]:
+        return values[()]
+    return {"/".join(labels): value for labels, value in values.items()}
+
+
+def _bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+def _escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
@@ -0,0 +1,377 @@
+"""
+Fan-out of events to every notification sink that wants them.
+
+Each sink has its own worker thread, bounded queue and circuit breaker, so
+a slow or failing sink only ever delays itself: ``notify`` never blocks.
+Slack receives every event. Pushover is added when its keys are set and
+receives events from PUSHOVER_SEVERITY up. A JSON Lines file sink is added
+when NOTIFY_JSONL_PATH is set.
+"""
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from enum import IntEnum
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from src.utility import metrics
+from src.utility.pushover_notifier import (PUSHOVER_TOKEN, PUSHOVER_USER,
+                                           SESSION, post_to_pushover)
+from src.utility.slack_notifier import BATCHER, SlackBatcher
+
+load_dotenv()
+NOTIFY_JSONL_PATH = os.getenv("NOTIFY_JSONL_PATH")
+PUSHOVER_SEVERITY = os.getenv("PUSHOVER_SEVERITY", "critical")
+SINK_QUEUE_SIZE = int(os.getenv("SINK_QUEUE_SIZE", "1000"))
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET_SECONDS = float(os.getenv("BREAKER_RESET_SECONDS", "60"))
+
+SINK_EVENTS = metrics.counter("notifier_events_total",
+                              "Events per sink by outcome",
+                              ("sink", "outcome"))
+SINK_QUEUE = metrics.gauge("notifier_queue_depth",
+                           "Events waiting for a sink's worker", ("sink",))
+BREAKER_OPEN = metrics.gauge("notifier_breaker_open",
+                             "1 while a sink's circuit breaker sheds events",
+                             ("sink",))
+
+
+class Severity(IntEnum):
+    INFO = 0
+    WARNING = 1
+    CRITICAL = 2
+
+
+Delivered = Callable[[str, float], None]
+
+
+class Event:
+    """
+    A notification on its way to the sinks.
+
+    ``read_at`` is the monotonic time its log line was read. Each sink that
+    delivers the event calls ``on_delivered`` with its name and the seconds
+    since then.
+    """
+
+    __slots__ = ("name", "message", "summary", "severity", "created",
+                 "read_at", "on_delivered")
+
+    def __init__(self, name: str, message: str, summary: str,
+                 severity: Severity = Severity.INFO,
+                 read_at: Optional[float] = None,
+                 on_delivered: Optional[Delivered] = None):
+        self.name = name
+        self.message = message
+        self.summary = summary
+        self.severity = severity
+        self.created = time.time()
+        self.read_at = time.monotonic() if read_at is None else read_at
+        self.on_delivered = on_delivered
+
+    def delivered(self, sink: str) -> None:
+        if self.on_delivered is not None:
+            self.on_delivered(sink, time.monotonic() - self.read_at)
+
+
+class Sink(ABC):
+    """
+    Somewhere events are delivered. ``send`` raises when it fails.
+
+    A ``deferred`` sink only queues events in ``send`` and calls
+    ``Event.delivered`` itself once they are out.
+    """
+
+    name = "sink"
+    deferred = False
+
+    @abstractmethod
+    def send(self, event: Event) -> None:
+        """Deliver an event, raising if it could not be."""
+
+    def close(self) -> None:
+        pass
+
+
+class SlackSink(Sink):
+    """
+    Hands events to the Slack batcher, which posts them in batches.
+
+    Batches are posted in the background, so once one fails, events are
+    posted one at a time until Slack accepts one again. Those posts raise
+    when they fail, so the circuit breaker opens and sheds events instead
+    of letting them pile up while Slack is down. Without a batch window
+    every event is posted directly.
+    """
+
+    name = "slack"
+    deferred = True
+
+    def __init__(self, batcher: Optional[SlackBatcher] = None):
+        self.batcher = batcher or BATCHER
+
+    def send(self, event: Event) -> None:
+        if self.batcher.window > 0 and self.batcher.error is None:
+            self.batcher.add(event.name, event.message, event.summary,
+                             lambda: event.delivered(self.name))
+        else:
+            self.batcher.post(event.name, event.message, event.summary)
+            event.delivered(self.name)
+
+
+class PushoverSink(Sink):
+    """Pushes events to phones, with priority following severity."""
+
+    name = "pushover"
+    PRIORITIES = {Severity.INFO: -1, Severity.WARNING: 0,
+                  Severity.CRITICAL: 1}
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session or SESSION
+
+    def send(self, event: Event) -> None:
+        post_to_pushover(event.name, f"{event.summary}\n{event.message}",
+                         priority=self.PRIORITIES[event.severity],
+                         session=self.session)
+
+
+class JsonlSink(Sink):
+    """Appends every event to a JSON Lines file."""
+
+    name = "file"
+
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def send(self, event: Event) -> None:
+        self._file.write(json.dumps({
+            "time": event.created,
+            "server": event.name,
+            "severity": event.severity.name.lower(),
+            "summary": event.summary,
+            "message": event.message,
+        }, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CircuitBreaker:
+    """
+    Stops calls to a sink that keeps failing.
+
+    After ``failures`` consecutive failures the breaker opens and events
+    are shed for ``reset_seconds``. It then lets one trial event through:
+    success closes it again, failure reopens it.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES,
+                 reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._failed = 0
+        self._opened: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened is None:
+            return "closed"
+        if time.monotonic() - self._opened >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self) -> None:
+        self._failed = 0
+        self._opened = None
+
+    def record_failure(self) -> None:
+        self._failed += 1
+        if self._opened is not None or self._failed >= self.failures:
+            self._opened = time.monotonic()
+
+
+class SinkWorker:
+    """
+    Delivers one sink's events from a bounded queue on its own thread.
+
+    A full queue drops its oldest event, so producers never wait. A
+    producer that would rather hold events back can wait for room first.
+    """
+
+    def __init__(self, sink: Sink, min_severity: Severity = Severity.INFO,
+                 queue_size: int = SINK_QUEUE_SIZE,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.sink = sink
+        self.min_severity = min_severity
+        self.queue_size = queue_size
+        self.breaker = breaker or CircuitBreaker()
+        self._events: deque[Event] = deque()
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        SINK_QUEUE.set_function(self.pending, sink.name)
+        BREAKER_OPEN.set_function(
+            lambda: float(self.breaker.state == "open"), sink.name
+        )
+
+    def offer(self, event: Event) -> None:
+        """Queue an event for the sink if its severity is high enough."""
+        if event.severity < self.min_severity:
+            return
+        with self._condition:
+            if len(self._events) >= self.queue_size:
+                self._events.popleft()
+                SINK_EVENTS.inc(self.sink.name, "dropped")
+            self._events.append(event)
+            self._condition.notify_all()
+        self.start()
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                daemon=True)
+                self._thread.start()
+
+    def pending(self) -> int:
+        with self._condition:
+            return len(self._events) + self._busy
+
+    def wait_for_room(self, timeout: float) -> bool:
+        """Wait until an event can be queued without dropping another."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: len(self._events) < self.queue_size, timeout
+            )
+
+    def drain(self, timeout: float) -> bool:
+        """Wait until the queue is empty; return False on timeout."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._events or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._events:
+                    self._condition.wait()
+                event = self._events.popleft()
+                self._busy = True
+            try:
+                self._deliver(event)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _deliver(self, event: Event) -> None:
+        name = self.sink.name
+        if not self.breaker.allow():
+            SINK_EVENTS.inc(name, "shed")
+            return
+        try:
+            self.sink.send(event)
+        except Exception as e:
+            self.breaker.record_failure()
+            SINK_EVENTS.inc(name, "failed")
+            print(f"[notify] {name} failed for {event.name}: {e}")
+            if self.breaker.state == "open":
+                print(f"[notify] {name} circuit open for "
+                      f"{self.breaker.reset_seconds}s")
+            return
+        self.breaker.record_success()
+        SINK_EVENTS.inc(name, "sent")
+        if not self.sink.deferred:
+            event.delivered(name)
+
+
+class Notifiers:
+    """Routes every event to each sink worker accepting its severity."""
+
+    def __init__(self) -> None:
+        self.workers: list[SinkWorker] = []
+
+    def add(self, sink: Sink, min_severity: Severity = Severity.INFO,
+            queue_size: int = SINK_QUEUE_SIZE,
+            breaker: Optional[CircuitBreaker] = None) -> SinkWorker:
+        worker = SinkWorker(sink, min_severity, queue_size, breaker)
+        self.workers.append(worker)
+        return worker
+
+    def notify(self, name: str, message: str, summary: str,
+               severity: Severity = Severity.INFO,
+               read_at: Optional[float] = None,
+               on_delivered: Optional[Delivered] = None) -> None:
+        event = Event(name, message, summary, severity, read_at,
+                      on_delivered)
+        for worker in self.workers:
+            worker.offer(event)
+
+    def wait_for_room(self, severity: Severity, timeout: float) -> bool:
+        """
+        Wait until every sink taking events of this severity has room for
+        one more; return False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if (severity >= worker.min_severity and not worker.wait_for_room(
+                    max(0.0, deadline - time.monotonic()))):
+                return False
+        return True
+
+    def drain(self, timeout: float = 5.0) -> None:
+        """Give every sink up to ``timeout`` seconds to empty its queue."""
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            if not worker.drain(max(0.0, deadline - time.monotonic())):
+                print(f"[notify] {worker.sink.name} still has "
+                      f"{worker.pending()} events queued")
+
+
+def create_notifiers() -> Notifiers:
+    """Build the sinks configured in the environment."""
+    notifiers = Notifiers()
+    notifiers.add(SlackSink())
+    if PUSHOVER_TOKEN and PUSHOVER_USER:
+        notifiers.add(PushoverSink(), Severity[PUSHOVER_SEVERITY.upper()])
+    if NOTIFY_JSONL_PATH:
+        notifiers.add(JsonlSink(Path(NOTIFY_JSONL_PATH)))
+    return notifiers
+
+
+_NOTIFIERS: Optional[Notifiers] = None
+_NOTIFIERS_LOCK = threading.Lock()
+
+
+def get_notifiers() -> Notifiers:
+    global _NOTIFIERS
+    with _NOTIFIERS_LOCK:
+        if _NOTIFIERS is None:
+            _NOTIFIERS = create_notifiers()
+        return _NOTIFIERS
+
+
+def notify(name: str, message: str, summary: str,
+           severity: Severity = Severity.INFO,
+           read_at: Optional[float] = None,
+           on_delivered: Optional[Delivered] = None) -> None:
+    """Send an event to every configured sink without waiting."""
+    get_notifiers().notify(name, message, summary, severity, read_at,
+                           on_delivered)
@@ -1,34 +1,67 @@
 import os
+import time
+from typing import Optional
 
 import requests
 from dotenv import load_dotenv
 
+from src.utility import metrics
+from src.utility.slack_notifier import create_session
+
 load_dotenv()
 PUSHOVER_TOKEN = os.getenv("PUSHOVER_TOKEN")
 PUSHOVER_USER = os.getenv("PUSHOVER_USER")
+PUSHOVER_URL = "https://api.pushover.net/1/messages.json"
+
+REQUESTS = metrics.counter("pushover_requests_total",
+                           "Pushover requests by HTTP status", ("status",))
+REQUEST_SECONDS = metrics.histogram("pushover_request_seconds",
+                                    "Pushover request latency")
+
+SESSION = create_session()
+
 
+class PushoverError(Exception):
+    """Raised when Pushover is not configured or rejects a message"""
 
-def send_to_pushover(name: str, message: str, sound: str = None) -> None:
+
+def post_to_pushover(name: str, message: str, priority: int = 1,
+                     sound: Optional[str] = None,
+                     session: Optional[requests.Session] = None,
+                     url: str = PUSHOVER_URL) -> None:
+    """Post a message, raising if it could not be delivered."""
     if not PUSHOVER_TOKEN or not PUSHOVER_USER:
-        print("[pushover] Missing token or user key.")
-        return
+        raise PushoverError("Missing token or user key.")
 
     payload = {
         "token": PUSHOVER_TOKEN,
         "user": PUSHOVER_USER,
         "title": f"Minecraft {name}",
         "message": message,
-        "priority": 1
+        "priority": priority
     }
 
     if sound:
         payload["sound"] = sound
 
+    start = time.perf_counter()
+    try:
+        response = (session or SESSION).post(url, data=payload, timeout=15)
+    except requests.RequestException:
+        REQUESTS.inc("error")
+        raise
+    REQUEST_SECONDS.observe(time.perf_counter() - start)
+    REQUESTS.inc(str(response.status_code))
+    if response.status_code != 200:
+        raise PushoverError(f"Failed: {response.status_code} "
+                            f"{response.text}")
+
+
+def send_to_pushover(name: str, message: str,
+                     sound: Optional[str] = None) -> None:
     try:
-        response = requests.post("https://api.pushover.net/1/messages.json",
-                                 data=payload,
-                                 timeout=15)
-        if response.status_code != 200:
-            print(f"[pushover] Failed: {response.status_code} {response.text}")
+        post_to_pushover(name, message, sound=sound)
+    except PushoverError as e:
+        print(f"[pushover] {e}")
     except Exception as e:
         print(f"[pushover] Error: {e}")
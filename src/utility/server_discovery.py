@@ -1,48 +1,185 @@
 import os
 import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional, TypedDict
 
-CRAFTY_DB = "/crafty_db/crafty.sqlite"
-SERVERS_BASE = "/servers"
+from dotenv import load_dotenv
 
+try:
+    from inotify_simple import INotify  # type: ignore[import-untyped]
+    from inotify_simple import flags
+except ImportError:  # pragma: no cover - the listener always installs it
+    INotify = None
 
-def discover_servers():
-    servers = {}
-    for uuid in get_uuids():
-        server_dir = os.path.join(SERVERS_BASE, uuid)
-        if not os.path.isdir(server_dir):
-            continue
+load_dotenv()
+CRAFTY_DB = os.getenv("CRAFTY_DB", "/crafty_db/crafty.sqlite")
+SERVERS_BASE = os.getenv("SERVERS_BASE", "/servers")
 
-        name = get_server_name(uuid)
-        log_file = os.path.join(server_dir, "logs/latest.log")
 
-        servers[uuid] = {
-            "name": name,
-            "log_file": log_file,
-        }
+class ServerInfo(TypedDict):
+    name: str
+    log_file: str
 
-    return servers
 
+Subscriber = Callable[[dict[str, ServerInfo]], None]
 
-def get_server_name(uuid: str) -> str:
-    conn = sqlite3.connect(CRAFTY_DB)
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
 
-    cur.execute("""
-        SELECT server_name AS Name
-        FROM servers
-        WHERE server_id = ?
-    """, (uuid,))
+class ServerRegistry:
+    """
+    Caches Crafty server names and directories.
+
+    One read-only connection loads every name with a single query. The
+    cache is reloaded when the database or the servers directory changes,
+    and subscribers are told whenever the set of servers changes.
+    """
+
+    def __init__(self, database: str = CRAFTY_DB,
+                 base: str = SERVERS_BASE):
+        self.database = database
+        self.base = base
+        self._connection: Optional[sqlite3.Connection] = None
+        self._names: dict[str, str] = {}
+        self._servers: dict[str, ServerInfo] = {}
+        self._signature: tuple[int, ...] = ()
+        self._subscribers: list[Subscriber] = []
+        self._lock = threading.RLock()
+        self.refresh(force=True)
+
+    def servers(self) -> dict[str, ServerInfo]:
+        """Return every server with a directory, reloading if stale."""
+        self.refresh()
+        with self._lock:
+            return dict(self._servers)
+
+    def get_name(self, uuid: str) -> str:
+        self.refresh()
+        with self._lock:
+            return self._names.get(uuid, "Unknown")
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        """Call subscriber with the full server map after every change."""
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload if the database or servers directory changed.
+        Returns True when the set of servers or their names changed.
+        """
+        with self._lock:
+            signature = self._get_signature()
+            if not force and signature == self._signature:
+                return False
+            self._signature = signature
+
+            try:
+                self._names = self._load_names()
+            except sqlite3.Error as e:
+                if force:
+                    raise
+                print(f"[discovery] Keeping cached names: {e}")
+
+            servers = self._scan()
+            if servers == self._servers:
+                return False
+            self._servers = servers
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber(dict(servers))
+            except Exception as e:
+                print(f"[discovery] Subscriber failed: {e}")
+        return True
+
+    def watch(self, interval: float = 5.0) -> None:
+        """Refresh forever, waking early on inotify events if available."""
+        if INotify is None:
+            while True:
+                time.sleep(interval)
+                self.refresh()
+
+        inotify = INotify()
+        inotify.add_watch(self.base, flags.CREATE | flags.DELETE
+                          | flags.MOVED_TO | flags.MOVED_FROM)
+        inotify.add_watch(os.path.dirname(self.database),
+                          flags.MODIFY | flags.CLOSE_WRITE
+                          | flags.CREATE | flags.MOVED_TO)
+        while True:
+            inotify.read(timeout=int(interval * 1000), read_delay=100)
+            self.refresh()
+
+    def start_watching(self, interval: float = 5.0) -> threading.Thread:
+        thread = threading.Thread(target=self.watch, args=(interval,),
+                                  daemon=True)
+        thread.start()
+        return thread
 
-    row = cur.fetchone()
-    conn.close()
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
 
-    return row["Name"] if row else "Unknown"
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                f"file:{self.database}?mode=ro", uri=True,
+                check_same_thread=False
+            )
+        return self._connection
+
+    def _load_names(self) -> dict[str, str]:
+        rows: list[Any] = self._connect().execute("""
+            SELECT server_id, server_name
+            FROM servers
+        """).fetchall()
+        return {uuid: name for uuid, name in rows}
+
+    def _scan(self) -> dict[str, ServerInfo]:
+        servers: dict[str, ServerInfo] = {}
+        for uuid in get_uuids(self.base):
+            servers[uuid] = {
+                "name": self._names.get(uuid, "Unknown"),
+                "log_file": os.path.join(self.base, uuid, "logs/latest.log"),
+            }
+        return servers
+
+    def _get_signature(self) -> tuple[int, ...]:
+        signature = []
+        for path in (self.database, f"{self.database}-wal", self.base):
+            try:
+                signature.append(os.stat(path).st_mtime_ns)
+            except FileNotFoundError:
+                signature.append(0)
+        return tuple(signature)
+
+
+_registry: Optional[ServerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ServerRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ServerRegistry()
+        return _registry
+
+
+def discover_servers() -> dict[str, ServerInfo]:
+    return get_registry().servers()
+
+
+def get_server_name(uuid: str) -> str:
+    return get_registry().get_name(uuid)
 
 
-def get_uuids() -> list[str]:
+def get_uuids(base: str = SERVERS_BASE) -> list[str]:
     return [
         entry
-        for entry in os.listdir(SERVERS_BASE)
-        if os.path.isdir(os.path.join(SERVERS_BASE, entry))
+        for entry in os.listdir(base)
+        if os.path.isdir(os.path.join(base, entry))
     ]
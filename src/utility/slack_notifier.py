@@ -1,43 +1,330 @@
+import heapq
 import os
+import threading
+import time
+from typing import Any, Callable, Optional
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from src.utility import metrics
 
 load_dotenv()
 SLACK_WEBHOOK = os.getenv("SLACK_WEBHOOK")
+SLACK_BATCH_SECONDS = float(os.getenv("SLACK_BATCH_SECONDS", "2"))
+MAX_SECTIONS = 45
+MAX_SECTION_LENGTH = 3000
+MAX_RETRIES = 5
 
+Payload = dict[str, Any]
 
-def send_to_slack(name: str, message: str, summary: str) -> None:
-    if not SLACK_WEBHOOK:
-        print("[slack] No webhook configured.")
-        return
-
-    payload = {
-        "blocks": [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": f"Minecraft {name}"
-                }
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": message
-                }
+REQUESTS = metrics.counter("slack_requests_total",
+                           "Webhook requests by HTTP status", ("status",))
+REQUEST_SECONDS = metrics.histogram("slack_request_seconds",
+                                    "Webhook request latency")
+PENDING = metrics.gauge("slack_pending_events",
+                        "Events buffered or waiting to be retried")
+DROPPED = metrics.counter("slack_dropped_events_total",
+                          "Events not posted to Slack in full, by reason",
+                          ("reason",))
+
+
+class SlackError(Exception):
+    """Raised when Slack is not configured or rejects a message"""
+
+
+def create_session() -> requests.Session:
+    """Create a keep-alive session with a small connection pool."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    return session
+
+
+SESSION = create_session()
+
+
+def build_payload(name: str, events: list[tuple[str, str]],
+                  more: int = 0) -> Payload:
+    """
+    Build one Block Kit message holding every (message, summary) event,
+    and counting ``more`` events that were only tallied.
+    """
+    blocks: list[dict[str, Any]] = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": f"Minecraft {name}"
             }
-        ],
+        },
+        {
+            "type": "divider"
+        },
+    ]
+    for message, _ in events[:MAX_SECTIONS]:
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": message[:MAX_SECTION_LENGTH]
+            }
+        })
+    total = len(events) + more
+    if total > MAX_SECTIONS:
+        blocks.append({
+            "type": "context",
+            "elements": [{
+                "type": "mrkdwn",
+                "text": f"…and {total - MAX_SECTIONS} more events"
+            }]
+        })
+
+    summaries = list(dict.fromkeys(summary for _, summary in events))
+    summary = ", ".join(summaries)
+    if total > 1:
+        summary = f"{summary} ({total} events)"
+
+    return {
+        "blocks": blocks,
         "text": f"Minecraft {name} Alert: {summary}"
     }
 
+
+def post_payload(payload: Payload, webhook: Optional[str] = None,
+                 session: Optional[requests.Session] = None
+                 ) -> Optional[float]:
+    """
+    Post a payload to the webhook, raising SlackError if it was not
+    accepted. Returns the Retry-After delay in seconds when Slack rate
+    limits the request, otherwise None.
+    """
+    webhook = webhook or SLACK_WEBHOOK
+    if not webhook:
+        raise SlackError("No webhook configured.")
+
+    start = time.perf_counter()
     try:
-        response = requests.post(SLACK_WEBHOOK, json=payload, timeout=15)
-        if response.status_code != 200:
-            print(f"[slack] Failed: {response.status_code} {response.text}")
-    except Exception as e:
-        print(f"[slack] Error: {e}")
+        response = (session or SESSION).post(webhook, json=payload,
+                                             timeout=15)
+    except requests.RequestException as e:
+        REQUESTS.inc("error")
+        raise SlackError(f"Error: {e}") from e
+    REQUEST_SECONDS.observe(time.perf_counter() - start)
+    REQUESTS.inc(str(response.status_code))
+
+    if response.status_code == 429:
+        return get_retry_after(response)
+    if response.status_code != 200:
+        raise SlackError(f"Failed: {response.status_code} {response.text}")
+    return None
+
+
+def get_retry_after(response: requests.Response) -> float:
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "1")))
+    except ValueError:
+        return 1.0
+
+
+def post_to_slack(name: str, message: str, summary: str,
+                  webhook: Optional[str] = None,
+                  session: Optional[requests.Session] = None) -> None:
+    """Post one event, raising SlackError if it could not be delivered."""
+    payload = build_payload(name, [(message, summary)])
+
+    for _ in range(MAX_RETRIES):
+        delay = post_payload(payload, webhook, session)
+        if delay is None:
+            return
+        print(f"[slack] Rate limited; retrying in {delay}s")
+        time.sleep(delay)
+
+    DROPPED.inc("rate_limited")
+    raise SlackError(f"Giving up after {MAX_RETRIES} rate limited attempts")
+
+
+def send_to_slack(name: str, message: str, summary: str) -> None:
+    try:
+        post_to_slack(name, message, summary)
+    except SlackError as e:
+        print(f"[slack] {e}")
+
+
+class Batch:
+    """
+    One server's events waiting to be posted as one message.
+
+    Only the first MAX_SECTIONS events fit in a message, so later ones are
+    just counted, which keeps a batch's size bounded however long Slack
+    holds it up. ``on_sent`` holds what to call once the shown events are
+    posted.
+    """
+
+    __slots__ = ("name", "events", "more", "on_sent")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.events: list[tuple[str, str]] = []
+        self.more = 0
+        self.on_sent: list[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self.events) + self.more
+
+    def add(self, message: str, summary: str,
+            on_sent: Optional[Callable[[], None]] = None) -> None:
+        if len(self.events) < MAX_SECTIONS:
+            self.events.append((message, summary))
+            if on_sent is not None:
+                self.on_sent.append(on_sent)
+        else:
+            self.more += 1
+            DROPPED.inc("overflow")
+
+    def payload(self) -> Payload:
+        return build_payload(self.name, self.events, self.more)
+
+
+class SlackBatcher:
+    """
+    Buffers events per server and posts them as one message per window.
+
+    Payloads rejected with HTTP 429 go to a retry queue and are sent again
+    once Slack's Retry-After delay has passed. While rate limited, new
+    events keep collecting in their server's buffer. A batch that fails
+    otherwise is dropped, and ``error`` holds the failure until a post
+    succeeds again.
+    """
+
+    def __init__(self, window: float = SLACK_BATCH_SECONDS,
+                 webhook: Optional[str] = None,
+                 session: Optional[requests.Session] = None):
+        self.window = window
+        self.webhook = webhook
+        self.session = session or SESSION
+        self.sent = 0
+        self.rate_limited = 0
+        self.error: Optional[SlackError] = None
+        self._pending: dict[str, Batch] = {}
+        self._deadlines: dict[str, float] = {}
+        self._retries: list[tuple[float, int, int, Batch]] = []
+        self._blocked_until = 0.0
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, message: str, summary: str,
+            on_sent: Optional[Callable[[], None]] = None) -> None:
+        """
+        Buffer an event, starting the server's window if needed. on_sent
+        is called once the event has been posted.
+        """
+        with self._condition:
+            if name not in self._pending:
+                self._pending[name] = Batch(name)
+                self._deadlines[name] = time.monotonic() + self.window
+            self._pending[name].add(message, summary, on_sent)
+            self._condition.notify()
+        self.start()
+
+    def post(self, name: str, message: str, summary: str) -> None:
+        """Post one event now, raising SlackError if it fails."""
+        try:
+            post_to_slack(name, message, summary, self.webhook,
+                          self.session)
+        except SlackError as e:
+            self._record(e)
+            raise
+        self._record(None)
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, daemon=True)
+                self._thread.start()
+
+    def run(self) -> None:
+        while True:
+            with self._condition:
+                delay = self._next_delay()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+            self.flush()
+
+    def flush(self, force: bool = False) -> None:
+        """Send every due batch and retry; with force, send everything."""
+        for attempt, batch in self._take_due(force):
+            try:
+                delay = post_payload(batch.payload(), self.webhook,
+                                     self.session)
+            except SlackError as e:
+                DROPPED.inc("failed", amount=len(batch))
+                print(f"[slack] Dropping {len(batch)} events for "
+                      f"{batch.name}: {e}")
+                self._record(e)
+                continue
+            if delay is None:
+                self._record(None)
+                for on_sent in batch.on_sent:
+                    on_sent()
+                continue
+            self.rate_limited += 1
+            print(f"[slack] Rate limited; retrying in {delay}s")
+            self._schedule_retry(batch, attempt + 1, delay)
+
+    def pending(self) -> int:
+        """Return the number of buffered events and events to retry."""
+        with self._condition:
+            return (sum(map(len, self._pending.values()))
+                    + sum(len(retry[3]) for retry in self._retries))
+
+    def _record(self, error: Optional[SlackError]) -> None:
+        with self._condition:
+            self.error = error
+            if error is None:
+                self.sent += 1
+
+    def _next_delay(self) -> float:
+        now = time.monotonic()
+        due = list(self._deadlines.values())
+        if self._retries:
+            due.append(self._retries[0][0])
+        if not due:
+            return 60.0
+        return max(min(due), self._blocked_until) - now
+
+    def _take_due(self, force: bool) -> list[tuple[int, Batch]]:
+        now = time.monotonic()
+        taken: list[tuple[int, Batch]] = []
+        with self._condition:
+            if not force and now < self._blocked_until:
+                return taken
+            while self._retries and (force or self._retries[0][0] <= now):
+                _, _, attempt, batch = heapq.heappop(self._retries)
+                taken.append((attempt, batch))
+            for name, deadline in list(self._deadlines.items()):
+                if force or deadline <= now:
+                    del self._deadlines[name]
+                    taken.append((0, self._pending.pop(name)))
+        return taken
+
+    def _schedule_retry(self, batch: Batch, attempt: int,
+                        delay: float) -> None:
+        if attempt >= MAX_RETRIES:
+            DROPPED.inc("rate_limited", amount=len(batch))
+            print(f"[slack] Dropping message after {attempt} "
+                  "rate limited attempts")
+            return
+        with self._condition:
+            due = time.monotonic() + delay
+            self._blocked_until = max(self._blocked_until, due)
+            self._sequence += 1
+            heapq.heappush(self._retries,
+                           (due, self._sequence, attempt, batch))
+            self._condition.notify()
+
+
+BATCHER = SlackBatcher()
+PENDING.set_function(BATCHER.pending)
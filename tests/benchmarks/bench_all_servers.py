@@ -0,0 +1,103 @@
+"""
+Compare wall time of one updater process per server (the old shell loop)
+with a single --all-servers run, against a fake Modrinth and Crafty DB.
+
+Every server runs the same pack. A third of the mods only have beta builds,
+so they are looked up by project as well as by hash.
+
+Run with: python -m tests.benchmarks.bench_all_servers [servers] [mods]
+"""
+import json
+import os
+import sqlite3
+import subprocess  # nosec[B404]
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from tests.benchmarks.bench_mod_updater import build_projects
+from tests.fake_modrinth import FakeModrinth
+
+UPDATER = [sys.executable, "-m", "src.updater.mod_updater"]
+
+
+def create_servers(root: Path, count: int,
+                   projects: dict[str, list[dict[str, Any]]]) -> Path:
+    servers = root / "servers"
+    database = sqlite3.connect(root / "crafty.sqlite")
+    database.execute(
+        "CREATE TABLE servers (server_id TEXT, server_name TEXT)"
+    )
+    for index in range(count):
+        uuid = f"00000000-0000-0000-0000-{index:012d}"
+        database.execute("INSERT INTO servers VALUES (?, ?)",
+                         (uuid, f"Bench {index}"))
+        server = servers / uuid
+        (server / "config").mkdir(parents=True)
+        (server / "mods").mkdir()
+        (server / "logs").mkdir()
+        for versions in projects.values():
+            installed = versions[-1]
+            (server / "mods" / installed["files"][0]["filename"]) \
+                .write_bytes(installed["content"])
+        (server / "config" / "mod_updates.json").write_text(json.dumps({
+            "game_version": "1.21.8",
+            "loader": "fabric",
+            "mods_dir": str(server / "mods"),
+            "log_path": str(server / "logs"),
+        }))
+    database.commit()
+    database.close()
+    return servers
+
+
+def run(command: list[str], environment: dict[str, str]) -> None:
+    subprocess.run(command, env=environment, check=True,  # nosec[B603]
+                   stdout=subprocess.DEVNULL)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    mods = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    projects = build_projects(mods)
+    modrinth = FakeModrinth(projects, latency=0.05).start()
+
+    try:
+        for mode in ("per-server processes", "--all-servers"):
+            with tempfile.TemporaryDirectory() as directory:
+                root = Path(directory)
+                servers = create_servers(root, count, projects)
+                environment = {
+                    **os.environ,
+                    "CRAFTY_DB": str(root / "crafty.sqlite"),
+                    "MODRINTH_API": modrinth.api,
+                    # Modrinth's real budget would dominate the timing.
+                    "MODRINTH_REQUESTS_PER_MINUTE": "60000",
+                    "SERVERS_BASE": str(servers),
+                    "SLACK_WEBHOOK": "",
+                }
+                shared = ["--jobs", "8",
+                          "--cache-path", str(root / "cache.sqlite"),
+                          "--store-path", str(root / "jar_store")]
+                modrinth.requests.clear()
+                start = time.perf_counter()
+                if mode == "--all-servers":
+                    run(UPDATER + ["--all-servers"] + shared, environment)
+                else:
+                    for server in sorted(servers.iterdir()):
+                        config = server / "config" / "mod_updates.json"
+                        run(UPDATER + ["--config", str(config),
+                                       "--uuid", server.name] + shared,
+                            environment)
+                elapsed = time.perf_counter() - start
+                print(f"{mode:<22} {elapsed:6.2f}s "
+                      f"api_requests={modrinth.total_requests()} "
+                      f"downloads={modrinth.total_requests('/files/')}")
+    finally:
+        modrinth.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Measure backfilling months of archived logs from several servers.
+
+Writes one gzip archive per server and day from synthetic lines, then
+counts their events in one process and across a worker pool.
+
+Run with: python -m tests.benchmarks.bench_backfill [days] [lines per day]
+"""
+import gzip
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from src.listener.backfill import backfill
+from tests.benchmarks.synthetic_log import generate_lines
+
+SERVERS = ("Survival", "Creative", "Skyblock", "Lobby")
+
+
+def write_archives(root: Path, days: int,
+                   lines: int) -> list[tuple[str, Path]]:
+    block = "".join(f"{line}\n" for line in generate_lines(lines)).encode()
+    compressed = gzip.compress(block, compresslevel=6)
+    first = date(2026, 1, 1)
+    servers = []
+    for name in SERVERS:
+        logs_dir = root / name / "logs"
+        logs_dir.mkdir(parents=True)
+        for day in range(days):
+            stamp = (first + timedelta(days=day)).isoformat()
+            (logs_dir / f"{stamp}-1.log.gz").write_bytes(compressed)
+        servers.append((name, logs_dir))
+    return servers
+
+
+def main() -> None:
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    with tempfile.TemporaryDirectory() as directory:
+        servers = write_archives(Path(directory), days, lines)
+        size = sum(os.path.getsize(path) for _, logs_dir in servers
+                   for path in logs_dir.iterdir())
+        print(f"{len(SERVERS)} servers x {days} days x {lines} lines, "
+              f"{size / 2**20:.1f} MiB compressed")
+        for workers in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            tallies = backfill(servers, workers=workers)
+            elapsed = time.perf_counter() - start
+            events = sum(sum(tally.events.values())
+                         for tally in tallies.values())
+            print(f"workers={workers:<3} {elapsed:6.2f}s "
+                  f"{len(SERVERS) * days * lines / elapsed:12,.0f} lines/s "
+                  f"events={events}")
+
+
+if __name__ == "__main__":
+    main()
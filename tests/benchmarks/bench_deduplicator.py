@@ -0,0 +1,77 @@
+"""
+Measure MessageDeduplicator throughput at several duplicate ratios.
+
+The original implementation scanned every stored message on each call, so
+it only runs over the first LEGACY_LINES lines to keep the run short.
+
+Run with: python -m tests.benchmarks.bench_deduplicator [lines]
+"""
+import random
+import re
+import sys
+import time
+
+from src.utility.deduplicator import MessageDeduplicator
+
+DUPLICATE_RATIOS = (0.0, 0.5, 0.9, 0.99)
+LEGACY_LINES = 10_000
+
+
+class LegacyDeduplicator:
+    """The original full-scan implementation, kept for comparison."""
+
+    def __init__(self, window_seconds: int = 30):
+        self.window_seconds = window_seconds
+        self._seen_messages: dict[str, float] = {}
+
+    def is_unique(self, message: str) -> bool:
+        current_time = time.time()
+        expired = [
+            msg for msg, timestamp in self._seen_messages.items()
+            if current_time - timestamp > self.window_seconds
+        ]
+        for msg in expired:
+            del self._seen_messages[msg]
+        core = re.sub(r'^\[[\d\-:T\s]+\]\s*', '', message, count=1).strip()
+        if core not in self._seen_messages:
+            self._seen_messages[core] = current_time
+            return True
+        return False
+
+
+def generate_lines(count: int, ratio: float) -> list[str]:
+    """Build lines where roughly ``ratio`` repeat an earlier message."""
+    chooser = random.Random(4)
+    lines = []
+    for index in range(count):
+        if lines and chooser.random() < ratio:
+            body = lines[chooser.randrange(max(0, len(lines) - 50),
+                                           len(lines))].split(" ", 1)[1]
+        else:
+            body = (f"[Server thread/ERROR]: Block-attached entity at "
+                    f"invalid position: BlockPos{{x={index}, y=64, z=-3}}")
+        lines.append(f"[10:{index // 60 % 60:02d}:{index % 60:02d}] {body}")
+    return lines
+
+
+def measure(deduplicator: object, lines: list[str]) -> float:
+    is_unique = deduplicator.is_unique  # type: ignore[attr-defined]
+    start = time.perf_counter()
+    for line in lines:
+        is_unique(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'duplicates':>10} {'current lines/sec':>18} "
+          f"{'legacy lines/sec':>18}")
+    for ratio in DUPLICATE_RATIOS:
+        lines = generate_lines(count, ratio)
+        current = measure(MessageDeduplicator(), lines)
+        legacy = measure(LegacyDeduplicator(), lines[:LEGACY_LINES])
+        print(f"{ratio:>10.0%} {current:>18,.0f} {legacy:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare trigger matching strategies for event_router.route_event: the
+substring loop over the registered triggers, and one precompiled
+alternation regex searched first as a prefilter, so the loop only runs for
+the few lines containing a trigger.
+
+Run with: python -m tests.benchmarks.bench_event_router [lines]
+"""
+import re
+import sys
+import time
+from typing import Callable, Optional
+
+from src.listener import event_router
+from src.utility.log_parser import parse_line
+from tests.benchmarks.synthetic_log import generate_lines
+
+
+def match_with_loop(line: str) -> Optional[str]:
+    """Find the winning trigger the way route_event originally did."""
+    for trigger, handler in event_router.EVENT_HANDLERS.items():
+        if trigger in line:
+            return trigger
+    return None
+
+
+def build_prefilter() -> Callable[[str], Optional[str]]:
+    """Search one alternation regex before looking for the winner."""
+    search = re.compile(
+        "|".join(map(re.escape, event_router.EVENT_HANDLERS))
+    ).search
+
+    def match(line: str) -> Optional[str]:
+        if search(line) is None:
+            return None
+        return match_with_loop(line)
+
+    return match
+
+
+def measure(label: str, func: Callable[[str], object],
+            lines: list[str]) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    elapsed = time.perf_counter() - start
+    rate = len(lines) / elapsed
+    print(f"{label:<28} {rate:>14,.0f} lines/sec")
+    return rate
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lines = list(generate_lines(count))
+    prefilter = build_prefilter()
+
+    for line in lines:
+        expected = match_with_loop(line)
+        if (event_router.match_trigger(line) != expected
+                or prefilter(line) != expected):
+            raise AssertionError(f"Matchers disagree on: {line}")
+
+    event_router.notify = lambda *args: None  # type: ignore
+    loop = measure("original loop", match_with_loop, lines)
+    regex = measure("regex prefilter", prefilter, lines)
+    measure("route_event (no sink)",
+            lambda line: event_router.route_event("bench", parse_line(line)),
+            lines)
+    print(f"regex prefilter vs original loop: {regex / loop:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
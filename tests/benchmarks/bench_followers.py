@@ -0,0 +1,94 @@
+"""
+Measure CPU and RSS per followed server for each log follower backend.
+
+Each backend runs in a child process that follows N synthetic logs while
+this process appends lines to them at a fixed rate.
+
+Run with: python -m tests.benchmarks.bench_followers [servers] [seconds]
+"""
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.listener import tail_watcher
+from src.utility.log_parser import LogRecord
+from tests.benchmarks.process_stats import measure_tree
+from tests.benchmarks.synthetic_log import generate_lines
+
+LINES_PER_SECOND = 200
+
+
+def run_backend(backend: str, servers: dict[str, dict[str, str]],
+                counter: "multiprocessing.sharedctypes.Synchronized[int]"
+                ) -> None:
+    """Follow the logs with one backend, counting routed lines."""
+    def count(name: str, record: LogRecord, read_at: float) -> None:
+        with counter.get_lock():
+            counter.value += 1
+
+    tail_watcher.route_event = count  # type: ignore[assignment]
+    tail_watcher.start_followers(servers, backend)
+    while True:
+        time.sleep(1)
+
+
+def write_lines(paths: list[Path], seconds: float) -> int:
+    """Append synthetic lines to every log at LINES_PER_SECOND each."""
+    lines = generate_lines(10**9)
+    written = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for path in paths:
+            with open(path, "a") as f:
+                for _ in range(LINES_PER_SECOND // 10):
+                    f.write(f"{next(lines)} #{written}\n")
+                    written += 1
+        time.sleep(0.1)
+    return written
+
+
+def benchmark(backend: str, count: int, seconds: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        servers = {}
+        paths = []
+        for index in range(count):
+            logs = Path(directory, f"server-{index}", "logs")
+            logs.mkdir(parents=True)
+            path = logs / "latest.log"
+            path.touch()
+            paths.append(path)
+            servers[str(index)] = {"name": f"bench-{index}",
+                                   "log_file": str(path)}
+
+        counter = multiprocessing.Value("i", 0)
+        process = multiprocessing.Process(
+            target=run_backend, args=(backend, servers, counter),
+            daemon=True)
+        process.start()
+        time.sleep(1)
+        assert process.pid is not None
+        cpu_start, _, _ = measure_tree(process.pid)
+
+        written = write_lines(paths, seconds)
+        time.sleep(1.5)
+        cpu_end, rss, processes = measure_tree(process.pid)
+        process.kill()
+        process.join()
+
+    cpu = (cpu_end - cpu_start) / count
+    print(f"{backend:<9} servers={count:<3} processes={processes:<3} "
+          f"cpu/server={cpu:6.3f}s rss/server={rss / count / 2**20:7.2f}MiB "
+          f"routed={counter.value}/{written}")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    for backend in tail_watcher.LOG_BACKENDS:
+        benchmark(backend, count, seconds)
+
+
+if __name__ == "__main__":
+    main()
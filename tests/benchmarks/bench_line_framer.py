@@ -0,0 +1,98 @@
+"""
+Measure line framing throughput and allocations on a large synthetic log.
+
+Compares the previous approach (read a chunk, join it to the partial line,
+split it and decode every line) with LineFramer, with and without the
+trigger prefilter. Every framed line is matched against the event
+triggers, as the router would. Throughput is timed without tracing;
+tracemalloc then reports the peak traced memory while framing the first
+TRACED_BYTES.
+
+Run with: python -m tests.benchmarks.bench_line_framer [MiB]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+from src.listener.event_router import TRIGGERS, match_trigger
+from src.listener.line_framer import READ_SIZE, LineFramer
+from tests.benchmarks.synthetic_log import generate_lines
+
+TRACED_BYTES = 64 * 2**20
+
+
+def write_log(path: str, size: int) -> None:
+    """Write a log of about ``size`` bytes by repeating a synthetic block."""
+    block = "".join(f"{line}\n" for line in generate_lines(10_000)).encode()
+    with open(path, "wb") as f:
+        for _ in range(size // len(block) + 1):
+            f.write(block)
+
+
+def split_lines(path: str, limit: Optional[int]) -> int:
+    """The previous framing: split and decode every line of every read."""
+    lines = 0
+    partial = b""
+    match = match_trigger
+    with open(path, "rb") as f:
+        while chunk := f.read(READ_SIZE):
+            raw_lines = (partial + chunk).split(b"\n")
+            partial = raw_lines.pop()
+            for raw in raw_lines:
+                match(raw.decode("utf-8", "replace").rstrip("\r"))
+                lines += 1
+            if limit is not None and f.tell() >= limit:
+                break
+    return lines
+
+
+def frame_lines(path: str, limit: Optional[int],
+                prefilter: bool = False) -> int:
+    lines = 0
+    framer = LineFramer(TRIGGERS if prefilter else None)
+    match = match_trigger
+    read = 0
+    with open(path, "rb", buffering=0) as f:
+        while count := framer.fill(f.readinto):
+            for line in framer.lines():
+                match(line)
+                lines += 1
+            read += count
+            if limit is not None and read >= limit:
+                break
+    return lines
+
+
+def measure(name: str, frame: Callable[[str, Optional[int]], int],
+            path: str, size: int) -> None:
+    start = time.perf_counter()
+    lines = frame(path, None)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    frame(path, TRACED_BYTES)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<18} {size / 2**20 / elapsed:8.1f} MiB/s "
+          f"lines={lines:<10} peak={peak / 1024:8.1f} KiB")
+
+
+def main() -> None:
+    mebibytes = int(sys.argv[1]) if len(sys.argv) > 1 else 2048
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "latest.log")
+        write_log(path, mebibytes * 2**20)
+        size = os.path.getsize(path)
+        print(f"log size: {size / 2**20:.0f} MiB")
+        measure("split + decode", split_lines, path, size)
+        measure("framer", frame_lines, path, size)
+        measure("framer + triggers",
+                lambda log, limit: frame_lines(log, limit, True), path, size)
+
+
+if __name__ == "__main__":
+    main()
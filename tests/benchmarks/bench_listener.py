@@ -0,0 +1,354 @@
+"""
+End-to-end listener benchmark for every log follower backend.
+
+Builds a throwaway Crafty database and N servers with logs/latest.log,
+starts the real listener (src.listener.tail_watcher) in a child process
+against a stand-in Slack webhook, then steps through increasing line
+rates. Each step writes synthetic Minecraft/Fabric/Geyser traffic, rotates
+one server's log and truncates another's, always leaving at least one log
+undisturbed. Every server also logs a marker login line each tick, and the
+latency from writing a marker to the webhook receiving it is measured on
+the undisturbed logs. A step is sustained when every such marker arrives
+and p99 latency stays under --max-latency. A final error storm counts the
+Slack messages a burst of stack traces turns into.
+
+Results are saved as JSON, and the change against the previous results
+file is printed, so regressions show up between runs.
+
+Run with: python -m tests.benchmarks.bench_listener [--servers N]
+          [--seconds S] [--rates R ...] [--backends B ...] [--output PATH]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+import subprocess  # nosec[B404]
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+from typing import Any, Optional
+
+from src.listener.tail_watcher import LOG_BACKENDS
+from tests.benchmarks.process_stats import measure_tree
+from tests.benchmarks.synthetic_log import generate_lines
+from tests.fake_slack import FakeSlack
+
+LISTENER = [sys.executable, "-m", "src.listener.tail_watcher"]
+TICK = 0.1
+MARKER = ("[{}] [Server thread/INFO]: M{}[/10.0.0.1:5000] logged in with "
+          "entity id 1 at (0.5, 64.0, 0.5)")
+MARKER_PATTERN = re.compile(r"\*M(\d+)\*")
+STORM_ERROR = ("[{}] [Server thread/ERROR]: Exception ticking entity {} at "
+               "x={}.5, y=64.0, z=-{}.5")
+STORM_TRACE = ["java.lang.NullPointerException: Cannot read field \"world\"",
+               "\tat net.minecraft.entity.Entity.tick(Entity.java:{})",
+               "\tat net.minecraft.server.World.tickEntity(World.java:88)"]
+DEFAULT_OUTPUT = Path(__file__).parent / "results" / "listener.json"
+
+
+def create_servers(root: Path, count: int) -> tuple[Path, Path, list[Path]]:
+    """Create a Crafty-shaped database and one empty log per server."""
+    servers = root / "servers"
+    database = root / "crafty.sqlite"
+    logs = []
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "CREATE TABLE servers (server_id TEXT, server_name TEXT)"
+        )
+        for index in range(count):
+            uuid = f"00000000-0000-0000-0000-{index:012d}"
+            connection.execute("INSERT INTO servers VALUES (?, ?)",
+                               (uuid, f"Bench {index}"))
+            log = servers / uuid / "logs" / "latest.log"
+            log.parent.mkdir(parents=True)
+            log.touch()
+            logs.append(log)
+    return database, servers, logs
+
+
+class LoadGenerator:
+    """Appends synthetic traffic and timestamped marker lines to logs."""
+
+    def __init__(self, logs: list[Path]):
+        self.logs = logs
+        self.lines = generate_lines(10**12)
+        self.sent: dict[int, float] = {}
+        self.owners: dict[int, int] = {}
+        self.disrupted: set[int] = set()
+        self.written = 0
+        self.rotations = 0
+        self._marker = 0
+
+    def write(self, rate: int, seconds: float) -> tuple[int, int]:
+        """
+        Write ``rate`` lines per second across all logs for ``seconds``,
+        rotating one log and truncating another halfway through. With
+        fewer than three logs only one is rotated, and a single log is left
+        alone, so some markers always measure steady delivery. Returns the
+        first and last marker ids written; ``disrupted`` holds the indexes
+        of the logs rotated or truncated.
+        """
+        first = self._marker
+        self.disrupted = set()
+        per_log = max(1, round(rate * TICK / len(self.logs)))
+        ticks = max(1, round(seconds / TICK))
+        start = time.monotonic()
+        for tick in range(ticks):
+            if tick == ticks // 2 and len(self.logs) > 1:
+                rotated = self.rotations % len(self.logs)
+                self.rotate(self.logs[rotated])
+                self.disrupted = {rotated}
+                if len(self.logs) > 2:
+                    truncated = (rotated + 1) % len(self.logs)
+                    self.truncate(self.logs[truncated])
+                    self.disrupted.add(truncated)
+            for index, log in enumerate(self.logs):
+                block = list(islice(self.lines, per_log - 1))
+                block.append(MARKER.format(time.strftime("%H:%M:%S"),
+                                           self._marker))
+                with open(log, "a") as f:
+                    f.write("\n".join(block) + "\n")
+                self.sent[self._marker] = time.time()
+                self.owners[self._marker] = index
+                self._marker += 1
+                self.written += len(block)
+            delay = start + (tick + 1) * TICK - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return first, self._marker
+
+    def rotate(self, log: Path) -> None:
+        """Rotate like Minecraft: move latest.log aside, start a new one."""
+        self.rotations += 1
+        log.rename(log.with_name(f"rotated-{self.rotations}.log"))
+        log.touch()
+
+    def truncate(self, log: Path) -> None:
+        with open(log, "w"):
+            pass
+
+    def storm(self, log: Path, errors: int) -> int:
+        """Write a burst of errors with stack traces; return its lines."""
+        stamp = time.strftime("%H:%M:%S")
+        lines = []
+        for index in range(errors):
+            lines.append(STORM_ERROR.format(stamp, index, index, index))
+            lines.extend(line.format(index) for line in STORM_TRACE)
+        with open(log, "a") as f:
+            f.write("\n".join(lines) + "\n")
+        self.written += len(lines)
+        return len(lines)
+
+
+def delivered_markers(webhook: FakeSlack) -> dict[int, float]:
+    """Return the first arrival time of every marker the webhook saw."""
+    arrived: dict[int, float] = {}
+    for received, payload in webhook.received():
+        for marker in MARKER_PATTERN.findall(json.dumps(payload,
+                                                        ensure_ascii=False)):
+            arrived.setdefault(int(marker), received)
+    return arrived
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def wait_for_markers(webhook: FakeSlack, first: int, last: int,
+                     grace: float) -> dict[int, float]:
+    deadline = time.monotonic() + grace
+    while True:
+        arrived = delivered_markers(webhook)
+        if all(marker in arrived for marker in range(first, last)):
+            return arrived
+        if time.monotonic() >= deadline:
+            return arrived
+        time.sleep(0.1)
+
+
+def start_listener(backend: str, database: Path, servers: Path,
+                   webhook: FakeSlack, batch_seconds: float
+                   ) -> subprocess.Popen[bytes]:
+    environment = {
+        **{key: value for key, value in os.environ.items()
+           if not key.startswith(("PUSHOVER_", "CHECKPOINT_", "SESSIONS_",
+                                  "METRICS_", "NOTIFY_"))},
+        "CRAFTY_DB": str(database),
+        "SERVERS_BASE": str(servers),
+        "SLACK_WEBHOOK": webhook.url,
+        "SLACK_BATCH_SECONDS": str(batch_seconds),
+        "LOG_BACKEND": backend,
+        "PYTHONUNBUFFERED": "1",
+    }
+    return subprocess.Popen(LISTENER, env=environment,  # nosec[B603]
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+
+
+def benchmark(backend: str, args: argparse.Namespace) -> dict[str, Any]:
+    webhook = FakeSlack().start()
+    with tempfile.TemporaryDirectory() as directory:
+        database, servers, logs = create_servers(Path(directory),
+                                                 args.servers)
+        listener = start_listener(backend, database, servers, webhook,
+                                  args.batch_seconds)
+        generator = LoadGenerator(logs)
+        try:
+            # Wait until every follower is up and delivering.
+            first, last = generator.write(len(logs) * 10, 1.0)
+            wait_for_markers(webhook, first, last, 10.0)
+            steps = []
+            sustained: Optional[int] = None
+            for rate in args.rates:
+                step = run_step(listener.pid, webhook, generator, rate, args)
+                steps.append(step)
+                if not step["markers"]:
+                    raise AssertionError(f"{backend} rate={rate} wrote no "
+                                         "markers to undisturbed logs")
+                print(f"{backend:<9} rate={rate:<7} "
+                      f"delivered={step['delivered']}/{step['markers']} "
+                      f"lost_at_rotation={step['lost_around_rotation']} "
+                      f"p50={step['p50_seconds']:.3f}s "
+                      f"p99={step['p99_seconds']:.3f}s "
+                      f"cpu={step['cpu_percent']:5.1f}% "
+                      f"rss={step['rss_mib']:.1f}MiB")
+                if step["achieved_lines_per_second"] < 0.95 * rate:
+                    print(f"{backend:<9} the load generator cannot write "
+                          f"{rate} lines/s here; stopping")
+                    break
+                if not step["sustained"]:
+                    break
+                sustained = rate
+            storm = run_storm(webhook, generator, logs[0], args)
+        finally:
+            listener.kill()
+            listener.wait()
+            webhook.stop()
+
+    return {
+        "max_sustained_lines_per_second": sustained,
+        "steps": steps,
+        "storm": storm,
+    }
+
+
+def run_step(pid: int, webhook: FakeSlack, generator: LoadGenerator,
+             rate: int, args: argparse.Namespace) -> dict[str, Any]:
+    cpu_start, _, _ = measure_tree(pid)
+    start = time.monotonic()
+    written = generator.written
+    first, last = generator.write(rate, args.seconds)
+    elapsed = time.monotonic() - start
+    arrived = wait_for_markers(webhook, first, last, args.grace)
+    cpu_end, rss, _ = measure_tree(pid)
+
+    # Followers may lose lines around a rotation or truncation. Those are
+    # reported apart, so they do not hide how fast the other logs keep up.
+    steady = [marker for marker in range(first, last)
+              if generator.owners[marker] not in generator.disrupted]
+    latencies = [arrived[marker] - generator.sent[marker]
+                 for marker in steady if marker in arrived]
+    lost_disrupted = sum(marker not in arrived
+                         for marker in range(first, last)
+                         if generator.owners[marker] in generator.disrupted)
+    p99 = percentile(latencies, 0.99)
+    return {
+        "rate": rate,
+        "lines": generator.written - written,
+        "achieved_lines_per_second": round(
+            (generator.written - written) / elapsed),
+        "markers": len(steady),
+        "delivered": len(latencies),
+        "lost_around_rotation": lost_disrupted,
+        "p50_seconds": round(percentile(latencies, 0.5), 4),
+        "p99_seconds": round(p99, 4),
+        "cpu_percent": round((cpu_end - cpu_start) / elapsed * 100, 1),
+        "rss_mib": round(rss / 2**20, 1),
+        "sustained": (bool(steady) and len(latencies) == len(steady)
+                      and p99 <= args.max_latency),
+    }
+
+
+def run_storm(webhook: FakeSlack, generator: LoadGenerator, log: Path,
+              args: argparse.Namespace) -> dict[str, Any]:
+    webhook.clear()
+    lines = generator.storm(log, args.storm_errors)
+    time.sleep(args.batch_seconds + args.grace)
+    messages = 0
+    for _, payload in webhook.received():
+        for block in payload.get("blocks", []):
+            text = block.get("text", {}).get("text", "")
+            if text.startswith("⚠️"):
+                messages += 1
+    return {"lines": lines, "error_messages": messages}
+
+
+def compare(previous: dict[str, Any], results: dict[str, Any]) -> None:
+    """Print each backend's headline numbers against the previous run."""
+    for backend, current in results["backends"].items():
+        before = previous.get("backends", {}).get(backend)
+        if before is None:
+            continue
+        old = before["max_sustained_lines_per_second"] or 0
+        new = current["max_sustained_lines_per_second"] or 0
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"{backend:<9} max sustained {old} -> {new} lines/s "
+              f"({change:+.0f}%)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="End-to-end listener benchmark"
+    )
+    parser.add_argument("--servers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0,
+                        help="Duration of each rate step")
+    parser.add_argument("--rates", type=int, nargs="+",
+                        default=[1000, 5000, 20000, 50000, 100000, 200000],
+                        help="Total lines per second for each step")
+    parser.add_argument("--backends", nargs="+", choices=LOG_BACKENDS,
+                        default=list(LOG_BACKENDS))
+    parser.add_argument("--batch-seconds", type=float, default=0.25,
+                        help="Slack batching window in the listener")
+    parser.add_argument("--max-latency", type=float, default=2.0,
+                        help="Highest p99 latency a sustained step allows")
+    parser.add_argument("--grace", type=float, default=3.0,
+                        help="Seconds to wait for markers after a step")
+    parser.add_argument("--storm-errors", type=int, default=500)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+
+    results: dict[str, Any] = {
+        "run": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "servers": args.servers,
+            "seconds_per_step": args.seconds,
+            "batch_seconds": args.batch_seconds,
+        },
+        "backends": {},
+    }
+    for backend in args.backends:
+        result = benchmark(backend, args)
+        if not any(step["delivered"] for step in result["steps"]):
+            raise AssertionError(f"{backend} delivered no markers at any "
+                                 "rate; not saving results")
+        results["backends"][backend] = result
+
+    if args.output.exists():
+        compare(json.loads(args.output.read_text()), results)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure the log parser against the per-consumer regexes it replaced.
+
+The previous pipeline stripped the timestamp with a regex in the
+deduplicator, then each event handler searched the raw line with its own
+pattern. The parsed pipeline splits every line once and hands the record
+to both. Only tokenizing is timed, not deduplication or formatting.
+
+Event lines are 30% of the mixed input so that handler parsing shows up.
+The followers only deliver trigger lines, so that case is timed as well.
+
+Run with: python -m tests.benchmarks.bench_log_parser [lines]
+"""
+import re
+import sys
+import timeit
+from typing import Callable, Iterable
+
+from src.listener import event_router
+from src.utility.log_parser import LogRecord, parse_line, parse_many
+from tests.benchmarks.synthetic_log import generate_lines
+
+TIMESTAMP_PATTERN = re.compile(r'^\[[\d\-:T\s]+\]\s*')
+LOGIN_PATTERN = re.compile(r".+]: (.+)\[\/([^\]]+)\] logged in with "
+                           r"entity id \d+ at \(([^)]+)\)")
+LOST_CONNECTION_PATTERN = re.compile(
+    r"\[Server thread\/INFO]: (.*) lost connection: (.+)"
+)
+LOGIN = "logged in with entity id"
+LOST_CONNECTION = "lost connection"
+
+
+def previous_pipeline(lines: list[str]) -> None:
+    """Tokenize each line in the deduplicator and again in its handler."""
+    match = event_router.match_trigger
+    for line in lines:
+        TIMESTAMP_PATTERN.sub('', line, count=1).strip()
+        trigger = match(line)
+        if trigger == LOGIN:
+            LOGIN_PATTERN.search(line)
+        elif trigger == LOST_CONNECTION:
+            LOST_CONNECTION_PATTERN.search(line)
+
+
+def handle_records(records: Iterable[LogRecord]) -> None:
+    """Read the dedupe key and handler fields from parsed records."""
+    match = event_router.match_trigger
+    for record in records:
+        record.body
+        trigger = match(record.line)
+        if trigger == LOGIN:
+            event_router.LOGIN_PATTERN.match(record.message)
+        elif trigger == LOST_CONNECTION:
+            event_router.LOST_CONNECTION_PATTERN.match(record.message)
+
+
+def parsed_pipeline(lines: list[str]) -> None:
+    """Parse each line once and let every consumer read the record."""
+    handle_records(map(parse_line, lines))
+
+
+def batched_pipeline(lines: list[str]) -> None:
+    for start in range(0, len(lines), 1000):
+        handle_records(parse_many(lines[start:start + 1000]))
+
+
+def measure(label: str, func: Callable[[list[str]], object],
+            lines: list[str]) -> None:
+    elapsed = min(timeit.repeat(lambda: func(lines), number=1, repeat=3))
+    print(f"{label:<24} {len(lines) / elapsed:>12,.0f} lines/sec")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lines = list(generate_lines(count, event_ratio=0.3))
+    events = list(generate_lines(count, event_ratio=1.0))
+
+    measure("parse_line", lambda batch: [parse_line(line) for line in batch],
+            lines)
+    measure("parse_many", parse_many, lines)
+    measure("per-consumer regexes", previous_pipeline, lines)
+    measure("parsed once", parsed_pipeline, lines)
+    measure("parsed once, batched", batched_pipeline, lines)
+    print("trigger lines only, as the followers deliver them:")
+    measure("per-consumer regexes", previous_pipeline, events)
+    measure("parsed once", parsed_pipeline, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Compare sequential and concurrent mod updates against a fake Modrinth,
+timing the planning phase on its own.
+
+The fake server adds a fixed latency to every request. Installed jars are
+known to the fake, so they resolve through the bulk hash lookup, except a
+third of the mods whose newest build is a beta and are rechecked one by one.
+
+Run with: python -m tests.benchmarks.bench_mod_updater [mods] [latency]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from src.updater import mod_updater
+from src.updater.modrinth_client import ModrinthClient
+from tests.fake_modrinth import FakeModrinth, make_version
+
+JOBS = (1, 4, 8, 16)
+
+
+def build_projects(count: int) -> dict[str, list[dict[str, Any]]]:
+    projects = {}
+    for index in range(count):
+        version_type = "beta" if index % 3 == 0 else "release"
+        slug = f"benchmod{index}"
+        projects[slug] = [
+            make_version(slug, "2.0.0", version_type=version_type),
+            make_version(slug, "1.0.0", version_type=version_type),
+        ]
+    return projects
+
+
+def prepare_mods(directory: Path,
+                 projects: dict[str, list[dict[str, Any]]]) -> Path:
+    mods_dir = directory / "mods"
+    mods_dir.mkdir()
+    for versions in projects.values():
+        installed = versions[-1]
+        path = mods_dir / installed["files"][0]["filename"]
+        path.write_bytes(installed["content"])
+    return mods_dir
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    projects = build_projects(count)
+    server = FakeModrinth(projects, latency).start()
+    mod_updater.MODRINTH_API = server.api
+    # The real budget would dominate the timing against a local server.
+    mod_updater.CLIENT = ModrinthClient(60_000, burst=1000)
+    mod_updater.load_slug_overrides = lambda: {}  # type: ignore
+
+    print(f"{count} mods, {latency * 1000:.0f}ms latency per request")
+    baseline = 0.0
+    try:
+        for jobs in JOBS:
+            with tempfile.TemporaryDirectory() as directory:
+                mods_dir = prepare_mods(Path(directory), projects)
+                server.requests.clear()
+                start = time.perf_counter()
+                plan = mod_updater.plan_updates(mods_dir, "1.21.8",
+                                                "fabric", jobs)
+                planned = time.perf_counter() - start
+                updates = mod_updater.apply_plan(plan, jobs)
+                elapsed = time.perf_counter() - start
+                mod_updater.close_indexes()
+            baseline = baseline or elapsed
+            print(f"jobs={jobs:<3} {elapsed:7.2f}s plan={planned:5.2f}s "
+                  f"updates={updates} "
+                  f"api_requests={server.total_requests()} "
+                  f"speedup={baseline / elapsed:5.1f}x")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Update a pack against a rate-limited fake Modrinth, with and without the
+client's retries, to show mods no longer fail when the limit is hit.
+
+Every mod only has beta builds, so each is looked up by project as well
+as by hash. The fake allows ``limit`` API requests per ``window`` seconds.
+
+Run with: python -m tests.benchmarks.bench_modrinth_client [mods] [limit]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.updater import mod_updater
+from src.updater.modrinth_client import ModrinthClient
+from tests.benchmarks.bench_mod_updater import prepare_mods
+from tests.fake_modrinth import FakeModrinth, make_version
+
+WINDOW = 1.0
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    projects = {
+        f"benchmod{index}": [
+            make_version(f"benchmod{index}", number, version_type="beta")
+            for number in ("2.0.0", "1.0.0")
+        ]
+        for index in range(count)
+    }
+    mod_updater.load_slug_overrides = lambda: {}  # type: ignore
+
+    print(f"{count} mods, {limit} requests per {WINDOW:.0f}s")
+    for retries in (0, 4):
+        server = FakeModrinth(projects, latency=0.02, rate_limit=limit,
+                              window=WINDOW).start()
+        mod_updater.MODRINTH_API = server.api
+        mod_updater.CLIENT = ModrinthClient(60_000, burst=1000,
+                                            retries=retries)
+        mod_updater.LOOKUPS = mod_updater.LookupMemo()
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                mods_dir = prepare_mods(Path(directory), projects)
+                start = time.perf_counter()
+                updates = mod_updater.update_mods(mods_dir, "1.21.8",
+                                                  "fabric", 16)
+                elapsed = time.perf_counter() - start
+                mod_updater.close_indexes()
+        finally:
+            server.stop()
+        print(f"retries={retries} {elapsed:6.2f}s updates={updates:<4} "
+              f"throttled={server.throttled:<4} "
+              f"{mod_updater.CLIENT.describe()}")
+
+
+if __name__ == "__main__":
+    main()
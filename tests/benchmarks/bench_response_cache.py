@@ -0,0 +1,69 @@
+"""
+Count Modrinth API requests for a multi-server sweep with and without the
+shared response cache.
+
+Every server has the same mods, installed from jars Modrinth does not know
+(as with locally renamed or repacked jars), so each one is looked up by
+slug.
+
+Run with: python -m tests.benchmarks.bench_response_cache [mods] [servers]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.updater import mod_updater
+from src.updater.modrinth_client import ModrinthClient
+from src.updater.response_cache import ResponseCache
+from tests.fake_modrinth import FakeModrinth, make_version
+
+
+def sweep(server: FakeModrinth, directory: Path, mods: int, servers: int,
+          cache: Optional[ResponseCache]) -> tuple[int, float]:
+    mod_updater.CACHE = cache
+    server.requests.clear()
+    start = time.perf_counter()
+    for index in range(servers):
+        mods_dir = directory / f"server-{index}"
+        mods_dir.mkdir()
+        for mod in range(mods):
+            (mods_dir / f"sweepmod{mod}-1.0.0.jar").write_bytes(b"local")
+        # Each server used to be a separate process with its own memo.
+        mod_updater.LOOKUPS = mod_updater.LookupMemo()
+        mod_updater.update_mods(mods_dir, "1.21.8", "fabric", jobs=8)
+    return server.total_requests(), time.perf_counter() - start
+
+
+def main() -> None:
+    mods = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    servers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    projects = {f"sweepmod{index}": [make_version(f"sweepmod{index}", "2.0")]
+                for index in range(mods)}
+    server = FakeModrinth(projects, latency=0.02).start()
+    mod_updater.MODRINTH_API = server.api
+    mod_updater.CLIENT = ModrinthClient(60_000, burst=1000)
+    mod_updater.load_slug_overrides = lambda: {}  # type: ignore
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            (root / "plain").mkdir()
+            (root / "cached").mkdir()
+            requests, elapsed = sweep(server, root / "plain", mods,
+                                      servers, None)
+            print(f"no cache:     {requests:4} API requests {elapsed:6.2f}s")
+
+            cache = ResponseCache(root / "cache.sqlite")
+            requests, elapsed = sweep(server, root / "cached", mods,
+                                      servers, cache)
+            print(f"shared cache: {requests:4} API requests {elapsed:6.2f}s "
+                  f"({cache.describe()})")
+            cache.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+CPU and RSS accounting for a process and its descendants via /proc.
+"""
+import os
+from pathlib import Path
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def list_descendants(pid: int) -> list[int]:
+    """Return a process id and all of its descendants."""
+    found = [pid]
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            children = (task / "children").read_text().split()
+        except OSError:
+            continue
+        for child in children:
+            found.extend(list_descendants(int(child)))
+    return found
+
+
+def measure_tree(pid: int) -> tuple[float, int, int]:
+    """Return CPU seconds, RSS bytes and process count for a tree."""
+    cpu = 0.0
+    rss = 0
+    processes = list_descendants(pid)
+    for process in processes:
+        try:
+            stat = Path(f"/proc/{process}/stat").read_text()
+            statm = Path(f"/proc/{process}/statm").read_text()
+        except OSError:
+            continue
+        fields = stat.rsplit(")", 1)[1].split()
+        cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        rss += int(statm.split()[1]) * PAGE_SIZE
+    return cpu, rss, len(processes)
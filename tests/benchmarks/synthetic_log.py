@@ -0,0 +1,46 @@
+"""
+Synthetic Minecraft/Fabric/Geyser log lines for benchmarks.
+"""
+import random
+from typing import Iterator
+
+ROUTINE_LINES = [
+    "[Server thread/INFO]: Saving chunks for level 'ServerLevel[world]'",
+    "[Server thread/INFO]: ThreadedAnvilChunkStorage: All chunks are saved",
+    "[Server thread/INFO]: Villager axw['Farmer'/123, l='ServerLevel[world]',"
+    " x=-12.50, y=64.00, z=33.50] died, message: 'Farmer was slain'",
+    "[Geyser Async Thread/INFO]: Player connected with username .Steve1234",
+    "[Server thread/WARN]: Can't keep up! Is the server overloaded? "
+    "Running 2041ms or 40 ticks behind",
+    "[Server thread/INFO]: [Not Secure] <Alex> anyone want to trade?",
+    "[Worker-Main-12/INFO]: Preparing spawn area: 84%",
+    "[Server thread/INFO] (Minecraft) Saving the game (this may take a "
+    "moment!)",
+    "[Geyser Scheduled Thread/WARN] (Geyser) Unable to connect to the "
+    "Floodgate key",
+    "[Server thread/INFO]: Alex has made the advancement [Stone Age]",
+]
+EVENT_LINES = [
+    "[Server thread/INFO]: Alex[/192.168.1.20:53211] logged in with entity "
+    "id 412 at (12.5, 64.0, -33.2)",
+    "[Server thread/INFO]: Alex lost connection: Disconnected",
+    "[Server thread/INFO]: Done (12.345s)! For help, type \"help\" or "
+    "\"geyser help for help\"",
+    "[Server thread/ERROR]: Block-attached entity at invalid position: null",
+    "[Server thread/FATAL]: Preparing crash report with UUID "
+    "4a3c1e9f-0d2b-4c55-9a7e-1f2b3c4d5e6f",
+]
+
+
+def generate_lines(
+        count: int, event_ratio: float = 0.02, seed: int = 1
+) -> Iterator[str]:
+    """Yield timestamped log lines with a share of trigger lines."""
+    chooser = random.Random(seed)
+    for index in range(count):
+        seconds = index // 50
+        stamp = (f"[{seconds // 3600 % 24:02d}:{seconds // 60 % 60:02d}:"
+                 f"{seconds % 60:02d}]")
+        pool = EVENT_LINES if chooser.random() < event_ratio else (
+            ROUTINE_LINES)
+        yield f"{stamp} {chooser.choice(pool)}"
@@ -0,0 +1,247 @@
+"""
+Local stand-in for the Modrinth API and CDN, for tests and benchmarks.
+"""
+import hashlib
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def make_version(slug: str, number: str, game_version: str = "1.21.8",
+                 loader: str = "fabric", version_type: str = "release",
+                 size: int = 4096,
+                 dependencies: Optional[list[dict[str, Any]]] = None
+                 ) -> dict[str, Any]:
+    """Build a Modrinth version payload with a deterministic jar."""
+    content = (f"{slug}-{number}".encode() * size)[:size]
+    return {
+        "id": f"{slug}-{number}-id",
+        "project_id": f"{slug}-project",
+        "version_number": number,
+        "version_type": version_type,
+        "game_versions": [game_version],
+        "loaders": [loader],
+        "dependencies": dependencies or [],
+        "files": [{
+            "filename": f"{slug}-{number}.jar",
+            "url": "",
+            "size": len(content),
+            "primary": True,
+            "hashes": {
+                "sha1": hashlib.sha1(content).hexdigest(),  # nosec[B324]
+                "sha512": hashlib.sha512(content).hexdigest(),
+            },
+        }],
+        "content": content,
+    }
+
+
+class FakeModrinth(ThreadingHTTPServer):
+    """
+    Serves /v2 project version lists, versions by id and /files downloads
+    from memory.
+
+    ``projects`` maps a slug to its versions, newest first. Every request
+    waits ``latency`` seconds and is counted by path in ``requests``. With
+    ``rate_limit``, at most that many /v2 requests are served per
+    ``window`` seconds, with Modrinth's rate-limit headers, and the rest
+    get a 429 and are counted in ``throttled``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, projects: dict[str, list[dict[str, Any]]],
+                 latency: float = 0.0, rate_limit: Optional[int] = None,
+                 window: float = 60.0):
+        super().__init__(("127.0.0.1", 0), FakeModrinthHandler)
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.window = window
+        self.throttled = 0
+        self._window_start = time.monotonic()
+        self._window_used = 0
+        self.projects = projects
+        self.requests: dict[str, int] = {}
+        self.files: dict[str, bytes] = {}
+        self.hashes: dict[str, str] = {}
+        self.versions: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        for versions in projects.values():
+            for version in versions:
+                self.add_file(version)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def api(self) -> str:
+        return f"{self.url}/v2"
+
+    def add_file(self, version: dict[str, Any]) -> None:
+        file = version["files"][0]
+        file["url"] = f"{self.url}/files/{file['filename']}"
+        self.files[file["filename"]] = version["content"]
+        self.versions[version["id"]] = version
+        slug = version["project_id"].removesuffix("-project")
+        for digest in file["hashes"].values():
+            self.hashes[digest] = slug
+
+    def count(self, path: str) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def take(self) -> tuple[bool, dict[str, str]]:
+        """Use one request of the window; return if allowed and headers."""
+        if self.rate_limit is None:
+            return True, {}
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._window_used = 0
+            allowed = self._window_used < self.rate_limit
+            if allowed:
+                self._window_used += 1
+            else:
+                self.throttled += 1
+            remaining = self.rate_limit - self._window_used
+            reset = self.window - (now - self._window_start)
+        return allowed, {
+            "X-Ratelimit-Limit": str(self.rate_limit),
+            "X-Ratelimit-Remaining": str(remaining),
+            "X-Ratelimit-Reset": str(math.ceil(reset)),
+        }
+
+    def total_requests(self, prefix: str = "/v2/") -> int:
+        return sum(count for path, count in self.requests.items()
+                   if path.startswith(prefix))
+
+    def start(self) -> "FakeModrinth":
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def public(version: dict[str, Any]) -> dict[str, Any]:
+    """Return a version payload without the in-memory jar content."""
+    return {key: value for key, value in version.items() if key != "content"}
+
+
+class FakeModrinthHandler(BaseHTTPRequestHandler):
+    server: FakeModrinth
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    limit_headers: dict[str, str] = {}
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        self.server.count(url.path)
+        time.sleep(self.server.latency)
+        parts = url.path.strip("/").split("/")
+        if parts[0] == "v2" and not self.allowed():
+            return
+
+        if parts[0] == "files" and parts[-1] in self.server.files:
+            self.send_body(self.server.files[parts[-1]],
+                           "application/java-archive")
+            return
+
+        if len(parts) == 3 and parts[:2] == ["v2", "version"]:
+            if parts[2] in self.server.versions:
+                self.send_json(200, public(self.server.versions[parts[2]]))
+            else:
+                self.send_json(404, {"error": "not_found"})
+            return
+
+        if (len(parts) == 4 and parts[:2] == ["v2", "project"]
+                and parts[3] == "version"):
+            versions = self.server.projects.get(
+                parts[2].removesuffix("-project"))
+            if versions is None:
+                self.send_json(404, {"error": "not_found"})
+                return
+            query = parse_qs(url.query)
+            found = [public(version) for version in versions
+                     if matches(version, query)]
+            etag = '"' + hashlib.sha1(  # nosec[B324]
+                json.dumps(found).encode()).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_body(b"", "application/json", 304)
+                return
+            self.send_json(200, found, {"ETag": etag})
+            return
+
+        self.send_json(404, {"error": "not_found"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        self.server.count(url.path)
+        time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.allowed():
+            return
+
+        if url.path == "/v2/version_files/update":
+            query = {key: [json.dumps(body[key])]
+                     for key in ("game_versions", "loaders") if key in body}
+            found = {}
+            for digest in body["hashes"]:
+                slug = self.server.hashes.get(digest)
+                versions = self.server.projects.get(slug or "", [])
+                compatible = [version for version in versions
+                              if matches(version, query)]
+                if compatible:
+                    found[digest] = public(compatible[0])
+            self.send_json(200, found)
+            return
+
+        self.send_json(404, {"error": "not_found"})
+
+    def allowed(self) -> bool:
+        """Apply the rate limit, answering 429 when it is used up."""
+        allowed, self.limit_headers = self.server.take()
+        if not allowed:
+            self.send_json(429, {"error": "ratelimit_error"})
+        return allowed
+
+    def send_json(self, status: int, data: Any,
+                  headers: Optional[dict[str, str]] = None) -> None:
+        self.send_body(json.dumps(data).encode(), "application/json",
+                       status, headers)
+
+    def send_body(self, body: bytes, content_type: str, status: int = 200,
+                  headers: Optional[dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in {**self.limit_headers, **(headers or {})}.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def matches(version: dict[str, Any], query: dict[str, list[str]]) -> bool:
+    """Check a version against game_versions/loaders/version_type filters."""
+    for key in ("game_versions", "loaders"):
+        if key in query:
+            wanted = json.loads(query[key][0])
+            if not set(wanted) & set(version[key]):
+                return False
+    if "version_type" in query:
+        return bool(version["version_type"] == query["version_type"][0])
+    return True
@@ -0,0 +1,90 @@
+"""
+Local stand-in for a Slack incoming webhook, for tests and benchmarks.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+class FakeSlack(ThreadingHTTPServer):
+    """
+    Accepts webhook posts and records each payload with its arrival time.
+
+    The first ``rate_limits`` posts are answered with HTTP 429, and every
+    post is answered with HTTP 500 while ``down`` is set.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, rate_limits: int = 0, retry_after: float = 0.2):
+        super().__init__(("127.0.0.1", 0), FakeSlackHandler)
+        self.rate_limits = rate_limits
+        self.retry_after = retry_after
+        self.down = False
+        self.requests = 0
+        self.payloads: list[tuple[float, dict[str, Any]]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+    def receive(self, payload: dict[str, Any]) -> int:
+        """Record a payload; return the HTTP status to answer with."""
+        with self._lock:
+            self.requests += 1
+            if self.down:
+                return 500
+            if self.rate_limits > 0:
+                self.rate_limits -= 1
+                return 429
+            self.payloads.append((time.time(), payload))
+            return 200
+
+    def received(self) -> list[tuple[float, dict[str, Any]]]:
+        with self._lock:
+            return list(self.payloads)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.payloads.clear()
+
+    def start(self) -> "FakeSlack":
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class FakeSlackHandler(BaseHTTPRequestHandler):
+    server: FakeSlack
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        status = self.server.receive(payload)
+        if status != 429:
+            self.send_body(status, b"ok" if status == 200 else b"down")
+            return
+        self.send_response(429)
+        self.send_header("Retry-After", str(self.server.retry_after))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def send_body(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
@@ -0,0 +1,68 @@
+"""
+Integration tests for counting events in archived logs.
+"""
+import gzip
+from pathlib import Path
+
+from src.listener.backfill import backfill
+from src.listener.signatures import error_signature
+
+LOGIN = ("[10:00:00] [Server thread/INFO]: Alex[/10.0.0.1:5000] logged in "
+         "with entity id 7 at (1.5, 64.0, -2.5)")
+ERROR = ("[{}:15:00] [Server thread/ERROR]: Chunk {} at 0x{} failed to "
+         "save")
+ROUTINE = "[10:30:00] [Server thread/INFO]: Saving chunks"
+
+
+def write_archive(path: Path, lines: list[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt") as archive:
+        archive.write("\n".join(lines) + "\n")
+
+
+def test_backfill_counts_events_per_server(tmp_path: Path):
+    """Test that archives are tallied by event, signature and bucket."""
+    survival = tmp_path / "survival" / "logs"
+    creative = tmp_path / "creative" / "logs"
+    write_archive(survival / "2026-01-01-1.log.gz",
+                  [LOGIN, ROUTINE, ERROR.format(10, 1, "ff")])
+    write_archive(survival / "2026-01-02-1.log.gz",
+                  [ERROR.format(11, 22, "1a"), ERROR.format(11, 3, "2b")])
+    write_archive(survival / "2025-12-31-1.log.gz", [LOGIN])
+    write_archive(creative / "2026-01-01-1.log.gz", [LOGIN])
+
+    tallies = backfill([("Survival", survival), ("Creative", creative)],
+                       bucket="day", since="2026-01-01", workers=2)
+
+    survival_tally = tallies["Survival"]
+    assert survival_tally.archives == 2
+    assert survival_tally.events == {"🟢 Player Joined": 1,
+                                     "❌ Server Error": 3}
+    assert survival_tally.signatures == {
+        "[Server thread/ERROR]: Chunk <n> at <hex> failed to save": 3
+    }
+    assert survival_tally.buckets == {"2026-01-01": 2, "2026-01-02": 2}
+    assert tallies["Creative"].events == {"🟢 Player Joined": 1}
+
+
+def test_error_signature_hides_ids():
+    """Test that numbers, hex and UUIDs are replaced in signatures."""
+    message = ("Crash 4a3c1e9f-0d2b-4c55-9a7e-1f2b3c4d5e6f at 0xDEAD "
+               "after 12.5s")
+    assert error_signature(message) == "Crash <uuid> at <hex> after <n>s"
+
+
+def test_backfill_reads_forge_timestamps(tmp_path: Path):
+    """Test that dated Forge lines with milliseconds are counted."""
+    logs = tmp_path / "logs"
+    forge = ("[01Jan2026 {}.250] [Server thread/{}] "
+             "[net.minecraft.server.MinecraftServer/]: {}")
+    write_archive(logs / "2026-01-01-1.log.gz", [
+        forge.format("23:59:00", "INFO", LOGIN.split(": ", 1)[1]),
+        forge.format("00:01:00", "ERROR", "Chunk 5 at 0x3f failed to save"),
+    ])
+
+    tally = backfill([("Forge", logs)], bucket="day")["Forge"]
+
+    assert tally.events == {"🟢 Player Joined": 1, "❌ Server Error": 1}
+    assert tally.buckets == {"2026-01-01": 1, "2026-01-02": 1}
@@ -0,0 +1,141 @@
+"""
+Integration tests for resuming log followers from checkpoints.
+"""
+import gzip
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from src.listener.checkpoint import CheckpointStore, plan_resume
+from src.listener.inotify_watcher import InotifyFollower
+
+
+def follow_and_stop(log: Path, state: Path) -> None:
+    """Follow a log until a partial line is read, then save and stop."""
+    checkpoints = CheckpointStore(str(state))
+    follower = InotifyFollower(check_seconds=0.05, checkpoints=checkpoints)
+    follower.add(str(log), lambda line: None)
+    with open(log, "a") as f:
+        f.write("seen\nhalf a ")
+    follower.poll()
+    checkpoints.flush()
+
+
+def resume(log: Path, state: Path) -> list[str]:
+    lines: list[str] = []
+    follower = InotifyFollower(check_seconds=0.05,
+                               checkpoints=CheckpointStore(str(state)))
+    follower.add(str(log), lines.append)
+    return lines
+
+
+def test_follower_resumes_from_checkpoint(tmp_path: Path):
+    """Test that lines written while stopped are replayed after restart."""
+    log, state = tmp_path / "latest.log", tmp_path / "state.json"
+    log.write_text("old\n")
+    follow_and_stop(log, state)
+
+    with open(log, "a") as f:
+        f.write("line\nmissed\n")
+
+    assert resume(log, state) == ["half a line", "missed"]
+
+
+def test_rotated_log_is_replayed_from_archive(tmp_path: Path):
+    """Test that the rest of a rotated log comes from its .log.gz."""
+    log, state = tmp_path / "latest.log", tmp_path / "state.json"
+    log.write_text("old\n")
+    follow_and_stop(log, state)
+
+    with open(log, "a") as f:
+        f.write("line\nbefore rotation\n")
+    with gzip.open(tmp_path / "2026-01-01-1.log.gz", "wb") as archive:
+        archive.write(log.read_bytes())
+    log.unlink()
+    log.write_text("after rotation\n")
+
+    assert resume(log, state) == [
+        "half a line", "before rotation", "after rotation"
+    ]
+
+
+def test_catch_up_is_capped(tmp_path: Path):
+    """Test that only the most recent lines are replayed over the cap."""
+    log = tmp_path / "latest.log"
+    log.write_text("start\n")
+    checkpoint = {"inode": os.stat(log).st_ino, "offset": 6,
+                  "partial": "", "saved": 0.0}
+    with open(log, "a") as f:
+        f.writelines(f"line {n}\n" for n in range(100))
+
+    resumed = plan_resume(str(log), checkpoint, max_bytes=20)
+    assert resumed.lines == [b"line 98", b"line 99"]
+    assert resumed.offset == os.stat(log).st_size
+
+    skipped = plan_resume(str(log), checkpoint, max_bytes=20,
+                          fast_forward=True)
+    assert skipped.lines == []
+    assert skipped.skipped == os.stat(log).st_size - 6
+
+
+def test_every_rotation_while_stopped_is_replayed(tmp_path: Path):
+    """
+    Test that when the log rotates several times while stopped, the first
+    archive resumes from the checkpoint and later ones replay in full.
+    """
+    log, state = tmp_path / "latest.log", tmp_path / "state.json"
+    log.write_text("old\n")
+    follow_and_stop(log, state)
+
+    with open(log, "a") as f:
+        f.write("line\n[10:00:00] [Server thread/FATAL]: missed1\n")
+    for day, text in ((1, ""), (2, "second run\n"), (3, "third run\n")):
+        if text:
+            log.write_text(text)
+        archive = tmp_path / f"2026-01-0{day}-1.log.gz"
+        with gzip.open(archive, "wb") as f:
+            f.write(log.read_bytes())
+        os.utime(archive, (os.stat(state).st_mtime + day,) * 2)
+        log.unlink()
+    log.write_text("after rotation\n")
+
+    assert resume(log, state) == [
+        "half a line", "[10:00:00] [Server thread/FATAL]: missed1",
+        "second run", "third run", "after rotation"
+    ]
+
+
+def test_lines_written_during_resume_are_read_once(tmp_path: Path,
+                                                   mocker: MockerFixture):
+    """
+    Test that bytes appended after the resume is planned are neither
+    replayed twice nor merged into the saved partial line.
+    """
+    log, state = tmp_path / "latest.log", tmp_path / "state.json"
+    log.write_text("old\n")
+    follow_and_stop(log, state)
+    with open(log, "a") as f:
+        f.write("line\nmissed\n")
+
+    stat = os.stat
+
+    def stat_then_append(path, *args, **kwargs):
+        status = stat(path, *args, **kwargs)
+        if path == str(log) and not appended:
+            appended.append(True)
+            with open(log, "a") as f:
+                f.write("during\nhal")
+        return status
+
+    appended: list[bool] = []
+    mocker.patch("src.listener.checkpoint.os.stat", stat_then_append)
+    lines: list[str] = []
+    follower = InotifyFollower(check_seconds=0.05,
+                               checkpoints=CheckpointStore(str(state)))
+    follower.add(str(log), lines.append)
+    with open(log, "a") as f:
+        f.write("f\n")
+    follower.poll()
+
+    assert lines == ["half a line", "missed", "during", "half"]
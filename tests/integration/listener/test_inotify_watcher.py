@@ -0,0 +1,90 @@
+"""
+Integration tests for the InotifyFollower against real files.
+"""
+import errno
+import os
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from src.listener.inotify_watcher import InotifyFollower
+
+
+def follow(tmp_path: Path) -> tuple[InotifyFollower, Path, list[str]]:
+    log = tmp_path / "latest.log"
+    log.write_text("old line\n")
+    lines: list[str] = []
+    follower = InotifyFollower(check_seconds=0.05)
+    follower.add(str(log), lines.append)
+    return follower, log, lines
+
+
+def test_follower_yields_only_new_complete_lines(tmp_path: Path):
+    """Test that existing content is skipped and partial lines are held."""
+    follower, log, lines = follow(tmp_path)
+
+    with open(log, "a") as f:
+        f.write("first\nsecond part")
+    follower.poll()
+    assert lines == ["first"]
+
+    with open(log, "a") as f:
+        f.write("ial\n")
+    follower.poll()
+    assert lines == ["first", "second partial"]
+
+
+def test_follower_reads_rotated_file_from_start(tmp_path: Path):
+    """Test that a file moved into place is followed from its start."""
+    follower, log, lines = follow(tmp_path)
+
+    with open(log, "a") as f:
+        f.write("before rotation\n")
+    replacement = tmp_path / "next.log"
+    replacement.write_text("after rotation\n")
+    os.replace(replacement, log)
+    follower.poll()
+    follower.poll()
+
+    assert lines == ["before rotation", "after rotation"]
+
+
+def test_follower_restarts_after_truncation(tmp_path: Path):
+    """Test that a truncated file is read again from the start."""
+    follower, log, lines = follow(tmp_path)
+
+    log.write_text("fresh\n")
+    follower.poll()
+    follower.poll()
+
+    assert lines == ["fresh"]
+
+
+def test_read_error_only_affects_its_log(tmp_path: Path,
+                                         mocker: MockerFixture):
+    """Test that an I/O error on one log leaves the others followed."""
+    follower, broken, broken_lines = follow(tmp_path)
+    healthy = tmp_path / "other" / "latest.log"
+    healthy.parent.mkdir()
+    healthy.write_text("")
+    healthy_lines: list[str] = []
+    follower.add(str(healthy), healthy_lines.append)
+    failing = follower._logs[next(iter(follower._logs))]["latest.log"].fd
+    preadv = os.preadv
+
+    def flaky(fd: int, buffers: list[memoryview], offset: int) -> int:
+        if fd == failing:
+            raise OSError(errno.EIO, "Input/output error")
+        return preadv(fd, buffers, offset)
+
+    mocker.patch("os.preadv", flaky)
+    for log in (broken, healthy):
+        with open(log, "a") as f:
+            f.write("written\n")
+    follower.poll()
+    follower.poll()
+    assert (broken_lines, healthy_lines) == ([], ["written"])
+
+    mocker.patch("os.preadv", preadv)
+    follower.poll()
+    assert broken_lines == ["written"]
@@ -0,0 +1,81 @@
+"""
+Integration tests for player session tracking and its SQLite store.
+"""
+import gzip
+import time
+from pathlib import Path
+
+from src.listener.sessions import SessionStore, SessionTracker, rebuild
+from src.utility.log_parser import parse_line
+
+LOGIN = ("[10:00:00] [Server thread/INFO]: {}[/10.0.0.{}:5000] logged in "
+         "with entity id 7 at (1.5, 64.0, -2.5)")
+LEFT = "[11:00:00] [Server thread/INFO]: {} lost connection: Disconnected"
+STOPPING = "[12:00:00] [Server thread/INFO]: Stopping the server"
+
+
+def test_tracker_records_sessions_and_playtime(tmp_path: Path):
+    """Test that logins and disconnects become sessions and playtime."""
+    now = time.time()
+    tracker = SessionTracker(SessionStore(tmp_path / "sessions.sqlite"))
+
+    tracker.handle("Survival", parse_line(LOGIN.format("Alex", 1)),
+                   now - 3600)
+    tracker.handle("Survival", parse_line(LOGIN.format(".Steve", 2)),
+                   now - 1800)
+    tracker.handle("Survival", parse_line(LEFT.format("Alex")), now - 600)
+
+    online = tracker.store.online()
+    assert [(s.player, s.edition, s.address, s.position)
+            for s in online] == [(".Steve", "Bedrock", "10.0.0.2:5000",
+                                  "1.5, 64.0, -2.5")]
+    assert [s.player for s in tracker.online("Survival")] == [".Steve"]
+
+    playtime = tracker.store.playtime(1, now=now)
+    assert playtime == {"Alex": 3000.0, ".Steve": 1800.0}
+
+    tracker.store.compact(now + 8 * 86400)
+    reopened = SessionTracker(SessionStore(tmp_path / "sessions.sqlite"))
+    assert reopened.store.playtime(30, now=now)["Alex"] == 3000.0
+    assert [s.player for s in reopened.online()] == [".Steve"]
+
+
+def test_rebuild_replays_rotated_logs(tmp_path: Path):
+    """Test that sessions are rebuilt from .log.gz archives in order."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    archives = {
+        "2026-01-02-1.log.gz": [LOGIN.format("Alex", 1), STOPPING],
+        "2026-01-02-2.log.gz": [LOGIN.format("Alex", 1),
+                                LEFT.format("Alex")],
+        "2026-01-01-1.log.gz": ["[09:00:00] [Server thread/INFO]: Done"],
+    }
+    for name, lines in archives.items():
+        with gzip.open(logs / name, "wt") as archive:
+            archive.write("\n".join(lines) + "\n")
+
+    tracker = SessionTracker(SessionStore(tmp_path / "sessions.sqlite"))
+    count = rebuild(tracker, "Survival", logs, workers=2)
+
+    assert count == 4
+    assert tracker.online() == []
+    now = time.mktime(time.strptime("2026-01-03", "%Y-%m-%d"))
+    assert tracker.store.playtime(2, now=now) == {"Alex": 3 * 3600.0}
+
+
+def test_rebuild_reads_forge_timestamps(tmp_path: Path):
+    """Test that dated Forge lines with milliseconds rebuild sessions."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    forge = ("[02Jan2026 {}.500] [Server thread/INFO] "
+             "[net.minecraft.server.MinecraftServer/]: {}")
+    lines = [forge.format("10:00:00", LOGIN.format("Alex", 1).split(": ")[1]),
+             forge.format("11:30:00", LEFT.format("Alex").split(": ")[1])]
+    with gzip.open(logs / "2026-01-02-1.log.gz", "wt") as archive:
+        archive.write("\n".join(lines) + "\n")
+
+    tracker = SessionTracker(SessionStore(tmp_path / "sessions.sqlite"))
+
+    assert rebuild(tracker, "Survival", logs, workers=1) == 2
+    now = time.mktime(time.strptime("2026-01-03", "%Y-%m-%d"))
+    assert tracker.store.playtime(2, now=now) == {"Alex": 5400.0}
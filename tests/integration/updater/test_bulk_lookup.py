@@ -0,0 +1,74 @@
+"""
+Integration tests for the mod updater against a local stub Modrinth API.
+"""
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.updater import mod_updater
+from src.updater.content_store import ContentStore
+from tests.fake_modrinth import FakeModrinth, make_version
+
+
+@pytest.fixture
+def versions() -> dict[str, list[dict[str, Any]]]:
+    return {
+        "sodium": [make_version("sodium", "2.0.0"),
+                   make_version("sodium", "1.0.0")],
+        "lithium": [make_version("lithium", "3.0.0", version_type="beta"),
+                    make_version("lithium", "2.0.0"),
+                    make_version("lithium", "1.0.0")],
+        "custommod": [make_version("custommod", "1.5.0")],
+        "current": [make_version("current", "4.0.0")],
+    }
+
+
+@pytest.fixture
+def modrinth(versions: dict[str, list[dict[str, Any]]], tmp_path: Path,
+             mocker: MockerFixture) -> Iterator[FakeModrinth]:
+    server = FakeModrinth(versions).start()
+    mocker.patch.object(mod_updater, "MODRINTH_API", server.api)
+    mocker.patch.object(mod_updater, "STORE",
+                        ContentStore(tmp_path / "store"))
+    mocker.patch.object(mod_updater, "LOOKUPS", mod_updater.LookupMemo())
+    mocker.patch.object(mod_updater, "load_slug_overrides", return_value={})
+    yield server
+    server.stop()
+
+
+def install(mods_dir: Path, version: dict[str, Any]) -> None:
+    file = version["files"][0]
+    (mods_dir / file["filename"]).write_bytes(version["content"])
+
+
+def test_update_mods_uses_one_bulk_lookup_for_known_jars(
+        tmp_path: Path, modrinth: FakeModrinth,
+        versions: dict[str, list[dict[str, Any]]]):
+    """
+    Test that known jars resolve through the bulk hash endpoint, betas are
+    rechecked by project id, and only unknown jars use the filename slug.
+    """
+    mods_dir = tmp_path / "mods"
+    mods_dir.mkdir()
+    install(mods_dir, versions["sodium"][1])
+    install(mods_dir, versions["lithium"][2])
+    install(mods_dir, versions["current"][0])
+    (mods_dir / "custommod-1.0.0.jar").write_bytes(b"not on modrinth")
+
+    updates = mod_updater.update_mods(mods_dir, "1.21.8", "fabric")
+
+    assert updates == 3
+    assert sorted(path.name for path in mods_dir.glob("*.jar")) == [
+        "current-4.0.0.jar", "custommod-1.5.0.jar",
+        "lithium-2.0.0.jar", "sodium-2.0.0.jar",
+    ]
+    assert modrinth.requests == {
+        "/v2/version_files/update": 1,
+        "/v2/project/lithium-project/version": 1,
+        "/v2/project/custommod/version": 1,
+        "/files/sodium-2.0.0.jar": 1,
+        "/files/lithium-2.0.0.jar": 1,
+        "/files/custommod-1.5.0.jar": 1,
+    }
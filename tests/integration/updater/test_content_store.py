@@ -0,0 +1,59 @@
+"""
+Integration tests for verified jar downloads through the content store.
+"""
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+import requests
+
+from src.updater.content_store import ContentStore
+from src.updater.errors import DownloadFailed
+from tests.fake_modrinth import FakeModrinth, make_version
+
+
+@pytest.fixture
+def version() -> dict[str, Any]:
+    return make_version("sodium", "2.0.0")
+
+
+@pytest.fixture
+def modrinth(version: dict[str, Any]) -> Iterator[FakeModrinth]:
+    server = FakeModrinth({"sodium": [version]}).start()
+    yield server
+    server.stop()
+
+
+def test_store_downloads_once_and_links_into_each_server(
+        tmp_path: Path, modrinth: FakeModrinth, version: dict[str, Any]):
+    """Test that a jar used by two servers is fetched and stored once."""
+    store = ContentStore(tmp_path / "store")
+    file = version["files"][0]
+
+    with requests.Session() as session:
+        for server in ("one", "two"):
+            mods_dir = tmp_path / server / "mods"
+            mods_dir.mkdir(parents=True)
+            store.install(store.fetch(file, session),
+                          mods_dir / file["filename"])
+
+    first = tmp_path / "one" / "mods" / file["filename"]
+    second = tmp_path / "two" / "mods" / file["filename"]
+    assert first.read_bytes() == version["content"]
+    assert first.stat().st_ino == second.stat().st_ino
+    assert modrinth.requests == {f"/files/{file['filename']}": 1}
+    assert store.describe() == "1 downloaded, 1 reused"
+
+
+def test_store_rejects_corrupt_download(
+        tmp_path: Path, modrinth: FakeModrinth, version: dict[str, Any]):
+    """Test that a download failing verification is never stored."""
+    store = ContentStore(tmp_path / "store")
+    file = version["files"][0]
+    modrinth.files[file["filename"]] = b"truncated"
+
+    with requests.Session() as session:
+        with pytest.raises(DownloadFailed):
+            store.fetch(file, session)
+
+    assert not any(path.is_file() for path in store.root.rglob("*"))
@@ -0,0 +1,114 @@
+"""
+Integration tests for the jar index and mod id based slug resolution.
+"""
+import json
+import zipfile
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.updater import mod_updater
+from src.updater.content_store import ContentStore
+from src.updater.jar_index import JarIndex, read_mod_id
+from tests.fake_modrinth import FakeModrinth, make_version
+
+
+def write_jar(path: Path, entries: dict[str, str]) -> Path:
+    with zipfile.ZipFile(path, "w") as jar:
+        for name, text in entries.items():
+            jar.writestr(name, text)
+    return path
+
+
+@pytest.fixture
+def modrinth(tmp_path: Path, mocker: MockerFixture) -> Iterator[FakeModrinth]:
+    server = FakeModrinth({
+        "custommod": [make_version("custommod", "2.0.0")],
+        "sharedid": [make_version("sharedid", "1.0.0", loader="forge")],
+        "realmod": [make_version("realmod", "2.0.0")],
+    }).start()
+    mocker.patch.object(mod_updater, "MODRINTH_API", server.api)
+    mocker.patch.object(mod_updater, "STORE",
+                        ContentStore(tmp_path / "store"))
+    mocker.patch.object(mod_updater, "LOOKUPS", mod_updater.LookupMemo())
+    mocker.patch.object(mod_updater, "load_slug_overrides", return_value={})
+    yield server
+    server.stop()
+
+
+def test_mod_id_is_read_from_fabric_and_forge_metadata(tmp_path: Path):
+    """Test that mod ids come from fabric.mod.json or mods.toml."""
+    fabric = write_jar(tmp_path / "a.jar", {
+        "fabric.mod.json": json.dumps({"id": "sodium", "version": "1"}),
+    })
+    forge = write_jar(tmp_path / "b.jar", {
+        "META-INF/mods.toml": '[[mods]]\nmodId="jei"\nversion="19"\n',
+    })
+    (tmp_path / "c.jar").write_bytes(b"not a zip")
+
+    assert read_mod_id(fabric) == "sodium"
+    assert read_mod_id(forge) == "jei"
+    assert read_mod_id(tmp_path / "c.jar") is None
+
+
+def test_index_skips_unchanged_jars(tmp_path: Path):
+    """Test that a reopened index only hashes jars that changed."""
+    jar = write_jar(tmp_path / "a.jar", {"fabric.mod.json": '{"id": "a"}'})
+    write_jar(tmp_path / "b.jar", {"fabric.mod.json": '{"id": "b"}'})
+    index = JarIndex(tmp_path)
+    first = index.entry(jar)
+    index.entry(tmp_path / "b.jar")
+    index.close()
+
+    write_jar(tmp_path / "b.jar", {"fabric.mod.json": '{"id": "b2"}'})
+    reopened = JarIndex(tmp_path)
+    assert reopened.entry(jar) == first
+    assert reopened.entry(tmp_path / "b.jar")["mod_id"] == "b2"
+    assert (reopened.reused, reopened.hashed) == (1, 1)
+    reopened.close()
+
+
+def test_unrecognised_jar_resolves_by_mod_id_then_project(
+        tmp_path: Path, modrinth: FakeModrinth, mocker: MockerFixture):
+    """
+    Test that a jar with a nonstandard name is found by its mod id, and
+    that the next run uses the recorded project without hashing.
+    """
+    mods_dir = tmp_path / "mods"
+    mods_dir.mkdir()
+    write_jar(mods_dir / "Custom_Mod_By_Someone.jar",
+              {"fabric.mod.json": '{"id": "custommod"}'})
+
+    assert mod_updater.update_mods(mods_dir, "1.21.8", "fabric") == 1
+    assert modrinth.requests["/v2/project/custommod/version"] == 1
+    assert "/v2/project/custom_mod_by_someone/version" not in \
+        modrinth.requests
+    mod_updater.close_indexes()
+
+    modrinth.requests.clear()
+    mocker.patch.object(mod_updater, "LOOKUPS", mod_updater.LookupMemo())
+    assert mod_updater.update_mods(mods_dir, "1.21.8", "fabric") == 0
+    index = mod_updater.get_index(mods_dir)
+    assert (index.reused, index.hashed) == (1, 0)
+    assert index.entry(mods_dir / "custommod-2.0.0.jar")["project_id"] == \
+        "custommod-project"
+    mod_updater.close_indexes()
+
+
+def test_incompatible_mod_id_project_falls_back_to_filename(
+        tmp_path: Path, modrinth: FakeModrinth):
+    """
+    Test that when the mod id names a project with no compatible version,
+    the slug from the filename is tried next.
+    """
+    mods_dir = tmp_path / "mods"
+    mods_dir.mkdir()
+    write_jar(mods_dir / "realmod-1.0.0.jar",
+              {"fabric.mod.json": '{"id": "sharedid"}'})
+
+    assert mod_updater.update_mods(mods_dir, "1.21.8", "fabric") == 1
+    assert modrinth.requests["/v2/project/sharedid/version"] >= 1
+    assert (mods_dir / "realmod-2.0.0.jar").exists()
+    mod_updater.close_indexes()
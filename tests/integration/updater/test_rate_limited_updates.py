@@ -0,0 +1,41 @@
+"""
+Integration test for updating mods against a rate-limited Modrinth.
+"""
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from src.updater import mod_updater
+from src.updater.content_store import ContentStore
+from src.updater.modrinth_client import ModrinthClient
+from tests.benchmarks.bench_mod_updater import build_projects, prepare_mods
+from tests.fake_modrinth import FakeModrinth
+
+
+def test_updates_finish_within_the_rate_limit(tmp_path: Path,
+                                              mocker: MockerFixture):
+    """
+    Test that a run needing several rate-limit windows updates every mod,
+    following the rate-limit headers instead of failing on 429s.
+    """
+    projects = build_projects(12)
+    server = FakeModrinth(projects, rate_limit=8, window=0.5).start()
+    client = ModrinthClient(60_000, burst=100)
+    mocker.patch.object(mod_updater, "MODRINTH_API", server.api)
+    mocker.patch.object(mod_updater, "CLIENT", client)
+    mocker.patch.object(mod_updater, "STORE",
+                        ContentStore(tmp_path / "store"))
+    mocker.patch.object(mod_updater, "LOOKUPS", mod_updater.LookupMemo())
+    mocker.patch.object(mod_updater, "load_slug_overrides", return_value={})
+    mods_dir = prepare_mods(tmp_path, projects)
+
+    try:
+        updates = mod_updater.update_mods(mods_dir, "1.21.8", "fabric", 8)
+    finally:
+        server.stop()
+        mod_updater.close_indexes()
+
+    assert updates == 12
+    assert server.total_requests() > 8
+    assert client.limiter.waited > 0
+    assert client.retried == server.throttled
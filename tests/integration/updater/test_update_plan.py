@@ -0,0 +1,173 @@
+"""
+Integration tests for planning mod updates and applying them as one change.
+"""
+import sys
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.updater import mod_set, mod_updater
+from src.updater.content_store import ContentStore
+from src.updater.errors import PlanOutdated
+from tests.fake_modrinth import FakeModrinth, make_version
+
+
+@pytest.fixture
+def versions() -> dict[str, list[dict[str, Any]]]:
+    return {
+        "sodium": [make_version("sodium", "2.0.0"),
+                   make_version("sodium", "1.0.0")],
+        "lithium": [make_version("lithium", "2.0.0"),
+                    make_version("lithium", "1.0.0")],
+        "current": [make_version("current", "4.0.0")],
+    }
+
+
+@pytest.fixture
+def modrinth(versions: dict[str, list[dict[str, Any]]], tmp_path: Path,
+             mocker: MockerFixture) -> Iterator[FakeModrinth]:
+    server = FakeModrinth(versions).start()
+    mocker.patch.object(mod_updater, "MODRINTH_API", server.api)
+    mocker.patch.object(mod_updater, "STORE",
+                        ContentStore(tmp_path / "store"))
+    mocker.patch.object(mod_updater, "LOOKUPS", mod_updater.LookupMemo())
+    mocker.patch.object(mod_updater, "load_slug_overrides", return_value={})
+    yield server
+    server.stop()
+    mod_updater.close_indexes()
+
+
+@pytest.fixture
+def mods_dir(tmp_path: Path,
+             versions: dict[str, list[dict[str, Any]]]) -> Path:
+    mods_dir = tmp_path / "server" / "mods"
+    mods_dir.mkdir(parents=True)
+    for version in (versions["sodium"][1], versions["lithium"][1],
+                    versions["current"][0]):
+        file = version["files"][0]
+        (mods_dir / file["filename"]).write_bytes(version["content"])
+    return mods_dir
+
+
+def jars(mods_dir: Path) -> list[str]:
+    return sorted(path.name for path in mods_dir.glob("*.jar"))
+
+
+def test_plan_changes_nothing_and_applies_from_file(
+        tmp_path: Path, mods_dir: Path, modrinth: FakeModrinth):
+    """
+    Test that planning neither downloads nor changes jars, and that a plan
+    read back from JSON swaps in the new set with a rollback snapshot.
+    """
+    plan = mod_updater.plan_updates(mods_dir, "1.21.8", "fabric", jobs=4)
+
+    assert [(update["current"], update["target"])
+            for update in plan["updates"]] == [
+        ("lithium-1.0.0.jar", "lithium-2.0.0.jar"),
+        ("sodium-1.0.0.jar", "sodium-2.0.0.jar"),
+    ]
+    assert jars(mods_dir) == ["current-4.0.0.jar", "lithium-1.0.0.jar",
+                              "sodium-1.0.0.jar"]
+    assert modrinth.total_requests("/files/") == 0
+    assert mod_updater.format_plan(plan)[0] == \
+        f"{mods_dir}: 2 updates, 0.0 MiB to download"
+
+    plan_file = tmp_path / "plan.json"
+    mod_updater.write_plans(plan_file, [plan])
+    [loaded] = mod_updater.read_plans(plan_file)
+    assert mod_updater.apply_plan(loaded) == 2
+
+    assert jars(mods_dir) == ["current-4.0.0.jar", "lithium-2.0.0.jar",
+                              "sodium-2.0.0.jar"]
+    assert jars(mod_set.snapshot_dir(mods_dir)) == [
+        "current-4.0.0.jar", "lithium-1.0.0.jar", "sodium-1.0.0.jar"]
+    assert not mod_set.staging_dir(mods_dir).exists()
+    assert mod_updater.plan_updates(mods_dir, "1.21.8",
+                                    "fabric")["updates"] == []
+
+    mod_updater.close_indexes()
+    assert mod_set.rollback(mods_dir)
+    assert jars(mods_dir) == ["current-4.0.0.jar", "lithium-1.0.0.jar",
+                              "sodium-1.0.0.jar"]
+
+
+def test_failed_download_leaves_mods_untouched(
+        mods_dir: Path, modrinth: FakeModrinth):
+    """Test that one failed download means no jar is changed at all."""
+    del modrinth.files["sodium-2.0.0.jar"]
+
+    assert mod_updater.update_mods(mods_dir, "1.21.8", "fabric") == 0
+
+    assert jars(mods_dir) == ["current-4.0.0.jar", "lithium-1.0.0.jar",
+                              "sodium-1.0.0.jar"]
+    assert not mod_set.staging_dir(mods_dir).exists()
+    assert not mod_set.snapshot_dir(mods_dir).exists()
+
+
+def test_apply_refuses_a_plan_for_changed_jars(
+        mods_dir: Path, modrinth: FakeModrinth):
+    """Test that jars replaced after planning make the plan outdated."""
+    plan = mod_updater.plan_updates(mods_dir, "1.21.8", "fabric")
+    (mods_dir / "sodium-1.0.0.jar").write_bytes(b"replaced by hand")
+
+    with pytest.raises(PlanOutdated):
+        mod_updater.apply_plan(plan)
+    assert modrinth.total_requests("/files/") == 0
+
+
+def test_plan_adds_a_shared_missing_library_once(
+        mods_dir: Path, modrinth: FakeModrinth,
+        versions: dict[str, list[dict[str, Any]]]):
+    """
+    Test that a library required by two updates is planned and installed
+    once, and that a pin the library cannot meet holds its dependent back.
+    """
+    library = make_version("clothlib", "1.0.0")
+    modrinth.projects["clothlib"] = [library]
+    modrinth.add_file(library)
+    needs_library = {"project_id": "clothlib-project", "version_id": None,
+                     "dependency_type": "required"}
+    versions["sodium"][0]["dependencies"] = [needs_library]
+    versions["lithium"][0]["dependencies"] = [
+        needs_library,
+        {"project_id": "current-project", "version_id": "current-3.0.0-id",
+         "dependency_type": "required"},
+    ]
+
+    plan = mod_updater.plan_updates(mods_dir, "1.21.8", "fabric", jobs=4)
+
+    assert [(update["current"], update["target"], update["required_by"])
+            for update in plan["updates"]] == [
+        ("sodium-1.0.0.jar", "sodium-2.0.0.jar", ""),
+        ("", "clothlib-1.0.0.jar", "sodium-2.0.0.jar"),
+    ]
+    assert plan["held"] == [{
+        "file": "lithium-1.0.0.jar", "target": "lithium-2.0.0.jar",
+        "reason": "needs version current-3.0.0-id of current-4.0.0.jar",
+    }]
+    assert modrinth.requests["/v2/project/clothlib-project/version"] == 1
+
+    assert mod_updater.apply_plan(plan) == 2
+    assert jars(mods_dir) == ["clothlib-1.0.0.jar", "current-4.0.0.jar",
+                              "lithium-1.0.0.jar", "sodium-2.0.0.jar"]
+
+
+def test_rollback_option_restores_previous_mods(
+        mods_dir: Path, modrinth: FakeModrinth, mocker: MockerFixture):
+    """Test that --rollback puts back the set an update replaced."""
+    assert mod_updater.update_mods(mods_dir, "1.21.8", "fabric") == 2
+    send = mocker.patch.object(mod_updater, "send_to_slack")
+    mocker.patch.object(sys, "argv", [
+        "mod_updater", "--rollback", "--mods-dir", str(mods_dir),
+        "--game-version", "1.21.8", "--loader", "fabric",
+    ])
+
+    mod_updater.main()
+
+    assert jars(mods_dir) == ["current-4.0.0.jar", "lithium-1.0.0.jar",
+                              "sodium-1.0.0.jar"]
+    assert jars(mod_set.snapshot_dir(mods_dir)) == [
+        "current-4.0.0.jar", "lithium-2.0.0.jar", "sodium-2.0.0.jar"]
+    assert send.call_args.args[2] == "Rolled back mods on 1 servers"
@@ -0,0 +1,64 @@
+"""
+Integration tests for the ServerRegistry against a Crafty-shaped database.
+"""
+import os
+import sqlite3
+from pathlib import Path
+
+from src.utility.server_discovery import ServerInfo, ServerRegistry
+
+
+def create_registry(tmp_path: Path) -> tuple[ServerRegistry, Path, Path]:
+    database = tmp_path / "crafty.sqlite"
+    with sqlite3.connect(database) as connection:
+        connection.execute(
+            "CREATE TABLE servers (server_id TEXT, server_name TEXT)"
+        )
+        connection.execute("INSERT INTO servers VALUES ('one', 'Survival')")
+    servers = tmp_path / "servers"
+    (servers / "one").mkdir(parents=True)
+    return ServerRegistry(str(database), str(servers)), database, servers
+
+
+def bump(path: Path) -> None:
+    """Move a modification time forward so coarse clocks see a change."""
+    status = path.stat()
+    os.utime(path, ns=(status.st_atime_ns, status.st_mtime_ns + 10**9))
+
+
+def test_registry_picks_up_new_servers_and_notifies(tmp_path: Path):
+    """Test that a new server directory and database row are reported."""
+    registry, database, servers = create_registry(tmp_path)
+    changes: list[dict[str, ServerInfo]] = []
+    registry.subscribe(changes.append)
+
+    assert registry.get_name("one") == "Survival"
+    assert not registry.refresh()
+
+    with sqlite3.connect(database) as connection:
+        connection.execute("INSERT INTO servers VALUES ('two', 'Creative')")
+    (servers / "two").mkdir()
+    bump(database)
+    bump(servers)
+
+    assert registry.servers()["two"] == {
+        "name": "Creative",
+        "log_file": str(servers / "two" / "logs/latest.log"),
+    }
+    assert len(changes) == 1
+    assert set(changes[0]) == {"one", "two"}
+    registry.close()
+
+
+def test_registry_notifies_when_server_is_removed(tmp_path: Path):
+    """Test that removing a server directory drops it from the registry."""
+    registry, _, servers = create_registry(tmp_path)
+    changes: list[dict[str, ServerInfo]] = []
+    registry.subscribe(changes.append)
+
+    (servers / "one").rmdir()
+    bump(servers)
+
+    assert registry.servers() == {}
+    assert changes == [{}]
+    registry.close()
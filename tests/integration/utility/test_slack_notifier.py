@@ -0,0 +1,118 @@
+"""
+Integration tests for Slack batching against a local stand-in webhook.
+"""
+import time
+from functools import partial
+from typing import Iterator
+
+import pytest
+
+from src.utility.notifiers import CircuitBreaker, Notifiers, SlackSink
+from src.utility.slack_notifier import (MAX_SECTIONS, SlackBatcher,
+                                        create_session)
+from tests.fake_slack import FakeSlack
+
+
+@pytest.fixture
+def webhook(request: pytest.FixtureRequest) -> Iterator[FakeSlack]:
+    server = FakeSlack(getattr(request, "param", 0)).start()
+    yield server
+    server.stop()
+
+
+def wait_for_payloads(webhook: FakeSlack, count: int,
+                      seconds: float = 3.0) -> None:
+    deadline = time.monotonic() + seconds
+    while len(webhook.payloads) < count and time.monotonic() < deadline:
+        time.sleep(0.02)
+    time.sleep(0.05)
+
+
+def test_batcher_merges_events_per_server(webhook: FakeSlack):
+    """Test that a burst of events becomes one message per server."""
+    batcher = SlackBatcher(window=0.1, webhook=webhook.url,
+                           session=create_session())
+    for index in range(20):
+        batcher.add("Survival", f"⚠️ error {index}", "❌ Server Error")
+    batcher.add("Creative", "🛑 crash", "💀 Server Fatal")
+
+    wait_for_payloads(webhook, 2)
+
+    assert webhook.requests == 2
+    texts = sorted(payload["text"] for _, payload in webhook.received())
+    assert texts == [
+        "Minecraft Creative Alert: 💀 Server Fatal",
+        "Minecraft Survival Alert: ❌ Server Error (20 events)",
+    ]
+
+
+@pytest.mark.parametrize("webhook", [2], indirect=True)
+def test_batcher_retries_after_rate_limit(webhook: FakeSlack):
+    """Test that rate limited messages are retried after Retry-After."""
+    batcher = SlackBatcher(window=0.05, webhook=webhook.url,
+                           session=create_session())
+    batcher.add("Survival", "⚠️ error", "❌ Server Error")
+
+    wait_for_payloads(webhook, 1)
+
+    assert webhook.requests == 3
+    assert batcher.rate_limited == 2
+    assert batcher.sent == 1
+    assert len(webhook.payloads) == 1
+    assert batcher.pending() == 0
+
+
+def test_batch_buffer_is_capped(webhook: FakeSlack):
+    """Test that events past one message's worth are only counted."""
+    batcher = SlackBatcher(window=60, webhook=webhook.url,
+                           session=create_session())
+    sent: list[int] = []
+    for index in range(100):
+        batcher.add("Survival", f"⚠️ error {index}", "❌ Server Error",
+                    partial(sent.append, index))
+
+    assert batcher.pending() == 100
+    assert len(batcher._pending["Survival"].events) == MAX_SECTIONS
+    batcher.flush(force=True)
+
+    [(_, payload)] = webhook.received()
+    assert payload["text"] == \
+        "Minecraft Survival Alert: ❌ Server Error (100 events)"
+    assert payload["blocks"][-1]["elements"][0]["text"] == \
+        f"…and {100 - MAX_SECTIONS} more events"
+    assert sent == list(range(MAX_SECTIONS))
+    assert batcher.pending() == 0
+
+
+def test_slack_outage_opens_the_breaker(webhook: FakeSlack):
+    """
+    Test that once a batch fails, events are posted directly so their
+    failures open the breaker, and that batching resumes on recovery.
+    """
+    webhook.down = True
+    batcher = SlackBatcher(window=0.05, webhook=webhook.url,
+                           session=create_session())
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.3)
+    notifiers = Notifiers()
+    notifiers.add(SlackSink(batcher), breaker=breaker)
+
+    notifiers.notify("Survival", "batched", "❌ Server Error")
+    deadline = time.monotonic() + 2
+    while batcher.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert batcher.error is not None
+
+    for index in range(5):
+        notifiers.notify("Survival", f"direct {index}", "❌ Server Error")
+    notifiers.drain(2)
+    assert breaker.state == "open"
+    assert webhook.requests == 3
+
+    webhook.down = False
+    time.sleep(0.3)
+    notifiers.notify("Survival", "trial", "❌ Server Error")
+    notifiers.drain(2)
+    assert breaker.state == "closed"
+    assert batcher.error is None
+    assert [payload["blocks"][2]["text"]["text"]
+            for _, payload in webhook.received()] == ["trial"]
@@ -0,0 +1,107 @@
+"""
+Unit tests for the asyncio listener's notification queue.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.listener import async_listener
+from src.listener.async_listener import (Notification, NotificationQueue,
+                                         deliver)
+from src.utility.notifiers import Event, Notifiers, Sink
+
+
+def test_queue_drops_oldest_when_full():
+    """Test that the oldest notification is discarded on overflow."""
+    queue = NotificationQueue(maxsize=2)
+    for message in ("one", "two", "three"):
+        queue.offer(Notification("Survival", message, "❌ Server Error"))
+
+    assert [item.message for item in queue._items] == ["two", "three"]
+    assert queue.metrics.dropped == 1
+    assert queue.metrics.high_water == 2
+
+
+def test_queue_coalesces_matching_notification_when_full():
+    """Test that overflow merges into a queued notification when possible."""
+    queue = NotificationQueue(maxsize=2, policy="coalesce")
+    queue.offer(Notification("Survival", "one", "❌ Server Error"))
+    queue.offer(Notification("Creative", "two", "🟢 Player Joined"))
+    queue.offer(Notification("Survival", "three", "❌ Server Error"))
+
+    first = queue._items[0]
+    assert len(queue) == 2
+    assert first.message == "one\nthree"
+    assert first.count == 2
+    assert queue.metrics.coalesced == 1
+    assert queue.metrics.dropped == 0
+
+
+def test_queue_rejects_unknown_policy():
+    """Test that an unknown overflow policy is refused."""
+    with pytest.raises(ValueError):
+        NotificationQueue(maxsize=1, policy="block")
+
+
+def test_slow_delivery_does_not_block_offers():
+    """Test that producers keep enqueuing while a worker is sending."""
+    sent: list[str] = []
+
+    def send(name: str, message: str, summary: str) -> None:
+        time.sleep(0.2)
+        sent.append(message)
+
+    async def scenario() -> float:
+        queue = NotificationQueue(maxsize=10)
+        worker = asyncio.create_task(deliver(queue, send))
+        queue.offer(Notification("Survival", "one", "summary"))
+        await asyncio.sleep(0.05)
+        start = time.monotonic()
+        queue.offer(Notification("Survival", "two", "summary"))
+        offered = time.monotonic() - start
+        while len(sent) < 2:
+            await asyncio.sleep(0.01)
+        worker.cancel()
+        assert queue.metrics.delivered == 2
+        return offered
+
+    assert asyncio.run(scenario()) < 0.05
+    assert sent == ["one", "two"]
+
+
+def test_full_sinks_leave_overflow_to_the_queue(mocker: MockerFixture):
+    """
+    Test that a notification waits for room in the sinks, so the queue's
+    overflow policy applies instead of the sink dropping events.
+    """
+    release = threading.Event()
+    sent: list[str] = []
+
+    class BlockedSink(Sink):
+        def send(self, event: Event) -> None:
+            release.wait(2)
+            sent.append(event.message)
+
+    notifiers = Notifiers()
+    notifiers.add(BlockedSink(), queue_size=1)
+    mocker.patch.object(async_listener, "get_notifiers",
+                        return_value=notifiers)
+
+    async def scenario() -> NotificationQueue:
+        queue = NotificationQueue(maxsize=2, policy="coalesce")
+        worker = asyncio.create_task(deliver(queue))
+        for message in ("one", "two", "three", "four", "five", "six"):
+            queue.offer(Notification("Survival", message, "summary"))
+            await asyncio.sleep(0.05)
+        release.set()
+        while len(sent) < 5:
+            await asyncio.sleep(0.01)
+        worker.cancel()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert sent == ["one", "two", "three", "four", "five\nsix"]
+    assert queue.metrics.coalesced == 1
@@ -0,0 +1,68 @@
+"""
+Unit tests for error signature clustering.
+"""
+from pathlib import Path
+from unittest.mock import Mock
+
+from src.listener.error_clusters import ErrorClusters, load_skip_errors
+from src.listener.signatures import record_signature
+from src.utility.log_parser import parse_line
+
+ERROR = ("[10:00:{:02d}] [Server thread/ERROR]: Entity {} at x={}.5, "
+         "y=64.0, z=-3.5 failed to tick")
+
+
+def signature(line: str) -> str:
+    return record_signature(parse_line(line))
+
+
+def test_storm_sends_first_error_then_rollup():
+    """Test that errors differing in ids and positions fold together."""
+    send = Mock()
+    clusters = ErrorClusters(send, rollup_seconds=0)
+
+    admitted = [clusters.admit("Survival",
+                               signature(ERROR.format(second, second, -12)))
+                for second in range(5)]
+    admitted.append(clusters.admit("Creative",
+                                   signature(ERROR.format(0, 1, 2))))
+
+    assert admitted == [True, False, False, False, False, True]
+    clusters.flush()
+    send.assert_called_once()
+    server, message, summary = send.call_args.args
+    assert server == "Survival"
+    assert message.startswith("🔁 4 more occurrences since ")
+    assert "(5 in total) of `[Server thread/ERROR]: Entity <n> at <pos> " \
+        "failed to tick`" in message
+    assert summary == "🔁 Repeated Server Error"
+
+    clusters.flush()
+    send.assert_called_once()
+
+
+def test_evicted_signature_sends_pending_rollup():
+    """Test that the LRU stays bounded and reports what it evicts."""
+    send = Mock()
+    clusters = ErrorClusters(send, max_signatures=1, rollup_seconds=0)
+    first = signature("[10:00:00] [Server thread/ERROR]: Disk full")
+
+    clusters.admit("Survival", first)
+    clusters.admit("Survival", first)
+    clusters.admit("Survival",
+                   signature("[10:00:01] [Server thread/ERROR]: No route"))
+
+    assert clusters.count() == 1
+    assert send.call_args.args[1].startswith("🔁 1 more occurrences")
+    assert clusters.admit("Survival", first)
+
+
+def test_skip_errors_are_normalised(tmp_path: Path):
+    """Test that example lines in the skip file become signatures."""
+    path = tmp_path / "skip-errors.txt"
+    path.write_text("# comment\n\nChunk 12 at 0x1f failed\n")
+
+    assert load_skip_errors(str(path)) == ["Chunk <n> at <hex> failed"]
+    assert load_skip_errors(None) == [
+        "dev.kpherox.vihp.client.jade.VillagerInventoryPlugin"
+    ]
@@ -0,0 +1,85 @@
+"""
+Unit tests for the event router.
+"""
+from unittest.mock import Mock
+
+from pytest_mock import MockerFixture
+
+from src.listener import error_clusters, event_router
+from src.listener.error_clusters import ErrorClusters
+from src.listener.line_framer import LineFramer
+from src.utility.log_parser import parse_line
+from src.utility.notifiers import Severity
+
+
+def test_match_trigger_prefers_registration_order_over_position():
+    """
+    Test that the first registered trigger wins even when another trigger
+    appears earlier in the line.
+    """
+    line = "[10:08:36] [Server thread/ERROR]: Steve lost connection: Timeout"
+
+    assert event_router.match_trigger(line) == "lost connection"
+    assert event_router.match_trigger("FATAL ERROR") == "ERROR"
+    assert event_router.match_trigger(
+        "[10:08:36] [Server thread/INFO]: Saved"
+    ) is None
+
+
+def test_route_event_sends_login_message(mocker: MockerFixture):
+    """Test that a login line is parsed and sent to Slack."""
+    notify = mocker.patch.object(event_router, "notify")
+    line = ("[10:08:36] [Server thread/INFO]: Alex[/192.168.1.20:53211] "
+            "logged in with entity id 412 at (12.5, 64.0, -33.2)")
+
+    event_router.route_event("Survival", parse_line(line))
+
+    notify.assert_called_once_with(
+        "Survival",
+        "✅ _Java_ player *Alex* joined at `12.5, 64.0, -33.2` from "
+        "*192.168.1.20:53211*.",
+        "🟢 Player Joined",
+        Severity.INFO,
+        None,
+    )
+
+
+def test_route_event_skips_ignored_errors(mocker: MockerFixture):
+    """Test that errors in the skip list are never sent."""
+    notify = mocker.patch.object(event_router, "notify")
+    line = ("[10:08:36] [Render thread/ERROR]: "
+            f"{error_clusters.SKIP_ERRORS[0]} failed")
+
+    event_router.route_event("Survival", parse_line(line))
+
+    notify.assert_not_called()
+
+
+def test_stack_traces_fold_into_their_error(mocker: MockerFixture):
+    """
+    Test that the trace lines after an error reach its cluster through the
+    prefilter and are neither sent nor counted as occurrences.
+    """
+    notify = mocker.patch.object(event_router, "notify")
+    rollup = Mock()
+    mocker.patch.object(event_router, "ERROR_CLUSTERS",
+                        ErrorClusters(rollup, rollup_seconds=0))
+    framer = LineFramer(event_router.TRIGGERS)
+    framer.feed(b"[10:00:00] [Server thread/ERROR]: Ticking entity 4\n"
+                b"java.lang.IllegalStateException: ERROR in tick\n"
+                b"\tat Entity.tick(Entity.java:12)\n"
+                b"[10:00:01] [Server thread/INFO]: Saving chunks\n"
+                b"[10:00:02] [Server thread/ERROR]: Ticking entity 5\n"
+                b"\tat Entity.tick(Entity.java:12)\n")
+
+    lines = list(framer.lines())
+    assert lines.count("\tat Entity.tick(Entity.java:12)") == 2
+    for line in lines:
+        event_router.route_event("Survival", parse_line(line))
+
+    notify.assert_called_once()
+    assert notify.call_args.args[1] == ("⚠️ [10:00:00] [Server thread/ERROR]: "
+                                        "Ticking entity 4")
+    event_router.ERROR_CLUSTERS.flush()
+    assert rollup.call_args.args[1].startswith("🔁 1 more occurrences")
+    assert "(2 in total)" in rollup.call_args.args[1]
@@ -0,0 +1,81 @@
+"""
+Unit tests for log-driven server health alerts.
+"""
+from unittest.mock import Mock
+
+from src.listener.health import HealthMonitor
+from src.utility.notifiers import Severity
+
+LAG = ("[10:00:00] [Server thread/WARN]: Can't keep up! Is the server "
+       "overloaded? Running 2041ms or 40 ticks behind")
+DONE = ("[10:00:00] [Server thread/INFO]: Done ({}s)! For help, type "
+        "\"help\" or \"geyser help for help\"")
+CRASH = "[10:00:00] [Server thread/FATAL]: Preparing crash report with UUID"
+
+
+def test_sustained_lag_alerts_once_per_alert_window():
+    """Test that lag over the ratio alerts, then waits before repeating."""
+    send = Mock()
+    monitor = HealthMonitor(send, lag_window=300, lag_ratio=0.2,
+                            alert_seconds=900)
+
+    for at in range(0, 300, 10):
+        assert monitor.handle("Survival", LAG, at=at)
+
+    send.assert_called_once()
+    server, message, summary, severity = send.call_args.args
+    assert server == "Survival"
+    assert message.startswith("🐢 *Survival* is 20% behind over the last "
+                              "5 minutes")
+    assert summary == "🐢 Server Lagging"
+    assert severity is Severity.WARNING
+
+    for at in range(300, 1300, 10):
+        monitor.handle("Survival", LAG, at=at)
+    assert send.call_count == 2
+
+
+def test_old_lag_leaves_the_window():
+    """Test that lag older than the window no longer counts."""
+    monitor = HealthMonitor(Mock(), lag_window=60)
+
+    for at in range(0, 60, 10):
+        monitor.handle("Survival", LAG, at=at)
+
+    assert round(monitor.lag_ratio("Survival", now=50), 3) == 0.204
+    assert round(monitor.lag_ratio("Survival", now=105), 3) == 0.034
+    assert monitor.lag_ratio("Creative", now=105) == 0.0
+
+
+def test_slow_startup_mentions_the_usual_time():
+    """Test that a slow start alerts with the median of earlier starts."""
+    send = Mock()
+    monitor = HealthMonitor(send, slow_start=180)
+
+    for at, seconds in enumerate(("30.1", "42.0", "35.5")):
+        assert not monitor.handle("Survival", DONE.format(seconds), at=at)
+    send.assert_not_called()
+
+    monitor.handle("Survival", DONE.format("200.5"), at=10)
+
+    send.assert_called_once()
+    assert send.call_args.args[1] == ("🐌 *Survival* took 200s to start "
+                                      "(usually 36s)")
+
+
+def test_repeated_crashes_are_critical():
+    """Test that crashes within the window raise a critical alert."""
+    send = Mock()
+    monitor = HealthMonitor(send, crash_window=3600, crashes=2)
+
+    assert not monitor.handle("Survival", CRASH, at=0)
+    send.assert_not_called()
+    assert not monitor.handle("Survival", CRASH, at=4000)
+    send.assert_not_called()
+    assert not monitor.handle("Survival", CRASH, at=4100)
+
+    server, message, summary, severity = send.call_args.args
+    assert message == "💥 *Survival* crashed 2 times in the last 60 minutes"
+    assert summary == "💥 Repeated Crashes"
+    assert severity is Severity.CRITICAL
+    assert not monitor.handle("Survival", "[10:00:00] [INFO]: Saving")
@@ -0,0 +1,74 @@
+"""
+Unit tests for the LineFramer.
+"""
+from src.listener.line_framer import LineFramer
+
+
+def test_framer_joins_lines_split_across_reads():
+    """Test that partial lines wait for their newline, even past the size."""
+    framer = LineFramer(size=4)
+
+    framer.feed(b"one\r\ntwo and")
+    assert list(framer.lines()) == ["one"]
+    assert framer.partial == b"two and"
+
+    framer.feed(b" more\nthree")
+    assert list(framer.lines()) == ["two and more"]
+    assert framer.partial == b"three"
+
+
+def test_framer_only_decodes_lines_with_triggers():
+    """Test that the prefilter yields matching lines in log order."""
+    framer = LineFramer(["lost connection", "ERROR"])
+
+    framer.feed(b"[1] routine\nAlex lost connection: ERROR\n[2] saving\n"
+                b"[Server thread/ERROR]: oops\nSteve lost connection\npar")
+
+    assert list(framer.lines()) == [
+        "Alex lost connection: ERROR",
+        "[Server thread/ERROR]: oops",
+        "Steve lost connection",
+    ]
+    assert framer.partial == b"par"
+
+
+def test_framer_keeps_stack_traces_after_matching_lines():
+    """
+    Test that lines without a prefix after a matching line pass the
+    prefilter, even when they arrive in a later read.
+    """
+    framer = LineFramer(["ERROR"])
+
+    framer.feed(b"[1] [Server thread/ERROR]: Ticking entity\n"
+                b"java.lang.NullPointerException: world\n")
+    assert list(framer.lines()) == [
+        "[1] [Server thread/ERROR]: Ticking entity",
+        "java.lang.NullPointerException: world",
+    ]
+
+    framer.feed(b"\tat Entity.tick(Entity.java:12)\n[2] [INFO]: Saved\n"
+                b"\tat World.save(World.java:3)\n")
+    assert list(framer.lines()) == ["\tat Entity.tick(Entity.java:12)"]
+
+
+def test_framer_drops_lines_over_the_cap():
+    """Test that a line without a newline stops growing the buffer."""
+    framer = LineFramer(size=4, max_line=8)
+
+    framer.feed(b"ok\n" + b"x" * 50)
+    framer.feed(b"yz\nnext\npar")
+
+    assert list(framer.lines()) == ["ok", "next"]
+    assert framer.dropped == 1
+    assert framer.partial == b"par"
+    assert len(framer._buffer) <= 16
+
+
+def test_framer_keeps_complete_lines_fed_at_once():
+    """Test that the cap only applies to a partial line."""
+    framer = LineFramer(size=4, max_line=8)
+
+    framer.feed(b"line\n" * 5)
+
+    assert list(framer.lines()) == ["line"] * 5
+    assert framer.dropped == 0
@@ -0,0 +1,55 @@
+"""
+Unit tests for the tail watcher's follower pool.
+"""
+import subprocess  # nosec[B404]
+from unittest.mock import Mock
+
+from pytest_mock import MockerFixture
+
+from src.listener.tail_watcher import FollowerPool, stop_tail
+
+
+def test_pool_starts_new_servers_and_stops_removed_ones(
+        mocker: MockerFixture):
+    """Test that sync follows exactly the servers it is given."""
+    stops = {"one": Mock(), "two": Mock()}
+    pool = FollowerPool("tail", create_handler=lambda name: Mock())
+    follow = mocker.patch.object(
+        pool, "_follow",
+        side_effect=lambda path, handle: stops[path.split("/")[2]]
+    )
+    one = {"name": "Survival", "log_file": "/servers/one/logs/latest.log"}
+    two = {"name": "Creative", "log_file": "/servers/two/logs/latest.log"}
+
+    pool.sync({"one": one})
+    pool.sync({"one": one, "two": two})
+    pool.sync({"two": two})
+
+    assert follow.call_count == 2
+    stops["one"].assert_called_once_with()
+    stops["two"].assert_not_called()
+    assert pool.followed == {"two": two}
+
+
+def test_pool_retries_servers_that_cannot_be_followed_yet(
+        mocker: MockerFixture):
+    """Test that a log directory that does not exist yet is retried."""
+    pool = FollowerPool("inotify", create_handler=lambda name: Mock())
+    mocker.patch.object(pool, "_follow",
+                        side_effect=[FileNotFoundError("logs"), Mock()])
+    server = {"name": "Survival", "log_file": "/servers/one/logs/latest.log"}
+
+    pool.sync({"one": server})
+    assert pool.followed == {}
+
+    pool.sync({"one": server})
+    assert pool.followed == {"one": server}
+
+
+def test_stopped_tail_is_reaped():
+    """Test that stopping a tail process also waits for it to exit."""
+    proc = subprocess.Popen(["sleep", "30"])  # nosec[B603, B607]
+
+    stop_tail(proc)
+
+    assert proc.returncode is not None
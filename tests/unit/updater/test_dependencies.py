@@ -0,0 +1,140 @@
+"""
+Unit tests for dependency resolution across a mods directory.
+"""
+from typing import Any
+
+from src.updater.dependencies import DependencySolver, Version
+from src.updater.errors import NoCompatibleVersion
+
+
+def version(project: str, number: str = "1",
+            *dependencies: tuple[str, str, str]) -> Version:
+    """Build a version; dependencies are (project, version, type)."""
+    return {
+        "id": f"{project}-{number}",
+        "project_id": project,
+        "files": [{"filename": f"{project}-{number}.jar"}],
+        "dependencies": [
+            {"project_id": dependency, "version_id": pinned or None,
+             "dependency_type": kind}
+            for dependency, pinned, kind in dependencies
+        ],
+    }
+
+
+def required(project: str, pinned: str = "") -> tuple[str, str, str]:
+    return project, pinned, "required"
+
+
+class Lookups:
+    """Serves the latest versions of projects and counts the lookups."""
+
+    def __init__(self, *versions: Version):
+        self.versions = {item["project_id"]: item for item in versions}
+        self.calls: list[str] = []
+
+    def latest(self, project_id: str) -> Version:
+        self.calls.append(project_id)
+        if project_id not in self.versions:
+            raise NoCompatibleVersion(project_id)
+        return self.versions[project_id]
+
+    def version(self, version_id: str) -> Version:
+        self.calls.append(version_id)
+        project_id, number = version_id.rsplit("-", 1)
+        return version(project_id, number)
+
+
+def solve(lookups: Lookups, selected: dict[str, Version],
+          updating: set[str]) -> Any:
+    return DependencySolver(lookups.latest, lookups.version).solve(
+        selected, updating
+    )
+
+
+def test_shared_library_is_added_once_with_its_dependencies():
+    """
+    Test that a library required by many jars is looked up and added once,
+    and that its own missing dependency is added too.
+    """
+    lookups = Lookups(version("cloth", "5", required("api")),
+                      version("api", "9"))
+    selected = {f"mod{n}.jar": version(f"mod{n}", "2", required("cloth"))
+                for n in range(3)}
+
+    resolution = solve(lookups, selected, set(selected))
+
+    assert sorted(resolution.additions) == ["api", "cloth"]
+    assert resolution.additions["api"][1] == "cloth-5.jar"
+    assert lookups.calls == ["cloth", "api"]
+    assert resolution.held == {}
+
+
+def test_update_pinning_another_version_is_held_back():
+    """Test that an update pinned to a different installed library waits."""
+    selected = {
+        "api.jar": version("api", "9"),
+        "new.jar": version("new", "2", required("api", "api-10")),
+        "old.jar": version("old", "1", required("api", "api-9")),
+    }
+
+    resolution = solve(Lookups(), selected, {"new.jar"})
+
+    assert resolution.held == {
+        "new.jar": "needs version api-10 of api-9.jar"
+    }
+    assert resolution.warnings == []
+
+
+def test_library_update_breaking_a_pin_is_held_back():
+    """
+    Test that a library update is held when a jar that is not changing
+    pins the current library version.
+    """
+    selected = {
+        "api.jar": version("api", "10"),
+        "old.jar": version("old", "1", required("api", "api-9")),
+    }
+
+    resolution = solve(Lookups(), selected, {"api.jar"})
+
+    assert resolution.held == {
+        "api.jar": "old-1.jar needs version api-9 of api-10.jar"
+    }
+
+
+def test_unresolvable_and_incompatible_updates_are_held_back():
+    """
+    Test that updates needing a missing project or conflicting with the set
+    are held, and that a library added only for a held update is dropped.
+    """
+    lookups = Lookups(version("lib", "1"))
+    selected = {
+        "a.jar": version("a", "2", required("lib"), required("gone")),
+        "b.jar": version("b", "2", ("c", "", "incompatible")),
+        "c.jar": version("c", "1"),
+    }
+
+    resolution = solve(lookups, selected, {"a.jar", "b.jar"})
+
+    assert sorted(resolution.held) == ["a.jar", "b.jar"]
+    assert resolution.held["b.jar"] == "incompatible with c-1.jar"
+    assert resolution.additions == {}
+
+
+def test_large_pack_looks_up_each_library_once():
+    """Test that a 300 mod pack resolves shared libraries once each."""
+    libraries = [version(f"lib{n}", "1", required("api")) for n in range(20)]
+    lookups = Lookups(version("api", "1"), *libraries)
+    selected = {
+        f"mod{n}.jar": version(f"mod{n}", "2", required(f"lib{n % 20}"),
+                               required(f"lib{(n * 7) % 20}"))
+        for n in range(300)
+    }
+
+    resolution = solve(lookups, selected, set(selected))
+
+    assert len(resolution.additions) == 21
+    assert sorted(lookups.calls) == sorted(
+        ["api"] + [f"lib{n}" for n in range(20)]
+    )
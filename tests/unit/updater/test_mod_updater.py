@@ -0,0 +1,130 @@
+"""
+Unit tests for the mod updater.
+"""
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from src.updater import mod_updater
+
+
+def test_update_mods_logs_in_filename_order_when_concurrent(
+        tmp_path: Path, mocker: MockerFixture,
+        caplog: pytest.LogCaptureFixture):
+    """
+    Test that concurrently planned updates replay their logs in filename
+    order even when later files finish first.
+    """
+    for name in ("a.jar", "b.jar", "c.jar"):
+        (tmp_path / name).touch()
+    delays = {"a.jar": 0.15, "b.jar": 0.05, "c.jar": 0.0}
+
+    def plan(file: Path,
+             *args: object) -> tuple[dict[str, object], dict[str, str]]:
+        time.sleep(delays[file.name])
+        logging.info(f"checked {file.name}")
+        if file.name == "b.jar":
+            raise mod_updater.NoCompatibleVersion("b")
+        version: dict[str, object] = {"id": file.name,
+                                      "project_id": file.name,
+                                      "files": [{"filename": file.name}]}
+        return version, {"current": file.name}
+
+    mocker.patch.object(mod_updater, "plan_mod", side_effect=plan)
+    mocker.patch.object(mod_updater, "apply_plan",
+                        side_effect=lambda plan, jobs: len(plan["updates"]))
+    mocker.patch.object(mod_updater, "lookup_installed_versions",
+                        return_value={})
+    logging.getLogger().addFilter(mod_updater.LOG_CAPTURE)
+    caplog.set_level(logging.INFO)
+
+    try:
+        updates = mod_updater.update_mods(tmp_path, "1.21.8", "fabric", 3)
+    finally:
+        logging.getLogger().removeFilter(mod_updater.LOG_CAPTURE)
+
+    assert updates == 2
+    assert caplog.messages == [
+        "checked a.jar", "checked b.jar", "❌ Error: b", "checked c.jar"
+    ]
+
+
+def test_update_all_servers_sends_one_consolidated_report(
+        tmp_path: Path, mocker: MockerFixture):
+    """
+    Test that servers sharing a game version get one bulk lookup and that
+    only servers with updates appear in a single Slack message.
+    """
+    def settings(name: str) -> dict[str, object]:
+        mods_dir = tmp_path / name / "mods"
+        mods_dir.mkdir(parents=True)
+        return {"mods_dir": mods_dir, "game_version": "1.21.8",
+                "loader": "fabric", "log_path": tmp_path / name / "logs"}
+
+    mocker.patch.object(mod_updater, "find_server_settings", return_value=[
+        ("uuid-a", "Alpha", settings("a")),
+        ("uuid-b", "Beta", settings("b")),
+    ])
+    mocker.patch.object(mod_updater, "setup_console_logging")
+    mocker.patch.object(mod_updater, "open_cache")
+    mocker.patch.object(mod_updater, "open_store")
+    lookup = mocker.patch.object(mod_updater, "lookup_installed_versions",
+                                 return_value={})
+    mocker.patch.object(mod_updater, "update_mods", side_effect=[3, 0])
+    send = mocker.patch.object(mod_updater, "send_to_slack")
+    args = mocker.Mock(log_level=None, cache_path=tmp_path / "cache",
+                       cache_ttl=None, store_path=tmp_path / "store", jobs=1)
+
+    mod_updater.update_all_servers(args)
+
+    lookup.assert_called_once_with([], "1.21.8", "fabric")
+    send.assert_called_once_with(
+        "Mod Updates",
+        "Need to restart:\n• *Alpha* at _uuid-a_: 3 mod updates",
+        "Updated 3 mods on 1 servers",
+    )
+
+
+def test_update_all_servers_reports_despite_a_failing_server(
+        tmp_path: Path, mocker: MockerFixture):
+    """
+    Test that an unexpected error on one server is logged, the next server
+    is still updated, and the restart report covers the others.
+    """
+    def settings(name: str) -> dict[str, object]:
+        mods_dir = tmp_path / name / "mods"
+        mods_dir.mkdir(parents=True)
+        return {"mods_dir": mods_dir, "game_version": "1.21.8",
+                "loader": "fabric", "log_path": tmp_path / name / "logs"}
+
+    mocker.patch.object(mod_updater, "find_server_settings", return_value=[
+        ("uuid-a", "Alpha", settings("a")),
+        ("uuid-b", "Beta", settings("b")),
+        ("uuid-c", "Gamma", settings("c")),
+    ])
+    mocker.patch.object(mod_updater, "setup_console_logging")
+    mocker.patch.object(mod_updater, "open_cache")
+    mocker.patch.object(mod_updater, "open_store")
+    mocker.patch.object(mod_updater, "lookup_installed_versions",
+                        return_value={})
+    update = mocker.patch.object(
+        mod_updater, "update_mods",
+        side_effect=[2, sqlite3.OperationalError("disk I/O error"), 1]
+    )
+    send = mocker.patch.object(mod_updater, "send_to_slack")
+    args = mocker.Mock(log_level=None, cache_path=tmp_path / "cache",
+                       cache_ttl=None, store_path=tmp_path / "store", jobs=1)
+
+    mod_updater.update_all_servers(args)
+
+    assert update.call_count == 3
+    send.assert_called_once_with(
+        "Mod Updates",
+        "Need to restart:\n• *Alpha* at _uuid-a_: 2 mod updates\n"
+        "• *Gamma* at _uuid-c_: 1 mod updates",
+        "Updated 3 mods on 2 servers",
+    )
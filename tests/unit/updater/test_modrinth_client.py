@@ -0,0 +1,121 @@
+"""
+Unit tests for the Modrinth client's rate limiting, retries and concurrency.
+"""
+from typing import Optional
+
+import pytest
+import requests
+from pytest_mock import MockerFixture
+
+from src.updater import modrinth_client
+from src.updater.errors import ApiFailed
+from src.updater.modrinth_client import (AdaptiveConcurrency,
+                                         ModrinthClient, RateLimiter)
+
+
+def make_response(status: int,
+                  headers: Optional[dict[str, str]] = None
+                  ) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+
+def test_rate_limiter_spaces_requests_after_burst(mocker: MockerFixture):
+    """Test that the bucket only sleeps once the burst is used up."""
+    sleep = mocker.patch.object(modrinth_client.time, "sleep")
+    mocker.patch.object(modrinth_client.time, "monotonic", return_value=10.0)
+    limiter = RateLimiter(per_minute=60, burst=2)
+
+    limiter.acquire()
+    limiter.acquire()
+    sleep.assert_not_called()
+
+    mocker.patch.object(modrinth_client.time, "monotonic",
+                        side_effect=[10.0, 11.0])
+    limiter.acquire()
+    sleep.assert_called_once_with(pytest.approx(1.0))
+
+
+def test_rate_limiter_waits_for_reset_when_none_remain(
+        mocker: MockerFixture):
+    """Test that headers reporting no remaining requests pause the bucket."""
+    sleep = mocker.patch.object(modrinth_client.time, "sleep")
+    mocker.patch.object(modrinth_client.time, "monotonic", return_value=10.0)
+    limiter = RateLimiter(per_minute=300, burst=10)
+
+    limiter.update(remaining=0, reset=7)
+    mocker.patch.object(modrinth_client.time, "monotonic",
+                        side_effect=[10.0, 17.0])
+    limiter.acquire()
+
+    sleep.assert_called_once_with(pytest.approx(7.0))
+    assert limiter.waited == pytest.approx(7.0)
+
+
+def test_client_retries_throttled_and_failed_requests(
+        mocker: MockerFixture):
+    """
+    Test that a 429 and a 503 are retried, that the 429 pauses the limiter
+    for the reset Modrinth gives, and that the final response is returned.
+    """
+    client = ModrinthClient(60_000, burst=100)
+    send = mocker.patch.object(client.session, "request", side_effect=[
+        make_response(429, {"X-Ratelimit-Remaining": "0",
+                            "X-Ratelimit-Reset": "2"}),
+        make_response(503),
+        make_response(200, {"X-Ratelimit-Remaining": "250"}),
+    ])
+    pause = mocker.patch.object(client.limiter, "pause")
+    sleep = mocker.patch.object(modrinth_client.time, "sleep")
+    mocker.patch.object(client.limiter, "acquire")
+    mocker.patch.object(modrinth_client.random, "uniform",
+                        side_effect=lambda low, high: high)
+
+    response = client.get("http://modrinth.test/v2/x", "versions")
+
+    assert response.status_code == 200
+    assert send.call_count == 3
+    pause.assert_called_once_with(pytest.approx(3.0))
+    sleep.assert_called_once_with(pytest.approx(1.0))
+    assert (client.requests, client.retried) == (3, 2)
+
+
+def test_client_gives_up_after_retries(mocker: MockerFixture):
+    """Test that connection errors become ApiFailed once retries run out."""
+    client = ModrinthClient(60_000, burst=100, retries=2)
+    send = mocker.patch.object(client.session, "request",
+                               side_effect=requests.ConnectionError("down"))
+    mocker.patch.object(modrinth_client.time, "sleep")
+
+    with pytest.raises(ApiFailed, match="down"):
+        client.post("http://modrinth.test/v2/x", "bulk", json={})
+    assert send.call_count == 3
+
+
+def test_concurrency_grows_additively_and_halves_on_throttling(
+        mocker: MockerFixture):
+    """
+    Test that fast requests raise the limit by about one per round trip and
+    that a burst of 429s halves it once.
+    """
+    clock = mocker.patch.object(modrinth_client.time, "monotonic",
+                                return_value=100.0)
+    concurrency = AdaptiveConcurrency(initial=4, maximum=32)
+    for _ in range(4):
+        concurrency.acquire()
+        concurrency.release(0.05)
+    assert concurrency.limit == pytest.approx(5.0, abs=0.2)
+
+    limit = concurrency.limit
+    for _ in range(3):
+        concurrency.acquire()
+        concurrency.release(0.05, throttled=True)
+    assert concurrency.limit == pytest.approx(limit / 2)
+
+    clock.return_value = 103.0
+    concurrency.acquire()
+    concurrency.release(2.0)
+    assert concurrency.limit == pytest.approx(limit / 4)
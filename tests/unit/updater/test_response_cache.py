@@ -0,0 +1,115 @@
+"""
+Unit tests for the Modrinth response cache.
+"""
+import itertools
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from src.updater.response_cache import ResponseCache
+
+
+def test_cache_serves_fresh_entries_and_keeps_etag_when_stale(
+        tmp_path: Path, mocker: MockerFixture):
+    """Test that entries are fresh within the TTL and stale after it."""
+    clock = mocker.patch("src.updater.response_cache.time.time")
+    clock.return_value = 1000.0
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60)
+    key = cache.make_key("sodium", "1.21.8", "fabric", "release")
+
+    assert cache.get(key) is None
+    cache.store(key, [{"id": "a"}], '"etag-1"')
+
+    clock.return_value = 1030.0
+    assert cache.get(key) == {"body": [{"id": "a"}], "etag": '"etag-1"',
+                              "fresh": True}
+
+    clock.return_value = 1100.0
+    stale = cache.get(key)
+    assert stale is not None and not stale["fresh"]
+
+    cache.refresh(key)
+    refreshed = cache.get(key)
+    assert refreshed is not None and refreshed["fresh"]
+    assert (cache.hits, cache.misses, cache.revalidated) == (2, 2, 1)
+
+
+def test_cache_evicts_least_recently_used_over_size_limit(
+        tmp_path: Path, mocker: MockerFixture):
+    """Test that the oldest accessed entries go once bodies are too big."""
+    clock = mocker.patch("src.updater.response_cache.time.time")
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=40)
+
+    clock.return_value = 1.0
+    cache.store("first", "x" * 15, None)
+    clock.return_value = 2.0
+    cache.store("second", "y" * 15, None)
+    clock.return_value = 3.0
+    cache.get("first")
+    clock.return_value = 4.0
+    cache.store("third", "z" * 15, None)
+
+    assert cache.get("second") is None
+    assert cache.get("first") is not None
+    assert cache.get("third") is not None
+
+
+def test_reads_write_access_times_once_on_close(tmp_path: Path):
+    """Test that lookups do not write until the cache is flushed."""
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path)
+    cache.store("key", {"id": "a"}, None)
+    changes = cache._connection.total_changes
+
+    for _ in range(100):
+        cache.get("key")
+    assert cache._connection.total_changes == changes
+
+    cache.close()
+    reopened = ResponseCache(path)
+    [(accessed, fetched)] = reopened._connection.execute(
+        "SELECT accessed, fetched FROM responses"
+    ).fetchall()
+    assert accessed > fetched
+    reopened.close()
+
+
+def test_cache_only_evicts_over_the_size_limit(tmp_path: Path,
+                                               mocker: MockerFixture):
+    """Test that stores under the limit skip the eviction scan."""
+    clock = mocker.patch("src.updater.response_cache.time.time")
+    clock.side_effect = itertools.count(1.0)
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=40)
+    evict = mocker.spy(cache, "_evict")
+
+    cache.store("first", "x" * 15, None)
+    cache.store("first", "y" * 15, None)
+    cache.store("second", "z" * 15, None)
+    evict.assert_not_called()
+
+    cache.store("third", "w" * 15, None)
+    evict.assert_called_once()
+    assert cache.get("first") is None
+    cache.close()
+
+    reopened = ResponseCache(tmp_path / "cache.sqlite", max_bytes=40)
+    reopened.store("fourth", "v" * 15, None)
+    assert reopened.get("second") is None
+    reopened.close()
+
+
+def test_stale_entries_used_anyway_count_as_stale_hits(
+        tmp_path: Path, mocker: MockerFixture):
+    """Test that a stale entry the caller accepts is not a miss."""
+    clock = mocker.patch("src.updater.response_cache.time.time")
+    clock.return_value = 1000.0
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=60)
+    cache.store("version", {"id": "a"}, None)
+
+    clock.return_value = 2000.0
+    cached = cache.get("version", stale_ok=True)
+
+    assert cached is not None and not cached["fresh"]
+    assert (cache.hits, cache.stale_hits, cache.misses) == (0, 1, 0)
+    assert cache.describe() == "0 hits, 1 stale hits, 0 misses " \
+        "(0 revalidated)"
@@ -27,4 +27,60 @@ def test_deduplicator_only_one_notification_for_same_content_different_timestamp
 
     # Only the first message should be unique (all have same core content)
     assert len(unique_messages) == 1
-    assert unique_messages[0] == log_entries[0]
\ No newline at end of file
+    assert unique_messages[0] == log_entries[0]
+
+
+def test_deduplicator_allows_message_again_after_window(mocker):
+    """Test that a message is unique again once its window has passed."""
+    clock = mocker.patch("src.utility.deduplicator.time.time")
+    deduplicator = MessageDeduplicator(window_seconds=30)
+
+    clock.return_value = 100.0
+    assert deduplicator.is_unique("[10:08:36] [Server thread/ERROR]: boom")
+    clock.return_value = 120.0
+    assert not deduplicator.is_unique("[10:08:56] [Server thread/ERROR]: boom")
+    clock.return_value = 131.0
+    assert deduplicator.is_unique("[10:09:07] [Server thread/ERROR]: boom")
+
+
+def test_deduplicator_expires_entries_behind_recent_duplicates(mocker):
+    """
+    Test that a message refreshed by a duplicate still expires on time and
+    does not keep later expired messages alive.
+    """
+    clock = mocker.patch("src.utility.deduplicator.time.time")
+    deduplicator = MessageDeduplicator(window_seconds=30)
+
+    clock.return_value = 100.0
+    deduplicator.is_unique("first")
+    clock.return_value = 110.0
+    deduplicator.is_unique("second")
+    clock.return_value = 115.0
+    assert not deduplicator.is_unique("first")
+    clock.return_value = 135.0
+    assert deduplicator.is_unique("first")
+    clock.return_value = 200.0
+    deduplicator.is_unique("third")
+
+    assert list(deduplicator._seen_messages) == ["third"]
+
+
+def test_deduplicator_evicts_least_recently_seen_over_cap():
+    """Test that the entry cap evicts the least recently seen message."""
+    deduplicator = MessageDeduplicator(window_seconds=30, max_entries=2)
+
+    deduplicator.is_unique("one")
+    deduplicator.is_unique("two")
+    deduplicator.is_unique("one")
+    deduplicator.is_unique("three")
+
+    assert list(deduplicator._seen_messages) == ["one", "three"]
+    assert deduplicator.is_unique("two")
+
+
+def test_deduplicator_ignores_dated_timestamps():
+    """Test that timestamps with a date and a space are stripped too."""
+    deduplicator = MessageDeduplicator(window_seconds=30)
+
+    assert deduplicator.is_unique("[2024-01-01 10:00:00] Disk full")
+    assert not deduplicator.is_unique("[2024-01-01 10:00:05] Disk full")
@@ -0,0 +1,63 @@
+"""
+Unit tests for the log line parser.
+"""
+from src.utility.log_parser import parse_line, parse_many
+
+
+def test_parser_splits_fabric_and_geyser_formats():
+    """Test that each log format's fields land in the right slots."""
+    fabric, logger, geyser, plain = parse_many([
+        "[10:08:36] [Server thread/INFO]: Alex lost connection: Timeout",
+        "[10:08:36] [Server thread/WARN] (Minecraft) Can't keep up!",
+        "[10:08:36 ERROR] Unable to connect",
+        "  no timestamp here ",
+    ])
+
+    assert (fabric.time, fabric.thread, fabric.level, fabric.logger,
+            fabric.message) == ("10:08:36", "Server thread", "INFO", "",
+                                "Alex lost connection: Timeout")
+    assert fabric.body == "[Server thread/INFO]: Alex lost connection: Timeout"
+    assert (logger.level, logger.logger, logger.message) == (
+        "WARN", "Minecraft", "Can't keep up!")
+    assert (geyser.time, geyser.thread, geyser.level, geyser.message) == (
+        "10:08:36", "", "ERROR", "Unable to connect")
+    assert (plain.time, plain.body, plain.message) == (
+        "", "no timestamp here", "no timestamp here")
+
+
+def test_parser_ignores_brackets_that_are_not_timestamps():
+    """Test that a leading tag is kept in the message."""
+    record = parse_line("[Not Secure] <Alex> hi")
+
+    assert record.time == ""
+    assert record.message == "[Not Secure] <Alex> hi"
+
+
+def test_parser_splits_dated_and_forge_timestamps():
+    """Test that timestamps holding a space are taken off the body."""
+    dated, forge, marker = parse_many([
+        "[2024-01-01 10:00:00] Saving chunks",
+        "[12Oct2024 10:00:00.123] [main/INFO] [cpw.mods.modlauncher."
+        "Launcher/]: ModLauncher running",
+        "[12Oct2024 10:00:01.456] [Server thread/WARN] [net.minecraftforge."
+        "fml.loading.FMLLoader/CORE]: Mod file is missing",
+    ])
+
+    assert (dated.time, dated.body, dated.message) == (
+        "2024-01-01 10:00:00", "Saving chunks", "Saving chunks")
+    assert (forge.time, forge.thread, forge.level, forge.logger,
+            forge.message) == ("12Oct2024 10:00:00.123", "main", "INFO",
+                               "cpw.mods.modlauncher.Launcher",
+                               "ModLauncher running")
+    assert (marker.level, marker.logger, marker.message) == (
+        "WARN", "net.minecraftforge.fml.loading.FMLLoader",
+        "Mod file is missing")
+
+
+def test_parser_keeps_plugin_tags_in_the_message():
+    """Test that a bracketed tag after the level is not taken as a logger."""
+    record = parse_line("[10:08:36] [Server thread/INFO]: [Geyser-Spigot] "
+                        "Started Geyser on 0.0.0.0:19132")
+
+    assert record.logger == ""
+    assert record.message.startswith("[Geyser-Spigot] Started")
@@ -0,0 +1,58 @@
+"""
+Unit tests for the metrics layer.
+"""
+from pytest_mock import MockerFixture
+
+from src.utility import metrics
+
+
+def test_metrics_record_nothing_while_disabled(mocker: MockerFixture):
+    """Test that disabled metrics ignore every update."""
+    mocker.patch.object(metrics, "_enabled", False)
+    counter = metrics.Counter("lines_total", "Lines", ("server",))
+    histogram = metrics.Histogram("latency_seconds", "Latency")
+
+    counter.inc("Survival")
+    histogram.observe(0.2)
+
+    assert counter.samples() == []
+    assert histogram.samples() == []
+
+
+def test_metrics_render_prometheus_text_and_summary(mocker: MockerFixture):
+    """Test the exposition format and the JSON summary."""
+    mocker.patch.object(metrics, "_enabled", True)
+    mocker.patch.object(metrics, "REGISTRY", {})
+    lines = metrics.counter("lines_total", "Lines read", ("server",))
+    depth = metrics.gauge("queue_depth", "Queued items")
+    latency = metrics.histogram("latency_seconds", "Latency",
+                                buckets=(0.1, 1.0))
+
+    lines.inc("Survival")
+    lines.inc("Survival", amount=2)
+    depth.set_function(lambda: 7)
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+    assert metrics.counter("lines_total", "Lines read", ("server",)) is lines
+    assert metrics.render().splitlines() == [
+        "# HELP lines_total Lines read",
+        "# TYPE lines_total counter",
+        'lines_total{server="Survival"} 3',
+        "# HELP queue_depth Queued items",
+        "# TYPE queue_depth gauge",
+        "queue_depth 7",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 2',
+        "latency_seconds_sum 0.55",
+        "latency_seconds_count 2",
+    ]
+    assert metrics.summary() == {
+        "lines_total": {"Survival": 3.0},
+        "queue_depth": 7.0,
+        "latency_seconds": {"count": 2, "sum": 0.55, "mean": 0.275,
+                            "p50": 0.1, "p99": 1.0},
+    }
@@ -0,0 +1,156 @@
+"""
+Unit tests for notifier fan-out, sink workers and circuit breakers.
+"""
+import json
+import threading
+import time
+from pathlib import Path
+
+from src.utility.notifiers import (CircuitBreaker, Event, JsonlSink,
+                                   Notifiers, Severity, Sink)
+
+
+class RecordingSink(Sink):
+    name = "recording"
+
+    def __init__(self) -> None:
+        self.events: list[Event] = []
+
+    def send(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class DeadSink(Sink):
+    """Hangs like an endpoint that stopped answering, then fails."""
+
+    name = "dead"
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.calls = 0
+
+    def send(self, event: Event) -> None:
+        self.calls += 1
+        time.sleep(self.delay)
+        raise ConnectionError("endpoint down")
+
+
+def test_events_fan_out_by_severity():
+    """Test that each sink only gets events at or above its severity."""
+    notifiers = Notifiers()
+    everything = RecordingSink()
+    critical = RecordingSink()
+    notifiers.add(everything)
+    notifiers.add(critical, Severity.CRITICAL)
+
+    notifiers.notify("Survival", "joined", "🟢 Player Joined")
+    notifiers.notify("Survival", "crashed", "💀 Server Fatal",
+                     Severity.CRITICAL)
+    notifiers.drain(1)
+
+    assert [e.message for e in everything.events] == ["joined", "crashed"]
+    assert [e.message for e in critical.events] == ["crashed"]
+
+
+def test_sinks_report_delivery_latency():
+    """
+    Test that latency is reported once a sink delivers, and that a
+    deferred sink reports it itself.
+    """
+    class DeferredSink(RecordingSink):
+        name = "deferred"
+        deferred = True
+
+    notifiers = Notifiers()
+    direct, deferred = RecordingSink(), DeferredSink()
+    notifiers.add(direct)
+    notifiers.add(deferred)
+    reports: list[tuple[str, float]] = []
+
+    notifiers.notify("Survival", "joined", "🟢 Player Joined",
+                     read_at=time.monotonic() - 1,
+                     on_delivered=lambda *report: reports.append(report))
+    notifiers.drain(1)
+    assert [sink for sink, _ in reports] == ["recording"]
+
+    deferred.events[0].delivered(deferred.name)
+    assert [sink for sink, _ in reports] == ["recording", "deferred"]
+    assert all(latency >= 1 for _, latency in reports)
+
+
+def test_dead_sink_does_not_delay_other_sinks():
+    """Test that a hanging sink neither blocks notify nor another sink."""
+    notifiers = Notifiers()
+    dead = DeadSink(delay=0.3)
+    healthy = RecordingSink()
+    notifiers.add(dead, breaker=CircuitBreaker(failures=1,
+                                               reset_seconds=60))
+    notifiers.add(healthy)
+
+    start = time.monotonic()
+    for index in range(20):
+        notifiers.notify("Survival", str(index), "❌ Server Error")
+    assert time.monotonic() - start < 0.1
+
+    deadline = time.monotonic() + 1
+    while len(healthy.events) < 20 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(healthy.events) == 20
+    assert time.monotonic() - start < 0.3
+
+    notifiers.drain(2)
+    assert dead.calls == 1
+
+
+def test_breaker_half_opens_after_reset():
+    """Test that the breaker sheds, then lets one trial call through."""
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_full_queue_drops_oldest_event():
+    """Test that a blocked sink's queue stays bounded."""
+    release = threading.Event()
+
+    class BlockedSink(RecordingSink):
+        def send(self, event: Event) -> None:
+            release.wait(1)
+            super().send(event)
+
+    notifiers = Notifiers()
+    sink = BlockedSink()
+    worker = notifiers.add(sink, queue_size=2)
+    for index in range(5):
+        notifiers.notify("Survival", str(index), "summary")
+        time.sleep(0.01)
+    assert worker.pending() == 3
+
+    release.set()
+    notifiers.drain(1)
+    assert [e.message for e in sink.events] == ["0", "3", "4"]
+
+
+def test_jsonl_sink_appends_events(tmp_path: Path):
+    """Test that the file sink writes one JSON object per event."""
+    sink = JsonlSink(tmp_path / "events" / "events.jsonl")
+    sink.send(Event("Survival", "crashed", "💀 Server Fatal",
+                    Severity.CRITICAL))
+    sink.close()
+
+    line = (tmp_path / "events" / "events.jsonl").read_text()
+    record = json.loads(line)
+    assert record["server"] == "Survival"
+    assert record["severity"] == "critical"
+    assert record["summary"] == "💀 Server Fatal"